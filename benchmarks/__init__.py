@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of performance-sensitive parts of the library."""
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of creating Hostname objects.
+
+Compares time and memory needed to create the current, slotted
+Hostname objects with the previous implementation, validating each
+hostname with the regular expression used by validators.domain
+(copied here, as the library no longer depends on validators) and
+creating its dns.name.Name in the constructor.
+
+Usage: python -m benchmarks.hostnames [number_of_hostnames]
+"""
+from __future__ import print_function, unicode_literals
+
+import random
+import re
+import string
+import sys
+import timeit
+
+# pylint: disable=redefined-builtin
+from builtins import object, range
+from dns import name
+
+from spam_lists.structures import Hostname
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# the pattern of validators.domain from validators 0.11.0
+_LEGACY_DOMAIN_REGEX = re.compile(
+    r'^(:?(([a-zA-Z]{1})|([a-zA-Z]{1}[a-zA-Z]{1})|'
+    r'([a-zA-Z]{1}[0-9]{1})|([0-9]{1}[a-zA-Z]{1})|'
+    r'([a-zA-Z0-9][-_a-zA-Z0-9]{0,61}[a-zA-Z0-9]))\.)+'
+    r'([a-zA-Z]{2,13}|(xn--[a-zA-Z0-9]{1,59}))$'
+)
+
+
+class LegacyHostname(object):
+    """A hostname object the way Hostname was implemented before."""
+
+    def __init__(self, value):
+        """Initialize a new instance.
+
+        :param value: a string representing a hostname
+        :raises ValueError: if the value is not a valid hostname
+        """
+        if not _LEGACY_DOMAIN_REGEX.match(value):
+            raise ValueError(value)
+        hostname = name.Name(value.split('.'))
+        self.value = hostname
+        self.relative_domain = hostname
+
+
+def get_hostnames(number):
+    """Get random hostnames.
+
+    :param number: the number of hostnames
+    :returns: a list of strings representing hostnames with two
+    or three labels
+    """
+    chars = string.ascii_lowercase + string.digits
+    tlds = ['com', 'net', 'org', 'pl', 'de']
+    return [
+        '.'.join(
+            [
+                ''.join(random.choice(chars) for _ in range(8))
+                for _ in range(random.randint(1, 2))
+            ] + [random.choice(tlds)]
+        ) for _ in range(number)
+    ]
+
+
+def measure(factory, hostnames):
+    """Measure creating host objects.
+
+    :param factory: a callable creating a host object
+    :param hostnames: a list of hostnames
+    :returns: a tuple containing the time of creating the objects,
+    in seconds, and the memory used by them, in bytes, or None if it
+    can't be measured
+    """
+    objects = []
+    if tracemalloc is not None:
+        tracemalloc.start()
+    elapsed = timeit.timeit(
+        lambda: objects.extend(factory(h) for h in hostnames),
+        number=1
+    )
+    memory = None
+    if tracemalloc is not None:
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    return elapsed, memory
+
+
+def format_memory(memory, number):
+    """Format memory used per host object.
+
+    :param memory: the memory used by all the objects, or None
+    :param number: the number of the objects
+    :returns: a string describing the memory
+    """
+    if memory is None:
+        return 'memory not measured'
+    return '{:.0f} bytes per host'.format(memory / number)
+
+
+def run(number):
+    """Run the benchmark and print its results.
+
+    :param number: the number of hostnames used for each measurement
+    """
+    random.seed(0)
+    hostnames = get_hostnames(number)
+    for label, factory in ('previous', LegacyHostname), ('current', Hostname):
+        elapsed, memory = measure(factory, hostnames)
+        print(
+            '{}, {} hostnames: {:.2f}s, {}'.format(
+                label, number, elapsed, format_memory(memory, number)
+            )
+        )
+    host_objects = [Hostname(h) for h in hostnames]
+    first = timeit.timeit(
+        lambda: [h.relative_domain for h in host_objects],
+        number=1
+    )
+    print('current, first access to relative_domain: {:.2f}s'.format(first))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
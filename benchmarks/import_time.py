@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of importing the library.
+
+Each import statement is run in a new interpreter, and the time of
+starting an interpreter that imports nothing is subtracted from its
+best time. The benchmark fails if any of the statements takes longer
+than the budget.
+
+Usage: python -m benchmarks.import_time [budget_in_milliseconds]
+"""
+from __future__ import print_function, unicode_literals
+
+import subprocess
+import sys
+import timeit
+
+# pylint: disable=redefined-builtin
+from builtins import range
+
+STATEMENTS = (
+    'import spam_lists',
+    'from spam_lists import SortedHostCollection',
+    'from spam_lists import SPAMHAUS_ZEN',
+    'from spam_lists import URLTesterChain',
+)
+
+
+def measure(statement, repeat=7):
+    """Measure the time of running the statement in a new interpreter.
+
+    :param statement: a statement to be run
+    :param repeat: the number of measurements
+    :returns: the best of the measured times, in seconds
+    """
+    command = [sys.executable, '-c', statement]
+    return min(
+        timeit.timeit(lambda: subprocess.check_call(command), number=1)
+        for _ in range(repeat)
+    )
+
+
+def run(budget):
+    """Run the benchmark and print its results.
+
+    :param budget: the maximum time of importing, in milliseconds
+    :returns: True if all the statements were run within the budget
+    """
+    startup = measure('pass')
+    print('interpreter startup: {:.1f}ms'.format(startup * 1000))
+    within_budget = True
+    for statement in STATEMENTS:
+        elapsed = (measure(statement) - startup) * 1000
+        within_budget = within_budget and elapsed <= budget
+        print('{}: {:.1f}ms'.format(statement, elapsed))
+    return within_budget
+
+
+if __name__ == '__main__':
+    if not run(float(sys.argv[1]) if len(sys.argv) > 1 else 100):
+        sys.exit('import time budget exceeded')
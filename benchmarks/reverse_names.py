@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark of building reverse query names for IP addresses.
+
+Compares the current implementation of IPAddress.relative_domain with
+the previous one, converting each address to text and passing it to
+dns.reversename.from_address.
+
+Usage: python -m benchmarks.reverse_names [number_of_addresses]
+"""
+from __future__ import print_function, unicode_literals
+
+import random
+import sys
+import timeit
+
+# pylint: disable=redefined-builtin
+from builtins import str, range
+from dns.reversename import from_address
+
+from spam_lists.structures import IPv4Address, IPv6Address
+
+
+def get_legacy_relative_domain(host_object):
+    """Get a reverse name the way IPAddress did it before caching.
+
+    :param host_object: an instance of IPAddress subclass
+    :returns: the reverse pointer relative to the common root
+    """
+    value = from_address(str(host_object.value))
+    return value.relativize(host_object.reverse_domain)
+
+
+def get_host_objects(address_class, bits, number):
+    """Get host objects for random addresses.
+
+    :param address_class: IPv4Address or IPv6Address
+    :param bits: the number of bits of the address
+    :param number: the number of objects to be created
+    :returns: a list of host objects
+    """
+    factory = address_class.factory
+    return [
+        address_class(factory(random.getrandbits(bits)))
+        for _ in range(number)
+    ]
+
+
+def run(number):
+    """Run the benchmark and print its results.
+
+    :param number: the number of addresses used for each measurement
+    """
+    random.seed(0)
+    for address_class, bits in (IPv4Address, 32), (IPv6Address, 128):
+        host_objects = get_host_objects(address_class, bits, number)
+        legacy = timeit.timeit(
+            lambda: [get_legacy_relative_domain(h) for h in host_objects],
+            number=1
+        )
+        first = timeit.timeit(
+            lambda: [h.relative_domain for h in host_objects],
+            number=1
+        )
+        repeated = timeit.timeit(
+            lambda: [h.relative_domain for h in host_objects],
+            number=1
+        )
+        print(
+            '{}, {} addresses: previous {:.2f}s, first access {:.2f}s,'
+            ' repeated access {:.2f}s'.format(
+                address_class.__name__, number, legacy, first, repeated
+            )
+        )
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
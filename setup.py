@@ -4,6 +4,7 @@ import re
 import sys
 
 from setuptools import setup
+from setuptools.command.build_py import build_py
 
 
 def read_attributes(string, *names):
@@ -33,8 +34,6 @@ with open('README.rst', 'r', 'utf-8') as f:
 install_requires = [
     'future',
     'requests',
-    'tldextract',
-    'validators',
     'dnspython'
 ]
 
@@ -47,12 +46,26 @@ if version < (3, 3):
     tests_require += ['mock']
 
 if version < (3, 2):
-    install_requires += ['cachetools']
+    install_requires += ['futures']
+    tests_require += ['cachetools']
 
 if version < (2, 7, 9):
     # request[security] extras
     install_requires += ['ndg-httpsclient']
 
+
+class BuildPy(build_py):
+    """Skip modules using syntax of Python 3.5 on older versions."""
+
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if version < (3, 5):
+            modules = [
+                m for m in modules if m[:2] != ('spam_lists', 'async_clients')
+            ]
+        return modules
+
+
 setup(
     name=name,
     version=version,
@@ -62,7 +75,9 @@ setup(
     author_email='piotr.rusin88@gmail.com',
     url='https://github.com/piotr-rusin/spam-lists',
     packages=['spam_lists', 'test', 'test.integration', 'test.unit'],
+    package_data={'spam_lists': ['public_suffixes.dat']},
     install_requires=install_requires,
+    cmdclass={'build_py': BuildPy},
     license=_license,
     classifiers=(
         'Development Status :: 5 - Production/Stable',
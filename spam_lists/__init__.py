@@ -17,7 +17,19 @@ It supports the following third party services:
     safe-browsing/lookup_guide`_
 
 In addition, it provides a HostCollection class whose instances can be
-used as custom host whitelists or blacklists.
+used as custom host whitelists or blacklists. Besides hostnames and
+IP addresses, host collections accept networks of IP addresses in CIDR
+notation, like 192.0.2.0/24. A host collection can be saved to
+a snapshot file with its save method, and restored with load class
+method of its class, without validating its hosts again. Its
+build_prefilter method adds a Bloom filter rejecting most unlisted
+hosts without searching the collection.
+Many host collections can be compiled into a single
+spam_lists.compiled.CompiledHostIndex, matching a host against all of
+them at once.
+Networks of IP addresses with nested prefixes, like IPv6 /48 and /64
+allocations, can be listed in a spam_lists.radix.IPPrefixList,
+returning the most specific network matching an address.
 
 Python versions: 2.7.x, 3.4.x and greater are supported.
 
@@ -42,6 +54,12 @@ the following interfaces:
         * lookup: returns an object representing given item. If it is
         listed, an instance of spam_lists.structures.AddressListItem is
         returned, otherwise the method returns None.
+        * contains_many and lookup_many: batch counterparts of
+        the above methods, receiving an iterable of host values and
+        running the queries concurrently in a pool of threads. They
+        return generators yielding tuples containing a host value and
+        a result for it, in order of the values or in order of
+        completion of the queries.
 
     * URL tester interface, containing methods that receive an iterable
     containing URLs for which we query service(s) represented by
@@ -79,11 +97,21 @@ Google Safe Browsing Lookup API service, implementing URL tester
 interface.
 
 :var HostCollection: a class of objects representing custom host lists,
-implementing host list and URL tester interfaces.
+implementing host list and URL tester interfaces. Each entry of this
+and other host collections may have its own classification.
 
 :var SortedHostCollection: a class of objects representing custom
 sorted host lists, implementing host list and URL tester interfaces.
 
+:var TrieHostCollection: a class of objects representing custom host
+lists indexed by a trie of domain labels, implementing host list and
+URL tester interfaces. Its lookups do not depend on the number of
+listed hosts.
+
+:var ReloadableHostList: a class of objects delegating host list
+queries to a host collection that is rebuilt separately and replaced
+atomically when the list is reloaded, without blocking the queries.
+
 :var URLTesterChain: a class of objects representing composite
 URL testers, created by providing objects with URL tester methods
 as arguments to constructor. It implements URL tester interface.
@@ -104,16 +132,100 @@ we should include results of redirect URL resolution for given URLs in
 the data set for which we query service(s) represented by
 the URL tester.
 
+Answers received by DNSBL clients can be cached by setting their cache
+attribute to an instance of spam_lists.cache.TTLCache. Positive answers
+are cached for the time specified by TTL of their records, and negative
+ones for the time specified by SOA record of the DNSBL zone. The cache
+provides hits, misses, evictions and expirations counters.
+
+Each DNSBL client can also use its own resolver, assigned to its
+resolver attribute. spam_lists.clients.DNSResolver is a resolver
+configured with its own name servers, port, timeout, lifetime and
+number of retries, so that - for example - a single client can query
+a local mirror of a DNSBL zone.
+
+Host objects created by factories defined in spam_lists.structures are
+stored in spam_lists.structures.HOST_CACHE, an instance of
+spam_lists.cache.HostObjectCache. Its maxsize attribute can be changed
+to fit the expected number of distinct hosts, and setting its
+cache_errors attribute to True makes it cache errors raised for
+invalid values, too. The cache provides hits, misses and evictions
+counters.
+
+Registered domains of hostnames are extracted using a snapshot of
+the public suffix list bundled with the library, loaded on first use
+without any network connections. The snapshot can be refreshed from
+a local copy of the list by running "python -m spam_lists.public_suffix".
+
+Very large host lists can be stored in index files built with
+spam_lists.host_index.build_host_index function or by running
+"python -m spam_lists.host_index". Instances of
+spam_lists.host_index.HostIndex implement host list and URL tester
+interfaces, searching such files mapped into memory, so many processes
+can share a single copy of a list.
+
+On Python 3.5 and greater, spam_lists.async_clients.AsyncDNSBL can be
+used to wrap any of the DNSBL clients. It provides coroutine
+counterparts of the host list and URL tester methods: contains,
+lookup, any_match, lookup_matching and filter_matching, running many
+DNS queries concurrently on a single event loop.
+
+On Python 3.7 and greater, the modules defining the objects listed
+above are imported on first access to the objects, so importing
+the package is fast, and creating a host collection does not import
+the modules used by clients of online services.
+
 :copyright: (c) 2016 by Piotr Rusin.
 :license: MIT, see LICENSE for more details.
 """
 from __future__ import unicode_literals
 
-from .clients import (
-    SPAMHAUS_DBL, SPAMHAUS_ZEN, SURBL_MULTI, HpHosts, GoogleSafeBrowsing
-)
-from .host_collections import HostCollection, SortedHostCollection
-from .composites import URLTesterChain, GeneralizedURLTester
+import importlib
+import sys
+
+_LAZY_ATTRIBUTES = {
+    'SPAMHAUS_DBL': 'clients',
+    'SPAMHAUS_ZEN': 'clients',
+    'SURBL_MULTI': 'clients',
+    'HpHosts': 'clients',
+    'GoogleSafeBrowsing': 'clients',
+    'HostCollection': 'host_collections',
+    'ReloadableHostList': 'host_collections',
+    'SortedHostCollection': 'host_collections',
+    'TrieHostCollection': 'host_collections',
+    'URLTesterChain': 'composites',
+    'GeneralizedURLTester': 'composites',
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    """Import a module defining a part of the API on its first use.
+
+    :param name: a name of the attribute
+    :returns: a value of the attribute
+    :raises AttributeError: if the attribute is not a part of the API
+    """
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        msg = "module '{}' has no attribute '{}'".format(__name__, name)
+        raise AttributeError(msg)
+    value = getattr(importlib.import_module('.' + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Get names of attributes of the module, including lazy ones."""
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info < (3, 7):
+    # module __getattr__ is not supported, so the API is imported eagerly
+    for _name in __all__:
+        __getattr__(_name)
 
 __title__ = 'spam-lists'
 __version__ = '1.0.0'
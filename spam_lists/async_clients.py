@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""Asynchronous clients of DNSBL services.
+
+This module provides coroutine-based counterparts of host list and URL
+tester methods of DNSBL clients. The DNS queries are sent over UDP
+with asyncio, so a single event loop can wait for responses to
+hundreds of them at the same time.
+
+The module requires Python 3.5 or greater.
+"""
+# pylint: disable=protected-access
+import asyncio
+
+from dns import message, rcode, rdataclass, rdatatype
+from dns.exception import DNSException, Timeout
+from dns.resolver import NoAnswer, NoNameservers, get_default_resolver
+
+from .clients import get_negative_ttl
+from .compat import urlparse
+from .exceptions import InvalidHostError
+from .structures import AddressListItem
+from .validation import accepts_valid_host, accepts_valid_urls
+
+
+_NOT_CACHED = object()
+
+
+class _DNSDatagramProtocol(asyncio.DatagramProtocol):
+    """A protocol sending a single DNS request and receiving its response."""
+
+    def __init__(self, request, future):
+        """Initialize a new instance.
+
+        :param request: an instance of dns.message.Message to be sent
+        :param future: a future object to be resolved with a response
+        to the request
+        """
+        self._request = request
+        self._future = future
+
+    def connection_made(self, transport):
+        """Send the request as soon as the endpoint is ready."""
+        transport.sendto(self._request.to_wire())
+
+    def datagram_received(self, data, addr):
+        """Resolve the future with a response to the request.
+
+        Malformed datagrams and responses to other requests are ignored.
+        """
+        try:
+            response = message.from_wire(data)
+        except DNSException:
+            return
+        if self._request.is_response(response) and not self._future.done():
+            self._future.set_result(response)
+
+    def error_received(self, exc):
+        """Pass an error received by the endpoint to the future."""
+        if not self._future.done():
+            self._future.set_exception(exc)
+
+
+class AsyncDNSBL(object):
+    """An asynchronous client of a DNSBL service.
+
+    Instances of this class use host factory, query suffix and
+    classification rules of a wrapped DNSBL client, so the results
+    of their coroutines are identical to the values returned by
+    corresponding methods of the client.
+    """
+
+    def __init__(
+            self,
+            dnsbl,
+            nameservers=None,
+            port=None,
+            timeout=None,
+            max_concurrency=100
+    ):
+        """Initialize a new instance.
+
+        Name servers, port and timeout not specified by the arguments
+        are taken from the resolver of the wrapped client or, if it has
+        none, from the default resolver. The wrapped client's resolver
+        also provides a number of retries of timed out queries.
+
+        :param dnsbl: an instance of DNSBL or its subclass
+        :param nameservers: a list of addresses of name servers to be
+        queried
+        :param port: a port on which the name servers listen
+        :param timeout: a number of seconds to wait for a response
+        from a single name server
+        :param max_concurrency: a maximum number of queries
+        running at the same time during a single call to any_match,
+        lookup_matching or filter_matching
+        """
+        self.dnsbl = dnsbl
+        self._nameservers = nameservers
+        self._port = port
+        self._timeout = timeout
+        self.max_concurrency = max_concurrency
+
+    def _get_resolver_setting(self, value, attribute, default=None):
+        if value is not None:
+            return value
+        resolver = self.dnsbl.resolver
+        if resolver is None:
+            resolver = get_default_resolver()
+        return getattr(resolver, attribute, default)
+
+    @property
+    def nameservers(self):
+        """Get addresses of name servers queried by the client."""
+        return self._get_resolver_setting(self._nameservers, 'nameservers')
+
+    @property
+    def port(self):
+        """Get a port on which the name servers listen."""
+        return self._get_resolver_setting(self._port, 'port')
+
+    @property
+    def timeout(self):
+        """Get a number of seconds to wait for a single response."""
+        return self._get_resolver_setting(self._timeout, 'timeout')
+
+    @property
+    def retries(self):
+        """Get a number of times a timed out query is repeated."""
+        return self._get_resolver_setting(None, 'retries', 0)
+
+    def __str__(self):
+        """Convert the client to a string."""
+        return str(self.dnsbl)
+
+    async def _query_nameserver(self, request, nameserver):
+        """Send the request to given name server and get its response.
+
+        :param request: a DNS query message
+        :param nameserver: an address of the name server
+        :returns: an instance of dns.message.Message
+        :raises asyncio.TimeoutError: if the name server does not
+        respond in time
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DNSDatagramProtocol(request, future),
+            remote_addr=(nameserver, self.port)
+        )
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            transport.close()
+
+    async def _query(self, host_object):
+        """Query the DNSBL service for given value.
+
+        :param host_object: an object representing host, created by
+        the host factory of the wrapped client
+        :returns: an object containing A records for given value if it
+        is listed. Otherwise, it returns None.
+        """
+        query_name = self.dnsbl._get_query_name(host_object)
+        cache = self.dnsbl.cache
+        if cache is not None:
+            answers = cache.get(query_name, _NOT_CACHED)
+            if answers is not _NOT_CACHED:
+                return answers
+        answers, ttl = await self._resolve(query_name)
+        if cache is not None:
+            cache.set(query_name, answers, ttl)
+        return answers
+
+    async def _resolve(self, query_name):
+        """Query the name servers for given name.
+
+        :param query_name: a domain name to be queried
+        :returns: a tuple containing an rrset with A records for
+        the name (or None if the name does not exist) and a number of
+        seconds for which the answer may be cached
+        :raises dns.exception.Timeout: if none of the name servers
+        responded in time
+        :raises dns.resolver.NoNameservers: if the name servers failed
+        to answer the query
+        :raises dns.resolver.NoAnswer: if the response does not contain
+        an answer to the query
+        """
+        request = message.make_query(query_name, rdatatype.A)
+        nameservers = self.nameservers * (self.retries + 1)
+        failed = False
+        for nameserver in nameservers:
+            try:
+                response = await self._query_nameserver(request, nameserver)
+            except asyncio.TimeoutError:
+                continue
+            except OSError:
+                failed = True
+                continue
+            code = response.rcode()
+            if code == rcode.NXDOMAIN:
+                return None, get_negative_ttl(response)
+            if code != rcode.NOERROR:
+                failed = True
+                continue
+            try:
+                answers = response.find_rrset(
+                    response.answer,
+                    query_name,
+                    rdataclass.IN,
+                    rdatatype.A
+                )
+            except KeyError:
+                raise NoAnswer
+            return answers, answers.ttl
+        if failed or not nameservers:
+            raise NoNameservers
+        raise Timeout
+
+    async def _contains(self, host_object):
+        return bool(await self._query(host_object))
+
+    async def _get_match_and_classification(self, host_object):
+        answers = await self._query(host_object)
+        if answers is None:
+            return None, None
+        return host_object, self.dnsbl._get_classification(answers)
+
+    @accepts_valid_host
+    async def contains(self, host_value):
+        """Check if the given host value is listed by the service.
+
+        This is a counterpart of DNSBL.__contains__
+
+        :param host_value: a string representing a valid host
+        :returns: True if the host is listed
+        :raises InvalidHostError: if the argument is not a valid
+        host string
+        """
+        try:
+            host_object = self.dnsbl._host_factory(host_value)
+        except InvalidHostError:
+            return False
+        return await self._contains(host_object)
+
+    @accepts_valid_host
+    async def lookup(self, host_value):
+        """Get a host value matching the given value.
+
+        :param host_value: a value of the host of a type that can be
+        listed by the service
+        :returns: an instance of AddressListItem representing
+        a matched value
+        :raises InvalidHostError: if the argument is not a valid
+        host string
+        """
+        try:
+            host_object = self.dnsbl._host_factory(host_value)
+        except InvalidHostError:
+            return None
+        host_item, classification = (
+            await self._get_match_and_classification(host_object)
+        )
+        if host_item is not None:
+            return AddressListItem(
+                host_item.to_unicode(),
+                self.dnsbl,
+                classification
+            )
+        return None
+
+    def _run_bounded(self, function, values):
+        """Create tasks calling the coroutine function for given values.
+
+        :param function: a coroutine function
+        :param values: arguments for the function
+        :returns: a list of tasks, in order of the values. No more than
+        max_concurrency of them run at the same time.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(value):
+            async with semaphore:
+                return await function(value)
+        return [asyncio.ensure_future(run(v)) for v in values]
+
+    @accepts_valid_urls
+    async def any_match(self, urls):
+        """Check if any of the given URLs has a matching host.
+
+        The remaining queries are cancelled after the first match
+        is found.
+
+        :param urls: an iterable containing URLs
+        :returns: True if any host has a listed match
+        :raises InvalidURLError: if there are any invalid URLs in
+        the sequence
+        """
+        hosts = [urlparse(u).hostname for u in urls]
+        tasks = self._run_bounded(self.contains, hosts)
+        try:
+            for task in asyncio.as_completed(tasks):
+                if await task:
+                    return True
+            return False
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @accepts_valid_urls
+    async def lookup_matching(self, urls):
+        """Get matching hosts for the given URLs.
+
+        :param urls: an iterable containing URLs
+        :returns: a list of instances of AddressListItem representing
+        listed hosts matching the ones used by the given URLs, in order
+        of the URLs
+        :raises InvalidURLError: if there are any invalid URLs in
+        the sequence
+        """
+        hosts = [urlparse(u).hostname for u in urls]
+        items = await asyncio.gather(*self._run_bounded(self.lookup, hosts))
+        return [i for i in items if i is not None]
+
+    @accepts_valid_urls
+    async def filter_matching(self, urls):
+        """Get URLs with hosts matching any listed ones.
+
+        :param urls: an iterable containing URLs to filter
+        :returns: a list of matching URLs, in order of the given URLs
+        :raises InvalidURLError: if there are any invalid URLs in
+        the sequence
+        """
+        urls = list(urls)
+        hosts = [urlparse(u).hostname for u in urls]
+        results = await asyncio.gather(
+            *self._run_bounded(self.contains, hosts)
+        )
+        return [u for u, listed in zip(urls, results) if listed]
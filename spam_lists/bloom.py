@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""A Bloom filter used to quickly reject hosts missing from host lists."""
+from __future__ import division, unicode_literals
+
+import binascii
+import hashlib
+import math
+from threading import Lock
+
+# pylint: disable=redefined-builtin
+from builtins import range, object
+
+
+def get_digest(value):
+    """Get a 128-bit digest of a value, used to set bits of filters.
+
+    BLAKE2b is used where available, since MD5 may be disabled on
+    FIPS-compliant builds of Python.
+
+    :param value: a byte string
+    :returns: a 16-byte digest of the value
+    """
+    if hasattr(hashlib, 'blake2b'):
+        return hashlib.blake2b(value, digest_size=16).digest()
+    return hashlib.md5(value).digest()
+
+
+class BloomFilter(object):
+    """A probabilistic set of byte strings.
+
+    A test for membership of a value never gives a false negative
+    result, but it may give a false positive one. Its probability
+    depends on the number of bits per stored value.
+
+    Adding values and recording test results are synchronized, so
+    a filter can be shared by threads looking up hosts concurrently.
+
+    :ivar target_false_positive_rate: the probability of a false
+    positive result for which the filter was sized
+    :ivar false_positives: the number of recorded tests that gave
+    a false positive result
+    :ivar true_negatives: the number of recorded tests that gave
+    a true negative result
+    """
+
+    def __init__(self, capacity, false_positive_rate=0.01):
+        """Initialize a new instance.
+
+        :param capacity: the expected number of values to be stored
+        :param false_positive_rate: the expected probability of a false
+        positive result of a test, after storing the expected number of
+        values
+        :raises ValueError: if the capacity is not positive or if
+        the rate is not between 0 and 1
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be greater than 0')
+        if not 0 < false_positive_rate < 1:
+            raise ValueError('false_positive_rate must be between 0 and 1')
+        bits = -capacity * math.log(false_positive_rate) / math.log(2) ** 2
+        self._size = max(8, int(math.ceil(bits)))
+        self._hash_count = max(
+            1,
+            int(round(self._size / capacity * math.log(2)))
+        )
+        self._bits = bytearray((self._size + 7) // 8)
+        self._count = 0
+        self._lock = Lock()
+        self.target_false_positive_rate = false_positive_rate
+        self.false_positives = 0
+        self.true_negatives = 0
+
+    def __len__(self):
+        """Get the number of values added to the filter."""
+        return self._count
+
+    @property
+    def memory_usage(self):
+        """Get the size of the bit array of the filter, in bytes."""
+        return len(self._bits)
+
+    @property
+    def expected_false_positive_rate(self):
+        """Get the probability of a false positive test result.
+
+        :returns: the probability calculated for the number of values
+        added to the filter
+        """
+        exponent = -self._hash_count * self._count / self._size
+        return (1 - math.exp(exponent)) ** self._hash_count
+
+    @property
+    def false_positive_rate(self):
+        """Get the measured rate of false positive test results.
+
+        :returns: the number of recorded false positive results divided
+        by the number of recorded tests for values missing from
+        the filter, or None if no such tests were recorded
+        """
+        negatives = self.false_positives + self.true_negatives
+        if not negatives:
+            return None
+        return self.false_positives / negatives
+
+    def record_false_positive(self):
+        """Record a test that gave a false positive result."""
+        with self._lock:
+            self.false_positives += 1
+
+    def record_true_negative(self):
+        """Record a test that gave a true negative result."""
+        with self._lock:
+            self.true_negatives += 1
+
+    def _get_positions(self, value):
+        digest = get_digest(value)
+        first = int(binascii.hexlify(digest[:8]), 16)
+        second = int(binascii.hexlify(digest[8:]), 16) | 1
+        return (
+            (first + i * second) % self._size
+            for i in range(self._hash_count)
+        )
+
+    def add(self, value):
+        """Add a value to the filter.
+
+        :param value: a byte string
+        """
+        positions = list(self._get_positions(value))
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self._count += 1
+
+    def __contains__(self, value):
+        """Test if the value may have been added to the filter.
+
+        :param value: a byte string
+        :returns: False if the value was certainly not added to
+        the filter, True if it probably was
+        """
+        return all(
+            self._bits[p >> 3] & (1 << (p & 7))
+            for p in self._get_positions(value)
+        )
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+"""Caches used by the library to avoid repeating queries."""
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+
+from builtins import object  # pylint: disable=redefined-builtin
+
+from .compat import monotonic
+from .exceptions import InvalidHostError
+
+
+class TTLCache(object):
+    """A bounded cache of values expiring after their time-to-live.
+
+    When the cache is full, the least recently used item is evicted
+    to make room for a new one. Expired items are removed when they
+    are accessed.
+
+    Instances of this class are safe to be used by multiple threads.
+
+    :ivar hits: a number of lookups that found a value
+    :ivar misses: a number of lookups that did not find a value,
+    including the ones that found an expired value
+    :ivar evictions: a number of items removed to make room for
+    new ones
+    :ivar expirations: a number of expired items removed from the cache
+    """
+
+    def __init__(self, maxsize=10000, max_ttl=None, timer=monotonic):
+        """Initialize a new instance.
+
+        :param maxsize: a maximum number of items stored in the cache
+        :param max_ttl: if not None, a maximum number of seconds for
+        which an item is stored, regardless of its time-to-live
+        :param timer: a function returning current time, in seconds
+        """
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._timer = timer
+        self._items = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        """Get the number of items in the cache, including expired ones."""
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """Get a value stored for the key.
+
+        :param key: a key of the value
+        :param default: a value to be returned if there is no
+        unexpired value for the key in the cache
+        :returns: the value stored for the key, or the default
+        """
+        with self._lock:
+            try:
+                value, expiration = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            if expiration <= self._timer():
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._items[key] = value, expiration
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        """Store the value for the key.
+
+        :param key: a key of the value
+        :param value: a value to be stored
+        :param ttl: a number of seconds for which the value is valid.
+        Values with time-to-live not greater than 0 are not stored.
+        """
+        if self.max_ttl is not None:
+            ttl = min(ttl, self.max_ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items.pop(key, None)
+            while len(self._items) >= self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+            self._items[key] = value, self._timer() + ttl
+
+    def clear(self):
+        """Remove all items from the cache."""
+        with self._lock:
+            self._items.clear()
+
+
+class HostObjectCache(object):
+    """A bounded cache of host objects created by host factories.
+
+    A single instance can be shared by many factories: values are
+    stored for a factory and arguments passed to it. When the cache is
+    full, the least recently used item is evicted to make room for
+    a new one.
+
+    If negative caching is enabled, InvalidHostError raised by
+    a factory is stored too, and an error of the same type and with
+    the same message is raised for repeated calls with the same
+    arguments, without calling the factory again.
+
+    Instances of this class are safe to be used by multiple threads.
+
+    :ivar cache_errors: True if errors raised for invalid values are
+    to be cached
+    :ivar hits: a number of calls that found a stored value or error
+    :ivar misses: a number of calls that required calling a factory
+    :ivar evictions: a number of items removed to make room for
+    new ones
+    """
+
+    def __init__(self, maxsize=10000, cache_errors=False):
+        """Initialize a new instance.
+
+        :param maxsize: a maximum number of items stored in the cache
+        :param cache_errors: True if errors raised for invalid values
+        are to be cached
+        """
+        self._maxsize = maxsize
+        self.cache_errors = cache_errors
+        self._items = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        """Get the number of items in the cache, including errors."""
+        return len(self._items)
+
+    @property
+    def maxsize(self):
+        """Get the maximum number of items stored in the cache."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        """Set the maximum number of items stored in the cache.
+
+        Least recently used items exceeding the new size are evicted.
+
+        :param value: the new maximum number of items
+        """
+        with self._lock:
+            self._maxsize = value
+            self._evict(value)
+
+    def _evict(self, size):
+        """Evict least recently used items until there are fewer than size.
+
+        :param size: a number of items to be reached
+        """
+        while self._items and len(self._items) > max(size, 0):
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def _store(self, key, item):
+        with self._lock:
+            if self._maxsize <= 0:
+                return
+            self._items.pop(key, None)
+            self._evict(self._maxsize - 1)
+            self._items[key] = item
+
+    def call(self, function, *args):
+        """Get a value returned by the function for the arguments.
+
+        :param function: a host factory
+        :param args: hashable arguments passed to the function
+        :returns: a cached value, or a value returned by the function
+        :raises InvalidHostError: if the function raised it for
+        the arguments, now or - if errors are cached - before
+        """
+        key = function, args
+        with self._lock:
+            try:
+                item = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+            else:
+                self._items[key] = item
+                self.hits += 1
+                value, error = item
+                if error is not None:
+                    error_type, error_args = error
+                    raise error_type(*error_args)
+                return value
+        try:
+            value = function(*args)
+        except InvalidHostError as ex:
+            if self.cache_errors:
+                self._store(key, (None, (type(ex), ex.args)))
+            raise
+        self._store(key, (value, None))
+        return value
+
+    def wrap(self, function):
+        """Get a version of the function using the cache.
+
+        :param function: a host factory
+        :returns: a function calling the factory through the cache
+        """
+        @wraps(function)
+        def wrapper(*args):
+            return self.call(function, *args)
+        return wrapper
+
+    def clear(self):
+        """Remove all items from the cache."""
+        with self._lock:
+            self._items.clear()
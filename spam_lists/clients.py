@@ -13,12 +13,12 @@ from __future__ import unicode_literals
 
 # pylint: disable=redefined-builtin
 from builtins import zip, str, range, object
-from dns import name
-from dns.resolver import NXDOMAIN, query
+from dns import name, rdatatype
+from dns.exception import Timeout
+from dns.resolver import NXDOMAIN, Resolver, query
 from future.utils import raise_from
-from requests import get, post
-from requests.exceptions import HTTPError
 
+from .concurrency import SingleFlight
 from .exceptions import UnathorizedAPIKeyError, UnknownCodeError
 from .host_list import HostList
 from .structures import (
@@ -29,15 +29,155 @@ from .structures import (
 from .validation import accepts_valid_urls
 
 
+_NOT_CACHED = object()
+
+
+def get(url, **kwargs):
+    """Send a GET request.
+
+    requests is imported only when the first request is sent.
+
+    :param url: a URL of the request
+    :param kwargs: keyword arguments of requests.get
+    :returns: a response object
+    """
+    import requests
+    return requests.get(url, **kwargs)
+
+
+def post(url, data=None, **kwargs):
+    """Send a POST request.
+
+    requests is imported only when the first request is sent.
+
+    :param url: a URL of the request
+    :param data: a body of the request
+    :param kwargs: keyword arguments of requests.post
+    :returns: a response object
+    """
+    import requests
+    return requests.post(url, data, **kwargs)
+
+
+def get_negative_ttl(response):
+    """Get a time for which a negative DNS answer may be cached.
+
+    As specified by RFC 2308, the time is equal to the lesser of
+    TTL of SOA record included in authority section of the response
+    and the value of minimum field of the record.
+
+    :param response: an instance of dns.message.Message representing
+    a NXDOMAIN response, or None
+    :returns: the number of seconds for which the answer may be
+    cached, or 0 if the response does not contain a SOA record
+    """
+    if response is None:
+        return 0
+    for rrset in response.authority:
+        if rrset.rdtype == rdatatype.SOA:
+            return min(rrset.ttl, rrset[0].minimum)
+    return 0
+
+
+class DNSResolver(Resolver):
+    """A DNS resolver with its own name servers, timeouts and retries.
+
+    Instances of this class can be assigned to DNSBL clients, so that
+    each of them can query different name servers - for example: a local
+    mirror of a DNSBL zone - without affecting the default resolver used
+    by other clients.
+    """
+
+    def __init__(
+            self,
+            nameservers=None,
+            port=53,
+            timeout=2.0,
+            lifetime=None,
+            retries=0
+    ):
+        """Initialize a new instance.
+
+        :param nameservers: a list of addresses of name servers to be
+        queried. If None, name servers configured for the system are
+        used.
+        :param port: a port on which the name servers listen
+        :param timeout: a number of seconds to wait for a response
+        from a single name server
+        :param lifetime: a total number of seconds a single query
+        attempt may take. If None, it is equal to the timeout multiplied
+        by the number of name servers at the time of the query, so that
+        the query can fail over to each of them.
+        :param retries: a number of times a query is repeated after
+        it times out
+        """
+        super(DNSResolver, self).__init__(configure=nameservers is None)
+        if nameservers is not None:
+            self.nameservers = list(nameservers)
+        self.port = port
+        self.timeout = timeout
+        self.lifetime = lifetime
+        self.retries = retries
+
+    @property
+    def lifetime(self):
+        """Get a total number of seconds a single query attempt may take.
+
+        :returns: the lifetime set for the resolver or, if it is None,
+        the timeout multiplied by the current number of name servers
+        """
+        if self._lifetime is None:
+            return self.timeout * max(1, len(self.nameservers))
+        return self._lifetime
+
+    @lifetime.setter
+    def lifetime(self, value):
+        """Set a total number of seconds a single query attempt may take.
+
+        :param value: a number of seconds, or None if the lifetime is
+        to depend on the timeout and the number of name servers
+        """
+        self._lifetime = value
+
+    def query(self, *args, **kwargs):
+        """Query the name servers, retrying the query if it times out.
+
+        Since query method of dns.resolver.Resolver is deprecated as of
+        dnspython 2.0, its resolve method is used if it exists.
+
+        :param args: positional arguments of dns.resolver.Resolver.query
+        :param kwargs: keyword arguments of dns.resolver.Resolver.query
+        :returns: an instance of dns.resolver.Answer
+        :raises dns.exception.Timeout: if the last attempt to query
+        the name servers timed out
+        """
+        base = super(DNSResolver, self)
+        resolve = getattr(base, 'resolve', base.query)
+        for attempt in range(self.retries + 1):
+            try:
+                return resolve(*args, **kwargs)
+            except Timeout:
+                if attempt == self.retries:
+                    raise
+
+
 class DNSBL(HostList):
-    """Represents a DNSBL service client."""
+    """Represents a DNSBL service client.
+
+    :cvar bitmasking: if True, return codes of the service are treated
+    as bit vectors
+    """
+
+    bitmasking = False
 
     def __init__(
             self,
             identifier,
             query_suffix,
             classification_map,
-            host_factory
+            host_factory,
+            cache=None,
+            resolver=None
     ):
         """Initialize a new DNSBL object.
 
@@ -49,13 +189,37 @@ class DNSBL(HostList):
         :param host_factory: a callable object that returns an object
         representing host and providing method for getting a relative
         domain pertaining to it.
+        :param cache: an instance of spam_lists.cache.TTLCache used
+        for storing answers to queries for the time specified by their
+        TTL values, or None if the answers are not to be cached
+        :param resolver: an object used for querying the service,
+        like an instance of DNSResolver, or None if the default resolver
+        is to be used
         """
         self._identifier = identifier
         self._query_suffix = name.from_text(query_suffix)
         self._classification_map = classification_map
+        self._classification_table = get_classification_table(
+            classification_map,
+            self.bitmasking
+        )
         self._host_factory = host_factory
+        self.cache = cache
+        self.resolver = resolver
+        self._single_flight = SingleFlight()
         super(DNSBL, self).__init__(host_factory)
 
+    def _get_query_name(self, host_object):
+        """Get a domain name to be queried for given host object.
+
+        :param host_object: an object representing host, created by
+        self._host_factory
+        :returns: an absolute domain name consisting of a relative domain
+        of the host and the query suffix of the service
+        """
+        host_to_query = host_object.relative_domain
+        return host_to_query.derelativize(self._query_suffix)
+
     def _query(self, host_object):
         """Query the DNSBL service for given value.
 
@@ -64,12 +228,31 @@ class DNSBL(HostList):
         :returns: an instance of dns.resolver.Answer for given value if
         it is listed. Otherwise, it returns None.
         """
-        host_to_query = host_object.relative_domain
-        query_name = host_to_query.derelativize(self._query_suffix)
+        query_name = self._get_query_name(host_object)
+        if self.cache is not None:
+            answers = self.cache.get(query_name, _NOT_CACHED)
+            if answers is not _NOT_CACHED:
+                return answers
+        return self._single_flight.call(query_name, self._resolve, query_name)
+
+    def _resolve(self, query_name):
+        """Query the resolver for given name and cache the answer.
+
+        :param query_name: a domain name to be queried
+        :returns: an instance of dns.resolver.Answer for given name if
+        it exists. Otherwise, it returns None.
+        """
+        resolve = query if self.resolver is None else self.resolver.query
         try:
-            return query(query_name)
-        except NXDOMAIN:
+            answers = resolve(query_name)
+        except NXDOMAIN as error:
+            if self.cache is not None:
+                response = error.kwargs.get('responses', {}).get(query_name)
+                self.cache.set(query_name, None, get_negative_ttl(response))
             return None
+        if self.cache is not None:
+            self.cache.set(query_name, answers, answers.rrset.ttl)
+        return answers
 
     def __str__(self):
         """Convert the client to a string."""
@@ -78,24 +261,33 @@ class DNSBL(HostList):
     def _contains(self, host_object):
         return bool(self._query(host_object))
 
-    def _get_entry_classification(self, code):
-        return [self._classification_map[code]]
+    def _get_classification(self, answers):
+        """Get classification for given DNS answer records.
+
+        :param answers: an iterable containing A records returned
+        by the service for a listed host
+        :returns: a set of classification terms pertaining to
+        the return codes provided by the records
+        :raises UnknownCodeError: if any of the return codes has no
+        corresponding classification value
+        """
+        classification = set()
+        for answer in answers:
+            code = int(answer.address.rpartition('.')[2])
+            classes = self._classification_table[code]
+            if classes is None:
+                msg_tpl = (
+                    "The code '{}' has no corresponding classification value"
+                )
+                raise UnknownCodeError(msg_tpl.format(code))
+            classification.update(classes)
+        return classification
 
     def _get_match_and_classification(self, host_object):
         answers = self._query(host_object)
         if answers is None:
             return None, None
-        try:
-            classification = set()
-            for answer in answers:
-                last_octet = answer.to_text().split('.')[-1]
-                classes = self._get_entry_classification(int(last_octet))
-                classification.update(classes)
-            return host_object, classification
-        except KeyError as ex:
-            msg_tpl = "The code '{}' has no corresponding classification value"
-            msg = msg_tpl.format(ex.args[0])
-            raise_from(UnknownCodeError(msg), ex)
+        return host_object, self._get_classification(answers)
 
 
 def get_powers_of_2(_sum):
@@ -115,6 +307,28 @@ def get_powers_of_2(_sum):
     return [2**y for y, x in enumerate(bin(_sum)[:1:-1]) if int(x)]
 
 
+def get_classification_table(classification_map, bitmasking=False):
+    """Get classification values for all possible DNSBL return codes.
+
+    :param classification_map: item classes associated with
+    DNSBL query return codes
+    :param bitmasking: if True, the return codes are treated as bit
+    vectors whose set bits are keys of the classification map
+    :returns: a tuple containing, at the index of each possible value
+    of the last octet of a return address, a frozenset of classification
+    values for the code, or None if the code has no corresponding
+    classification value
+    """
+    table = []
+    for code in range(256):
+        codes = get_powers_of_2(code) if bitmasking else [code]
+        try:
+            table.append(frozenset(classification_map[c] for c in codes))
+        except KeyError:
+            table.append(None)
+    return tuple(table)
+
+
 class BitmaskingDNSBL(DNSBL):
     """A class of clients of DNSBL services using bitmasking.
 
@@ -123,10 +337,7 @@ class BitmaskingDNSBL(DNSBL):
     mark membership of an item in a sublist or a taxonomic group.
     """
 
-    def _get_entry_classification(self, code):
-        codes = get_powers_of_2(code)
-        return [cl for c in codes for cl
-                in DNSBL._get_entry_classification(self, c)]
+    bitmasking = True
 
 
 class HpHosts(HostList):
@@ -141,6 +352,7 @@ class HpHosts(HostList):
         :param client_name: name of client using the service
         """
         self.app_id = client_name
+        self._single_flight = SingleFlight()
         super(HpHosts, self).__init__(non_ipv6_host)
 
     def _query(self, host_object, classification=False):
@@ -155,7 +367,7 @@ class HpHosts(HostList):
         template = 'http://verify.hosts-file.net/?v={}&s={}'
         url = template.format(self.app_id, host_object.to_unicode())
         url = url + '&class=true' if classification else url
-        return get(url).text
+        return self._single_flight.call(url, lambda: get(url).text)
 
     def _contains(self, host_object):
         return self._NOT_LISTED not in self._query(host_object)
@@ -214,6 +426,7 @@ class GoogleSafeBrowsing(object):
         :raises HTTPError: if the HTTPError was raised for a HTTP code
         other than 401, the exception is reraised
         """
+        from requests.exceptions import HTTPError
         request_body = '{}\n{}'.format(len(urls), '\n'.join(urls))
         response = post(self._request_address, request_body)
         try:
@@ -8,8 +8,16 @@ the interpreter, complex imports that may result in errors, etc.
 """
 # pylint: disable=unused-import
 # pylint: disable=import-error
+from array import array
 
 try:
-    from functools import lru_cache  # @NoMove
+    from urllib.parse import urlparse  # @NoMove
 except ImportError:
-    from cachetools.func import lru_cache  # @NoMove @UnusedImport
+    from urlparse import urlparse  # @NoMove @UnusedImport
+
+try:
+    from time import monotonic  # @NoMove
+except ImportError:
+    from time import time as monotonic  # @NoMove @UnusedImport
+
+UINT32_TYPECODE = 'I' if array('I').itemsize >= 4 else 'L'
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""A single index compiled from contents of many host collections.
+
+Testing URLs with many host collections, for example by combining them
+with URLTesterChain, requires parsing each URL and searching for its
+host once per collection. A CompiledHostIndex stores hosts of all
+the collections in one dictionary, mapping their sort keys to bitmasks
+of the collections listing them, so a host is matched against all of
+them with one dictionary lookup per its parent domain.
+
+Values listed under the same key by many collections may differ, for
+example in letter case. The value of the first of the collections is
+stored with the bitmask, and the ones differing from it are stored
+separately for each of the other collections, like their
+classification.
+"""
+from __future__ import unicode_literals
+
+from .compat import urlparse
+from .exceptions import InvalidHostError
+from .host_collections import IPRangeSet, get_matching_keys, is_network
+from .host_list import HostList
+from .structures import AddressListItem, IPAddress, hostname_or_ip, ip_network
+from .validation import accepts_valid_host, accepts_valid_urls
+
+
+def get_bit_indexes(mask):
+    """Get indexes of bits set in a bitmask.
+
+    :param mask: a non-negative integer
+    :returns: a generator yielding indexes of the set bits, starting
+    with the least significant one
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class CompiledHostIndex(HostList):
+    """A host list combining contents of many host collections.
+
+    The index is built from the current contents of the collections,
+    and it is not updated when they change.
+
+    :ivar sources: a list of the collections, in order of bits
+    representing them in bitmasks returned by the index
+    """
+
+    def __init__(self, host_collections, host_factory=hostname_or_ip):
+        """Initialize a new instance.
+
+        :param host_collections: an iterable containing instances of
+        subclasses of BaseHostCollection
+        :param host_factory: a callable used to create host objects
+        representing values searched in the index
+        """
+        super(CompiledHostIndex, self).__init__(host_factory)
+        self.sources = list(host_collections)
+        self._entries = {}
+        self._values = {}
+        self._classification = {}
+        self._networks = []
+        for index, collection in enumerate(self.sources):
+            self._add_source(index, collection)
+
+    def _add_source(self, index, collection):
+        """Add contents of a host collection to the index.
+
+        :param index: an index of the collection in sources
+        :param collection: an instance of a subclass of
+        BaseHostCollection
+        """
+        # pylint: disable=protected-access
+        bit = 1 << index
+        for key, value, class_id in collection._get_entries():
+            mask, listed_value = self._entries.get(key, (0, value))
+            self._entries[key] = mask | bit, listed_value
+            if value != listed_value:
+                self._values[key, index] = value
+            if class_id:
+                self._classification[key, index] = collection._classes.get(
+                    class_id,
+                    None
+                )
+        if len(collection.networks):
+            networks = IPRangeSet(collection.networks.bounds)
+            self._networks.append((index, networks))
+
+    def __len__(self):
+        """Get the number of distinct hosts stored in the index."""
+        return len(self._entries)
+
+    def _get_mask(self, host_object):
+        """Get a bitmask of collections listing a match for the host.
+
+        :param host_object: an object representing ip address
+        or hostname
+        :returns: an integer with bits set at indexes of the matching
+        collections
+        """
+        mask = 0
+        if isinstance(host_object, IPAddress):
+            for index, networks in self._networks:
+                if networks.find(host_object.value) is not None:
+                    mask |= 1 << index
+        for key in get_matching_keys(host_object.sort_key):
+            entry = self._entries.get(key)
+            if entry is not None:
+                mask |= entry[0]
+        return mask
+
+    def _get_indexed_items(self, host_object):
+        """Get items matching the host in each of the collections.
+
+        :param host_object: an object representing ip address
+        or hostname
+        :returns: a list of tuples containing an index of a collection
+        and an instance of AddressListItem representing the value
+        matching the host in it, ordered by the indexes
+        """
+        matches = []
+        if isinstance(host_object, IPAddress):
+            for index, networks in self._networks:
+                network = networks.find(host_object.value)
+                if network is not None:
+                    value = ip_network(network).to_unicode()
+                    matches.append((index, value, None))
+        for key in get_matching_keys(host_object.sort_key):
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            mask, value = entry
+            matches.extend(
+                (
+                    i,
+                    self._values.get((key, i), value),
+                    self._classification.get((key, i))
+                )
+                for i in get_bit_indexes(mask)
+            )
+        matches.sort(key=lambda match: match[0])
+        return [
+            (i, AddressListItem(
+                value,
+                self.sources[i],
+                _class or self.sources[i].classification
+            )) for i, value, _class in matches
+        ]
+
+    def _get_items(self, host_object):
+        """Get items matching the host in each of the collections.
+
+        :param host_object: an object representing ip address
+        or hostname
+        :returns: a list of instances of AddressListItem representing
+        the matching values, ordered by indexes of the collections
+        listing them
+        """
+        return [item for _, item in self._get_indexed_items(host_object)]
+
+    def _contains(self, host_object):
+        return self._get_mask(host_object) != 0
+
+    def _get_match_and_classification(self, host_object):
+        items = self._get_items(host_object)
+        if not items:
+            return None, None
+        value, _, classification = items[0]
+        factory = ip_network if is_network(value) else self._host_factory
+        return factory(value), classification
+
+    @accepts_valid_host
+    def get_mask(self, host_value):
+        """Get a bitmask of collections listing a match for the host.
+
+        :param host_value: a string representing a valid host
+        :returns: an integer with a bit set at the index of each
+        matching collection in sources
+        :raises InvalidHostError: if the argument is not a valid
+        host string
+        """
+        try:
+            host_object = self._host_factory(host_value)
+        except InvalidHostError:
+            return 0
+        return self._get_mask(host_object)
+
+    def get_sources(self, mask):
+        """Get collections represented by a bitmask.
+
+        :param mask: a bitmask returned by get_mask method
+        :returns: a list of the collections
+        """
+        return [self.sources[i] for i in get_bit_indexes(mask)]
+
+    @accepts_valid_host
+    def lookup_all(self, host_value):
+        """Get values matching the given value in all the collections.
+
+        :param host_value: a string representing a valid host
+        :returns: a list of instances of AddressListItem, each
+        representing a value matching the host in one of
+        the collections, which is its source
+        :raises InvalidHostError: if the argument is not a valid
+        host string
+        """
+        try:
+            host_object = self._host_factory(host_value)
+        except InvalidHostError:
+            return []
+        return self._get_items(host_object)
+
+    @accepts_valid_urls
+    def lookup_matching(self, urls):
+        """Get matching hosts for the given URLs.
+
+        Unlike for other host lists, a host matched in many
+        collections is represented by an item for each of them, with
+        the collection as its source. The items are returned in the same
+        order as by URLTesterChain containing the collections: grouped
+        by the collections, and then ordered like the URLs.
+
+        :param urls: an iterable containing URLs
+        :returns: instances of AddressListItem representing listed
+        hosts matching the ones used by the given URLs
+        :raises InvalidURLError: if there are any invalid URLs in
+        the sequence
+        """
+        matches = []
+        for position, url in enumerate(urls):
+            try:
+                host_object = self._host_factory(urlparse(url).hostname)
+            except InvalidHostError:
+                continue
+            matches.extend(
+                (i, position, item)
+                for i, item in self._get_indexed_items(host_object)
+            )
+        matches.sort(key=lambda match: match[:2])
+        for _, _, item in matches:
+            yield item
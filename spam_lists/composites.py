@@ -5,14 +5,27 @@
 from __future__ import unicode_literals
 
 from builtins import object  # pylint: disable=redefined-builtin
-from requests import Session
-from requests.exceptions import (
-    ConnectionError, InvalidSchema, InvalidURL, Timeout
-)
 
 from .exceptions import InvalidURLError
 from .validation import is_valid_url
 
+_DEFAULT_SESSION = None
+
+
+def get_default_session():
+    """Get a requests session shared by redirect URL resolvers.
+
+    requests is imported only when the session is first needed.
+
+    :returns: an instance of requests.Session, created on the first
+    call and reused afterwards
+    """
+    global _DEFAULT_SESSION  # pylint: disable=global-statement
+    if _DEFAULT_SESSION is None:
+        from requests import Session
+        _DEFAULT_SESSION = Session()
+    return _DEFAULT_SESSION
+
 
 class CachedIterable(object):
     """A class of lazy iterables created from iterators.
@@ -55,15 +68,32 @@ class RedirectURLResolver(object):
     URL but we still couldn't get a response for it
     """
 
-    def __init__(self, requests_session=Session()):
+    def __init__(self, requests_session=None):
         """Initialize a new instance.
 
         :param requests_session: a session object implementing
         methods:
         * head(url) (for HEAD request)
         * resolve_redirects(response, request)
+        or None if the session returned by get_default_session is to be
+        used
         """
-        self.session = requests_session
+        self._session = requests_session
+
+    @property
+    def session(self):
+        """Get the session object used by the resolver."""
+        if self._session is None:
+            self._session = get_default_session()
+        return self._session
+
+    @session.setter
+    def session(self, value):
+        """Set the session object used by the resolver.
+
+        :param value: a session object
+        """
+        self._session = value
 
     def get_locations(self, url):
         """Get valid location header values from responses.
@@ -77,6 +107,10 @@ class RedirectURLResolver(object):
         not, the previous value is the last one.
         :raises ValuError: if the argument is not a valid URL
         """
+        # pylint: disable=redefined-builtin
+        from requests.exceptions import (
+            ConnectionError, InvalidSchema, InvalidURL, Timeout
+        )
         if not is_valid_url(url):
             raise InvalidURLError('{} is not a valid URL'.format(url))
         try:
@@ -182,8 +216,7 @@ class URLTesterChain(object):
 class GeneralizedURLTester(object):
     """A URL tester that can use a redirect resolver and a whitelist."""
 
-    def __init__(self, url_tester, whitelist=None,
-                 redirect_resolver=RedirectURLResolver()):
+    def __init__(self, url_tester, whitelist=None, redirect_resolver=None):
         """Initialize a new instance.
 
         :param url_tester: an object with any_match, filter_matching
@@ -191,10 +224,14 @@ class GeneralizedURLTester(object):
         :param whitelist: an object with a filter_matching method, used
         for filtering URLs to be tested against the url_tester
         :param redirect_resolver: an object used for getting valid
-        location header values to test them with the other URL values.
+        location header values to test them with the other URL values,
+        or None if an instance of RedirectURLResolver using the default
+        session is to be used.
         """
         self.url_tester = url_tester
         self.whitelist = whitelist
+        if redirect_resolver is None:
+            redirect_resolver = RedirectURLResolver()
         self.redirect_resolver = redirect_resolver
 
     def _get_results_for(self, function, urls, resolve_redirects):
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for running queries to host lists concurrently."""
+from __future__ import unicode_literals
+
+from collections import deque
+from threading import Lock
+
+from builtins import object  # pylint: disable=redefined-builtin
+
+
+def map_concurrently(function, values, max_workers, ordered=True):
+    """Call the function for each of the values using a thread pool.
+
+    No more than twice as many calls as there are worker threads are
+    submitted to the pool at any time, so the values may be provided
+    by a long or unbounded iterator.
+
+    :param function: a function to be called
+    :param values: an iterable containing arguments for the function
+    :param max_workers: a maximum number of calls running at
+    the same time
+    :param ordered: if True, the results are yielded in order of
+    the values. Otherwise, they are yielded in order of completion.
+    :returns: a generator yielding tuples containing a value and
+    a result of calling the function for it
+    :raises ValueError: if max_workers is not a positive number
+    """
+    # concurrent.futures is imported on first use, to keep importing
+    # the library fast
+    from concurrent.futures import (
+        ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+    )
+    if max_workers < 1:
+        raise ValueError('max_workers must be greater than 0')
+    window = 2 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if ordered:
+            submitted = deque()
+            for value in values:
+                submitted.append((value, executor.submit(function, value)))
+                if len(submitted) >= window:
+                    value, future = submitted.popleft()
+                    yield value, future.result()
+            for value, future in submitted:
+                yield value, future.result()
+        else:
+            submitted = {}
+            for value in values:
+                submitted[executor.submit(function, value)] = value
+                if len(submitted) >= window:
+                    done, _ = wait(submitted, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield submitted.pop(future), future.result()
+            for future in as_completed(submitted):
+                yield submitted[future], future.result()
+
+
+class SingleFlight(object):
+    """Coalesces concurrent calls made for the same key.
+
+    While a call for a key is in progress, other threads making
+    a call for the same key wait for its result instead of
+    repeating it. All of them receive the value returned by it,
+    or the error raised by it.
+    """
+
+    def __init__(self):
+        """Initialize a new instance."""
+        self._lock = Lock()
+        self._calls = {}
+
+    def call(self, key, function, *args, **kwargs):
+        """Call the function, or wait for a call in progress for the key.
+
+        :param key: a hashable value identifying the call
+        :param function: a function to be called
+        :param args: positional arguments for the function
+        :param kwargs: keyword arguments for the function
+        :returns: a value returned by the function
+        """
+        from concurrent.futures import Future
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._calls[key] = Future()
+        if not is_leader:
+            return future.result()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -41,3 +41,15 @@ class InvalidHostnameError(InvalidHostError):
 
 class InvalidURLError(SpamListsValueError):
     """The value is not a valid URL."""
+
+
+class InvalidZoneEntryError(SpamListsValueError):
+    """The line of a DNSBL zone file is not a valid entry."""
+
+
+class InvalidHostIndexError(SpamListsValueError):
+    """The file is not a valid host index."""
+
+
+class InvalidSnapshotError(SpamListsValueError):
+    """The file is not a valid snapshot of a host collection."""
@@ -2,14 +2,258 @@
 
 """Classes of objects used to create custom host collections."""
 from __future__ import unicode_literals
-from bisect import bisect_right
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+import ipaddress
+from threading import Lock
 
+# pylint: disable=redefined-builtin
+from builtins import range, zip, object
+
+from .bloom import BloomFilter
+from .compat import UINT32_TYPECODE
 from .host_list import HostList
-from .structures import hostname_or_ip
+from .snapshot import read_snapshot, write_snapshot
+from .structures import (
+    SORT_KEY_SEPARATOR, Hostname, IPAddress, get_index_labels,
+    get_sort_key, hostname_or_ip, ip_address, ip_network
+)
+
+
+HostDelta = namedtuple('HostDelta', 'added removed')
+
+
+def is_matching_key(key, listed_key):
+    """Check if a sort key of a host matches a key of a listed host.
+
+    :param key: a sort key of a host object
+    :param listed_key: a sort key of a listed host object
+    :returns: True if both keys are equal, or if the first one is a key
+    of a subdomain of the host represented by the other
+    """
+    return key == listed_key or key.startswith(listed_key + SORT_KEY_SEPARATOR)
+
+
+def get_matching_keys(key):
+    """Get all sort keys of listed hosts that would match a host.
+
+    :param key: a sort key of a host object
+    :returns: a list containing the key and, for a hostname, keys of
+    all its parent domains
+    """
+    if not key.startswith(Hostname.sort_key_prefix):
+        return [key]
+    keys = []
+    end = key.find(SORT_KEY_SEPARATOR)
+    while end != -1:
+        keys.append(key[:end])
+        end = key.find(SORT_KEY_SEPARATOR, end + 1)
+    keys.append(key)
+    return keys
+
+
+def remove_covered(items, merge=None):
+    """Remove items matching other items, after sorting them by keys.
+
+    Since sort keys of subdomains directly follow keys of their parent
+    domains, an item is covered by another one only if it matches
+    the last item kept before it. Of items with equal keys, the one
+    occurring first is kept.
+
+    :param items: a sequence of tuples, each containing a sort key and
+    a value of a host, in order in which the hosts would be added
+    :param merge: a callable called with indexes of a kept item and of
+    an item that is not kept because of having the same key, or None
+    :returns: a list of tuples containing a sort key, an index of
+    the item in the sequence and the value, sorted by the keys
+    """
+    indexed = sorted((k, i, v) for i, (k, v) in enumerate(items))
+    kept = []
+    for item in indexed:
+        if kept and is_matching_key(item[0], kept[-1][0]):
+            if merge is not None and item[0] == kept[-1][0]:
+                merge(kept[-1][1], item[1])
+            continue
+        kept.append(item)
+    return kept
+
+
+def is_network(host_value):
+    """Check if a host value represents a network in CIDR notation.
+
+    :param host_value: a value added to a host collection
+    :returns: True if the value contains a prefix length
+    """
+    return '/' in str(host_value)
+
+
+class IPRangeSet(object):
+    """A set of ranges of ip addresses.
+
+    Each range is stored as integer values of its first and last
+    address, in sorted arrays separate for each version of ip
+    addresses. Overlapping, nested and adjacent ranges are merged when
+    added, so the number of stored ranges is the number of distinct
+    ones, and looking up an address is a single binary search over
+    the first addresses of the ranges.
+    """
+
+    def __init__(self, bounds=None):
+        """Initialize a new instance.
+
+        :param bounds: a value of bounds property of another instance,
+        or None if the set is to be empty
+        """
+        bounds = bounds or {4: ([], []), 6: ([], [])}
+        self._bounds = {
+            4: tuple(array(UINT32_TYPECODE, b) for b in bounds[4]),
+            6: tuple(list(b) for b in bounds[6])
+        }
+
+    @property
+    def bounds(self):
+        """Get the stored ranges.
+
+        :returns: a dictionary mapping versions of ip addresses to
+        tuples containing sequences of integer values of first and last
+        addresses of the ranges
+        """
+        return self._bounds
+
+    def __len__(self):
+        """Get the number of distinct ranges stored in the set."""
+        return sum(len(starts) for starts, _ in self._bounds.values())
+
+    def __iter__(self):
+        """Get an iterator over networks covering the stored ranges.
+
+        :returns: a generator yielding instances of ipaddress.IPv4Network
+        and ipaddress.IPv6Network
+        """
+        factories = (4, ipaddress.IPv4Address), (6, ipaddress.IPv6Address)
+        for version, factory in factories:
+            for start, end in zip(*self._bounds[version]):
+                for network in ipaddress.summarize_address_range(
+                        factory(start),
+                        factory(end)
+                ):
+                    yield network
+
+    def add(self, network):
+        """Add a network to the set.
+
+        :param network: an instance of ipaddress.IPv4Network or
+        ipaddress.IPv6Network
+        """
+        starts, ends = self._bounds[network.version]
+        start = int(network.network_address)
+        end = int(network.broadcast_address)
+        i = bisect_right(starts, start)
+        if i and ends[i-1] + 1 >= start:
+            i -= 1
+            start = starts[i]
+        j = i
+        while j < len(starts) and starts[j] <= end + 1:
+            end = max(end, ends[j])
+            j += 1
+        del starts[i:j]
+        del ends[i:j]
+        starts.insert(i, start)
+        ends.insert(i, end)
+
+    def find(self, address):
+        """Get a network containing the address.
+
+        :param address: an instance of ipaddress.IPv4Address or
+        ipaddress.IPv6Address
+        :returns: the largest network in CIDR notation that contains
+        the address and is included in a stored range, or None if
+        the address does not belong to any of the ranges
+        """
+        starts, ends = self._bounds[address.version]
+        value = int(address)
+        i = bisect_right(starts, value)
+        if not i or ends[i-1] < value:
+            return None
+        factory = type(address)
+        networks = ipaddress.summarize_address_range(
+            factory(starts[i-1]),
+            factory(ends[i-1])
+        )
+        return next(n for n in networks if address in n)
+
+
+class ClassificationTable(object):
+    """A table of interned sets of classification terms.
+
+    Each distinct set is stored once and identified by a small
+    integer, so entries of a collection can refer to their
+    classification with ids stored in a compact array. The id 0 refers
+    to classification of the whole collection, which is not stored in
+    the table.
+    """
+
+    def __init__(self, sets=()):
+        """Initialize a new instance.
+
+        :param sets: a value of sets property of another instance
+        """
+        self._sets = [frozenset(s) for s in sets]
+        self._ids = {s: i + 1 for i, s in enumerate(self._sets)}
+
+    @property
+    def sets(self):
+        """Get a list of the stored sets, ordered by their ids."""
+        return self._sets
+
+    def get_id(self, classification):
+        """Get an id of the given classification.
+
+        :param classification: an iterable containing classification
+        terms, or None for classification of the collection
+        :returns: an id of the set of the terms, added to the table
+        if it was not stored before
+        """
+        if not classification:
+            return 0
+        classification = frozenset(classification)
+        if classification not in self._ids:
+            self._sets.append(classification)
+            self._ids[classification] = len(self._sets)
+        return self._ids[classification]
+
+    def get(self, class_id, default):
+        """Get classification terms with the given id.
+
+        :param class_id: an id of the terms
+        :param default: classification of the collection
+        :returns: a set of the terms
+        """
+        return default if class_id == 0 else self._sets[class_id - 1]
+
+    def merge(self, first_id, second_id, default):
+        """Get an id of a union of classifications with the given ids.
+
+        :param first_id: an id of the first classification
+        :param second_id: an id of the second classification
+        :param default: classification of the collection
+        :returns: an id of a set containing terms of both
+        """
+        if first_id == second_id:
+            return first_id
+        return self.get_id(
+            self.get(first_id, default) | self.get(second_id, default)
+        )
 
 
 class BaseHostCollection(HostList):
-    """Base class for containers storing ip addresses and domain names."""
+    """Base class for containers storing ip addresses and domain names.
+
+    Each entry may have its own classification, stored as an id of
+    a set of terms interned in a ClassificationTable. An entry added
+    without classification has classification of the collection.
+    """
 
     def __init__(
             self,
@@ -23,19 +267,18 @@ class BaseHostCollection(HostList):
         :param identifier: an identifier of this instance of host collection
         :param classification: a list or tuple containing strings representing
         types of items, assigned to each element of the collection
-        :param hosts: an object storing ip adresses and hostnames.
-        It must have the following methods:
-            * __getitem__
-            * __len__
-            * pop
-            * append
+        :param hosts: an iterable containing ip addresses, networks of
+        ip addresses in CIDR notation and hostnames
         :param host_factory: a callable used to create hosts objects stored
         in the collection or representing values searched in it.
         """
+        super(BaseHostCollection, self).__init__(host_factory)
+        self.prefilter = None
         self.identifier = identifier
         self.classification = set(classification)
+        self.networks = IPRangeSet()
+        self._classes = ClassificationTable()
         self.hosts = hosts if hosts is not None else []
-        super(BaseHostCollection, self).__init__(host_factory)
 
     def __len__(self):
         """Get the number of elements in the collection."""
@@ -44,49 +287,304 @@ class BaseHostCollection(HostList):
     def __getitem__(self, index):
         """Get an element of the collection with given index."""
         if isinstance(index, slice):
-            return self.__class__(
-                self.identifier,
-                self.classification,
-                self.hosts[index],
-                self._host_factory
-            )
+            return self._get_slice(index)
         return self._host_factory(self.hosts[index])
 
+    def _get_slice(self, index):
+        """Get a new collection containing a slice of the hosts.
+
+        :param index: a slice of indexes of the hosts
+        :returns: a new instance of the class containing the hosts
+        with their classification, and all networks of the collection
+        """
+        collection = self.__class__(
+            self.identifier,
+            self.classification,
+            host_factory=self._host_factory
+        )
+        collection.networks = IPRangeSet(self.networks.bounds)
+        entries = self._get_entries()[index]
+        if index.step is not None and index.step < 0:
+            entries.reverse()
+        # pylint: disable=protected-access
+        collection._set_entries(entries, self._classes.sets)
+        return collection
+
     def _contains(self, host_object):
-        match = self._get_match(host_object)
+        match = self._find_match(host_object)
         return match is not None
 
     def _get_match_and_classification(self, host_object):
-        match = self._get_match(host_object)
-        _class = None if match is None else self.classification
-        return match, _class
+        match = self._find_match(host_object)
+        if match is None:
+            return None, None
+        item, class_id = match
+        return item, self._classes.get(class_id, self.classification)
+
+    def _find_match(self, host_object):
+        """Get a network or an item matching the given host object.
 
-    def add(self, host_value):
+        :param host_object: an object representing ip address
+        or hostname whose match we are trying to find
+        :returns: a tuple containing an object representing a matching
+        network or item and an id of its classification, or None if
+        there is no match
+        """
+        network = self._find_network(host_object)
+        if network is not None:
+            return ip_network(network), 0
+        if self.prefilter is None:
+            match = self._get_match(host_object)
+        else:
+            keys = get_matching_keys(host_object.sort_key)
+            if not any(k in self.prefilter for k in keys):
+                self.prefilter.record_true_negative()
+                return None
+            match = self._get_match(host_object)
+            if match is None:
+                self.prefilter.record_false_positive()
+        if match is None:
+            return None
+        value, class_id = match
+        return self._host_factory(value), class_id
+
+    def _get_match(self, host_object):
+        """Get a listed value matching the given host object.
+
+        The value may be either a parent domain or identical value.
+
+        :param host_object: an object representing ip address
+        or hostname whose match we are trying to find
+        :returns: a tuple containing the matching value and an id of its
+        classification, or None if there is no match
+        """
+        raise NotImplementedError
+
+    def build_prefilter(self, false_positive_rate=0.01, capacity=None):
+        """Create a Bloom filter rejecting hosts missing from the collection.
+
+        The filter stores sort keys of the listed hosts. A host is
+        looked up in the collection only if the filter may contain its
+        key or a key of any of its parent domains, so most values that
+        are not listed are rejected without searching the collection.
+        Since the filter is tested with each of these keys, the actual
+        false positive rate for a hostname grows with the number of its
+        labels. It is measured by the filter as the hosts are looked up.
+
+        Hosts added to the collection later are also added to
+        the filter, but the probability of false positive results
+        grows when their number exceeds the capacity of the filter.
+
+        :param false_positive_rate: the expected probability of
+        searching the collection for a host that is not listed
+        :param capacity: the expected number of hosts in the collection,
+        or None if it is the current number of hosts
+        :returns: the new filter, also available as prefilter attribute
+        of the collection
+        """
+        entries = self._get_entries()
+        if capacity is None:
+            capacity = max(1, len(entries))
+        self.prefilter = BloomFilter(capacity, false_positive_rate)
+        self._add_to_prefilter(k for k, _, _ in entries)
+        return self.prefilter
+
+    def _add_to_prefilter(self, keys):
+        if self.prefilter is not None:
+            for key in keys:
+                self.prefilter.add(key)
+
+    def add(self, host_value, classification=None):
         """Add the given value to the collection.
 
-        :param host: an ip address or a hostname
+        If the value is already listed, its classification is extended
+        with the given one.
+
+        :param host_value: an ip address, a network of ip addresses in
+        CIDR notation or a hostname
+        :param classification: an iterable containing classification
+        terms of the value, or None if the value has classification of
+        the collection. Networks always have classification of
+        the collection.
         :raises InvalidHostError: raised when the given value
-        is not a valid ip address nor a hostname
+        is not a valid ip address, ip network nor a hostname
         """
-        host_obj = self._host_factory(host_value)
-        if self._get_match(host_obj) is not None:
+        if is_network(host_value):
+            self._add_network(ip_network(host_value))
             return
-        self._add_new(host_obj)
+        host_object = self._host_factory(host_value)
+        class_id = self._classes.get_id(classification)
+        if self._find_network(host_object) is not None:
+            return
+        if self._add_host(host_object, class_id):
+            self._add_to_prefilter([host_object.sort_key])
 
-    def _add_new(self, host_object):
-        """Add a new host to the collection.
+    def update(self, host_values, classification=None):
+        """Add the given values to the collection.
+
+        :param host_values: an iterable containing ip addresses,
+        networks of ip addresses in CIDR notation and hostnames
+        :param classification: an iterable containing classification
+        terms of the values, or None if they have classification of
+        the collection
+        :raises InvalidHostError: raised when any of the given values
+        is not a valid ip address, ip network nor a hostname
+        """
+        for host_value in host_values:
+            self.add(host_value, classification)
+
+    def _add_networks(self, host_values):
+        """Add networks included in the given values.
+
+        :param host_values: an iterable containing ip addresses,
+        networks of ip addresses and hostnames
+        :returns: a list of the values that are not networks
+        """
+        remaining = []
+        for host_value in host_values:
+            if is_network(host_value):
+                self._add_network(ip_network(host_value))
+            else:
+                remaining.append(host_value)
+        return remaining
+
+    def _add_network(self, network_object):
+        """Add a network and remove listed addresses belonging to it.
+
+        :param network_object: an object representing a network of
+        ip addresses
+        """
+        self.networks.add(network_object.value)
+        self._remove_addresses(network_object)
+
+    def _remove_addresses(self, network_object):
+        """Remove listed ip addresses belonging to the network.
+
+        :param network_object: an object representing a network of
+        ip addresses
+        """
+        raise NotImplementedError
+
+    def _merge_class_ids(self, first_id, second_id):
+        return self._classes.merge(first_id, second_id, self.classification)
+
+    def _remove_covered(self, items, class_ids):
+        """Remove covered items, merging classification of equal ones.
+
+        :param items: a list of tuples containing sort keys and values
+        of hosts, in order in which they would be added
+        :param class_ids: a list of ids of classification of the items.
+        Ids of kept items are replaced with ids of classification merged
+        with that of removed equal items.
+        :returns: a list of tuples containing a sort key, an index of
+        the item in the list and the value, sorted by the keys
+        """
+        def merge(kept_index, index):
+            class_ids[kept_index] = self._merge_class_ids(
+                class_ids[kept_index],
+                class_ids[index]
+            )
+
+        return remove_covered(items, merge)
+
+    def save(self, path):
+        """Save a snapshot of the collection to a file.
+
+        :param path: a path of the file
+        """
+        entries = sorted(self._get_entries())
+        entry_classification = None
+        if self._classes.sets:
+            entry_classification = (
+                self._classes.sets,
+                [c for _, _, c in entries]
+            )
+        write_snapshot(
+            path,
+            self.identifier,
+            self.classification,
+            [(k, v) for k, v, _ in entries],
+            self.networks.bounds,
+            entry_classification
+        )
+
+    @classmethod
+    def load(cls, path, host_factory=hostname_or_ip):
+        """Create a collection from a snapshot saved to a file.
+
+        The hosts stored in the snapshot are neither parsed nor
+        validated again.
+
+        :param path: a path of the file
+        :param host_factory: a callable used to create hosts objects
+        stored in the collection or representing values searched in it
+        :returns: a new instance of the class
+        :raises InvalidSnapshotError: if the file is not a valid
+        snapshot
+        """
+        identifier, classification, items, bounds, entry_classification = (
+            read_snapshot(path)
+        )
+        class_sets, class_ids = entry_classification
+        if not class_ids:
+            class_ids = [0] * len(items)
+        collection = cls(identifier, classification, host_factory=host_factory)
+        collection.networks = IPRangeSet(bounds)
+        # pylint: disable=protected-access
+        collection._set_entries(
+            [(k, v, c) for (k, v), c in zip(items, class_ids)],
+            class_sets
+        )
+        return collection
+
+    def _get_entries(self):
+        """Get sort keys, values and classification ids of the hosts.
+
+        :returns: a list of tuples containing a sort key, a value and
+        an id of classification of each host, in order of the hosts
+        property
+        """
+        raise NotImplementedError
+
+    def _set_entries(self, entries, class_sets):
+        """Replace the hosts with the given entries.
+
+        :param entries: a list of tuples containing sort keys, values
+        and classification ids of hosts not covered by each other,
+        sorted by the keys or in order of the hosts property of
+        a collection of the same class
+        :param class_sets: a list of sets of classification terms
+        referred to by the ids
+        """
+        raise NotImplementedError
+
+    def _get_sort_items(self, host_values):
+        host_objects = (self._host_factory(v) for v in host_values)
+        return [
+            (h.sort_key, h.to_unicode()) for h in host_objects
+            if self._find_network(h) is None
+        ]
+
+    def _find_network(self, host_object):
+        if isinstance(host_object, IPAddress):
+            return self.networks.find(host_object.value)
+        return None
+
+    def _add_host(self, host_object, class_id):
+        """Add a host to the collection, unless a match is listed.
 
         A new host is defined as a value not currently listed
         (in case of both hostnames and ip) or not currently covered by
         another value, for eaxmple: a hostname whose parent domain is
-        not yet listed.
+        not yet listed. If the same value is already listed, its
+        classification is merged with the given one.
 
         Before a new hostname can be added, all its subdomains already
         present in the collection must be removed.
 
-        :param host_obj: an object representing value to be added.
-        It is assumed that, during execution of this method,
-        the value to be added is not currently listed.
+        :param host_object: an object representing value to be added
+        :param class_id: an id of classification of the value
+        :returns: True if the host was added
         """
         raise NotImplementedError
 
@@ -97,23 +595,331 @@ class HostCollection(BaseHostCollection):
     May be used as a local whitelist or blacklist.
     """
 
-    def _get_match(self, host_object):
-        for val in self:
+    @property
+    def hosts(self):
+        """Get values stored in the collection.
+
+        :returns: a tuple containing the values. It is a copy, so
+        it does not change when the collection is modified.
+        """
+        return tuple(self._hosts)
+
+    @hosts.setter
+    def hosts(self, values):
+        """Replace values stored in the collection.
+
+        :param values: an iterable containing ip addresses, networks of
+        ip addresses in CIDR notation and hostnames
+        """
+        self.networks = IPRangeSet()
+        self._hosts = []
+        self._class_ids = array(UINT32_TYPECODE)
+        self._classes = ClassificationTable()
+        self.update(values)
+
+    def __len__(self):
+        """Get the number of elements in the collection."""
+        return len(self._hosts)
+
+    def __getitem__(self, index):
+        """Get an element of the collection with given index."""
+        if isinstance(index, slice):
+            return self._get_slice(index)
+        return self._host_factory(self._hosts[index])
+
+    def _find_index(self, host_object):
+        for i, val in enumerate(self):
             if host_object.is_match(val):
-                return val
+                return i
+        return None
+
+    def _get_match(self, host_object):
+        i = self._find_index(host_object)
+        if i is None:
+            return None
+        return self._hosts[i], self._class_ids[i]
+
+    def _add_host(self, host_object, class_id):
+        i = self._find_index(host_object)
+        if i is not None:
+            if self[i].sort_key == host_object.sort_key:
+                self._class_ids[i] = self._merge_class_ids(
+                    self._class_ids[i],
+                    class_id
+                )
+            return False
+        for i in reversed(range(len(self))):
+            if self[i].is_subdomain(host_object):
+                self._hosts.pop(i)
+                self._class_ids.pop(i)
+        self._hosts.append(host_object.to_unicode())
+        self._class_ids.append(class_id)
+        return True
+
+    def _remove_addresses(self, network_object):
+        for i in reversed(range(len(self._hosts))):
+            if network_object.is_match(self[i]):
+                self._hosts.pop(i)
+                self._class_ids.pop(i)
+
+    def _get_entries(self):
+        return [
+            (self._host_factory(v).sort_key, v, c)
+            for v, c in zip(self._hosts, self._class_ids)
+        ]
+
+    def _set_entries(self, entries, class_sets):
+        self._hosts = [v for _, v, _ in entries]
+        self._class_ids = array(UINT32_TYPECODE, (c for _, _, c in entries))
+        self._classes = ClassificationTable(class_sets)
+
+    def update(self, host_values, classification=None):
+        """Add the given values to the collection.
 
-    def _add_new(self, host_obj):
-        for i, listed_obj in enumerate(self):
-            if listed_obj.is_subdomain(host_obj):
-                self.hosts.pop(i)
-        self.hosts.append(host_obj.to_unicode())
+        The contents of the collection are the same as after adding
+        the values one by one, but instead of scanning the collection
+        for each of them, all values are sorted once and the covered
+        ones are removed in a single pass.
+
+        :param host_values: an iterable containing ip addresses and
+        hostnames
+        :param classification: an iterable containing classification
+        terms of the values, or None if they have classification of
+        the collection
+        :raises InvalidHostError: raised when any of the given values
+        is not a valid ip address nor a hostname
+        """
+        host_values = self._add_networks(host_values)
+        new_items = self._get_sort_items(host_values)
+        class_id = self._classes.get_id(classification)
+        self._add_to_prefilter(k for k, _ in new_items)
+        items = [(k, v) for k, v, _ in self._get_entries()]
+        items.extend(new_items)
+        class_ids = list(self._class_ids)
+        class_ids.extend([class_id] * len(new_items))
+        kept = self._remove_covered(items, class_ids)
+        kept.sort(key=lambda item: item[1])
+        self._hosts = [v for _, _, v in kept]
+        self._class_ids = array(
+            UINT32_TYPECODE,
+            (class_ids[i] for _, i, _ in kept)
+        )
 
 
 class SortedHostCollection(BaseHostCollection):
-    """Represents a custom sorted collection of hosts."""
+    """Represents a custom sorted collection of hosts.
+
+    Sort keys of the hosts and ids of their classification are
+    stored in a list and an array parallel to the list of host values,
+    so searching the collection requires no creation of host objects
+    for the listed values.
+    """
+
+    @property
+    def hosts(self):
+        """Get values stored in the collection.
+
+        :returns: a tuple containing the values, sorted by their sort
+        keys. It is a copy, so it does not change when the collection
+        is modified.
+        """
+        return tuple(self._hosts)
+
+    @hosts.setter
+    def hosts(self, values):
+        """Replace values stored in the collection.
+
+        :param values: an iterable containing ip addresses, networks of
+        ip addresses in CIDR notation and hostnames
+        """
+        self.networks = IPRangeSet()
+        self._keys = []
+        self._hosts = []
+        self._class_ids = array(UINT32_TYPECODE)
+        self._classes = ClassificationTable()
+        self.update(values)
+
+    def __len__(self):
+        """Get the number of elements in the collection."""
+        return len(self._hosts)
+
+    def __getitem__(self, index):
+        """Get an element of the collection with given index."""
+        if isinstance(index, slice):
+            return self._get_slice(index)
+        return self._host_factory(self._hosts[index])
+
+    def _add_host(self, host_object, class_id):
+        key = host_object.sort_key
+        i = self._get_insertion_point(key)
+        if i and is_matching_key(key, self._keys[i-1]):
+            if key == self._keys[i-1]:
+                self._class_ids[i-1] = self._merge_class_ids(
+                    self._class_ids[i-1],
+                    class_id
+                )
+            return False
+        self._add_new(host_object, class_id)
+        return True
+
+    def update(self, host_values, classification=None):
+        """Add the given values to the collection.
+
+        The contents of the collection are the same as after adding
+        the values one by one, but instead of inserting each of them
+        into the sorted lists, all values are sorted once and
+        the covered ones are removed in a single pass.
+
+        :param host_values: an iterable containing ip addresses and
+        hostnames
+        :param classification: an iterable containing classification
+        terms of the values, or None if they have classification of
+        the collection
+        :raises InvalidHostError: raised when any of the given values
+        is not a valid ip address nor a hostname
+        """
+        host_values = self._add_networks(host_values)
+        new_items = self._get_sort_items(host_values)
+        class_id = self._classes.get_id(classification)
+        self._add_to_prefilter(k for k, _ in new_items)
+        items = list(zip(self._keys, self._hosts))
+        items.extend(new_items)
+        class_ids = array(UINT32_TYPECODE, self._class_ids)
+        class_ids.extend([class_id] * len(new_items))
+        kept = self._remove_covered(items, class_ids)
+        self._keys = [k for k, _, _ in kept]
+        self._hosts = [v for _, _, v in kept]
+        self._class_ids = array(
+            UINT32_TYPECODE,
+            (class_ids[i] for _, i, _ in kept)
+        )
+
+    def apply_delta(self, added, removed, classification=None):
+        """Add and remove the given values.
+
+        The values to be removed are removed first, and then
+        the values to be added are added, with the same result as
+        removing and adding them one by one. Each value is located in
+        the collection with a binary search, and the collection is
+        rebuilt by copying unchanged slices of it, so applying
+        the delta takes O(n + k log n) time for n listed and k given
+        values, with only O(k log n) steps executed by the interpreter.
+
+        :param added: an iterable containing ip addresses and hostnames
+        to be added
+        :param removed: an iterable containing ip addresses and
+        hostnames to be removed. Values that are not listed, including
+        subdomains of listed domains, are ignored.
+        :param classification: an iterable containing classification
+        terms of the added values, or None if they have classification
+        of the collection
+        :returns: an instance of HostDelta containing lists of values
+        actually added to and removed from the collection. Removed
+        values include the ones replaced by their added parent domains.
+        :raises InvalidHostError: if any of the given values is not
+        a valid ip address nor a hostname. The collection is not
+        modified in such a case.
+        """
+        keys, hosts = self._keys, self._hosts
+        removed_indexes = set()
+        for host_value in removed:
+            key = self._host_factory(host_value).sort_key
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                removed_indexes.add(i)
+        new_items = remove_covered(self._get_sort_items(added))
+        class_id = self._classes.get_id(classification)
+        class_ids = array(UINT32_TYPECODE, self._class_ids)
+        insertions = []
+        for key, _, value in new_items:
+            i = bisect_right(keys, key)
+            if i and i - 1 not in removed_indexes and is_matching_key(
+                    key, keys[i-1]):
+                if key == keys[i-1]:
+                    class_ids[i-1] = self._merge_class_ids(
+                        class_ids[i-1],
+                        class_id
+                    )
+                continue
+            j = i
+            while j < len(keys) and is_matching_key(keys[j], key):
+                removed_indexes.add(j)
+                j += 1
+            insertions.append((i, key, value))
+        new_keys, new_hosts = [], []
+        new_class_ids = array(UINT32_TYPECODE)
+        start = 0
+        pending = iter(insertions)
+        insertion = next(pending, None)
+        positions = removed_indexes.union(i for i, _, _ in insertions)
+        for position in sorted(positions):
+            new_keys.extend(keys[start:position])
+            new_hosts.extend(hosts[start:position])
+            new_class_ids.extend(class_ids[start:position])
+            while insertion is not None and insertion[0] == position:
+                new_keys.append(insertion[1])
+                new_hosts.append(insertion[2])
+                new_class_ids.append(class_id)
+                insertion = next(pending, None)
+            start = position + 1 if position in removed_indexes else position
+        new_keys.extend(keys[start:])
+        new_hosts.extend(hosts[start:])
+        new_class_ids.extend(class_ids[start:])
+        self._keys, self._hosts = new_keys, new_hosts
+        self._class_ids = new_class_ids
+        self._add_to_prefilter(k for _, k, _ in insertions)
+        return self._get_delta(
+            [(k, v) for _, k, v in insertions],
+            [(keys[i], hosts[i]) for i in sorted(removed_indexes)]
+        )
+
+    @staticmethod
+    def _get_delta(added, removed):
+        """Get values changed by adding and removing items.
+
+        :param added: a list of tuples containing sort keys and values
+        of added hosts
+        :param removed: a list of tuples containing sort keys and values
+        of removed hosts
+        :returns: an instance of HostDelta containing values of added
+        and removed hosts, except for the ones both removed and added
+        """
+        unchanged = set(added).intersection(removed)
+        return HostDelta(
+            [v for k, v in added if (k, v) not in unchanged],
+            [v for k, v in removed if (k, v) not in unchanged]
+        )
+
+    def _get_entries(self):
+        return list(zip(self._keys, self._hosts, self._class_ids))
+
+    def _set_entries(self, entries, class_sets):
+        self._keys = [k for k, _, _ in entries]
+        self._hosts = [v for _, v, _ in entries]
+        self._class_ids = array(UINT32_TYPECODE, (c for _, _, c in entries))
+        self._classes = ClassificationTable(class_sets)
+
+    def _remove_addresses(self, network_object):
+        """Remove listed ip addresses belonging to the network.
 
-    def _get_insertion_point(self, host_obj):
-        return bisect_right(self, host_obj)
+        Sort keys of ip addresses of the same version differ only in
+        their packed values, so the addresses belonging to the network
+        form a contiguous slice of the collection.
+
+        :param network_object: an object representing a network of
+        ip addresses
+        """
+        network = network_object.value
+        first = ip_address(str(network.network_address)).sort_key
+        last = ip_address(str(network.broadcast_address)).sort_key
+        start = bisect_left(self._keys, first)
+        end = bisect_right(self._keys, last)
+        del self._keys[start:end]
+        del self._hosts[start:end]
+        del self._class_ids[start:end]
+
+    def _get_insertion_point(self, key):
+        return bisect_right(self._keys, key)
 
     def _get_match(self, host_object):
         """Get an item matching the given host object.
@@ -125,36 +931,366 @@ class SortedHostCollection(BaseHostCollection):
 
         :param host_object: an object representing ip address
         or hostname whose match we are trying to find
+        :returns: a tuple containing the matching value and an id of its
+        classification, or None if there is no match
         """
-        i = self._get_insertion_point(host_object)
-        potential_match = None
-        try:
-            potential_match = self[i-1]
-        except IndexError:
-            pass
-
-        if host_object.is_match(potential_match):
-            return potential_match
+        key = host_object.sort_key
+        i = self._get_insertion_point(key)
+        if i and is_matching_key(key, self._keys[i-1]):
+            return self._hosts[i-1], self._class_ids[i-1]
         return None
 
-    def _add_new(self, host_object):
+    def _add_new(self, host_object, class_id=0):
         """Add a new host to the collection.
 
         Before a new hostname can be added, all its subdomains already
         present in the collection must be removed. Since the collection
-        is sorted, we can limit our search for them to a slice of
-        the collection starting from insertion point and ending with
-        the last detected subdomain.
+        is sorted, they directly follow the insertion point.
 
         :param host_obj: an object representing value to be added.
         It is assumed that, during execution of this method,
         the value to be added is not currently listed.
+        :param class_id: an id of classification of the value
+        """
+        key = host_object.sort_key
+        i = j = self._get_insertion_point(key)
+        while j < len(self._keys) and is_matching_key(self._keys[j], key):
+            j += 1
+        self._keys[i:j] = [key]
+        self._hosts[i:j] = [host_object.to_unicode()]
+        self._class_ids[i:j] = array(UINT32_TYPECODE, [class_id])
+
+
+_LISTED = None
+
+
+class TrieHostCollection(BaseHostCollection):
+    """Represents a custom host collection indexed by a trie.
+
+    Hosts are stored in a trie of nested dictionaries, keyed by
+    the index labels of host objects: labels of a hostname, starting
+    with its top-level domain, or a value of an ip address. A match for
+    a host is found in a number of steps equal to the number of its
+    labels, regardless of the size of the collection.
+
+    A node of a listed value stores the value and an id of its
+    classification. A list of the stored entries, sorted by their sort
+    keys, is built from the trie when first requested, and reused until
+    the collection is modified.
+    """
+
+    @property
+    def hosts(self):
+        """Get a list of values stored in the collection.
+
+        :returns: a tuple containing the values, sorted by their sort
+        keys
+        """
+        if self._hosts is None:
+            self._hosts = tuple(v for _, v, _ in self._get_entries())
+        return self._hosts
+
+    @hosts.setter
+    def hosts(self, values):
+        """Replace values stored in the collection.
+
+        :param values: an iterable containing ip addresses, networks of
+        ip addresses in CIDR notation and hostnames
         """
-        i = self._get_insertion_point(host_object)
+        self.networks = IPRangeSet()
+        self._root = {}
+        self._size = 0
+        self._classes = ClassificationTable()
+        self._clear_cache()
+        self.update(values)
 
-        for listed in self[i:]:
-            if not listed.is_subdomain(host_object):
+    def _clear_cache(self):
+        self._entries = None
+        self._hosts = None
+
+    @staticmethod
+    def _iter_listed(node):
+        """Get nodes of listed values in a subtree of the trie.
+
+        :param node: the root of the subtree
+        :returns: a generator yielding nodes containing listed values
+        """
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if _LISTED in node:
+                yield node
+            stack.extend(v for k, v in node.items() if k is not _LISTED)
+
+    def __len__(self):
+        """Get the number of elements in the collection."""
+        return self._size
+
+    def _get_entries(self):
+        if self._entries is None:
+            entries = []
+            stack = [((), self._root)]
+            while stack:
+                labels, node = stack.pop()
+                if _LISTED in node:
+                    value, class_id = node[_LISTED]
+                    entries.append((get_sort_key(labels), value, class_id))
+                    continue
+                stack.extend((labels + (k,), v) for k, v in node.items())
+            entries.sort()
+            self._entries = entries
+        return self._entries
+
+    def _set_entries(self, entries, class_sets):
+        self._root = {}
+        for key, value, class_id in entries:
+            node = self._root
+            for label in get_index_labels(key):
+                node = node.setdefault(label, {})
+            node[_LISTED] = value, class_id
+        self._size = len(entries)
+        self._classes = ClassificationTable(class_sets)
+        self._clear_cache()
+
+    def _remove_addresses(self, network_object):
+        """Remove listed ip addresses belonging to the network.
+
+        Ip addresses are stored as labels of the root of the trie.
+
+        :param network_object: an object representing a network of
+        ip addresses
+        """
+        network = network_object.value
+        covered = [
+            k for k in self._root
+            if getattr(k, 'version', None) == network.version and k in network
+        ]
+        for label in covered:
+            del self._root[label]
+        self._size -= len(covered)
+        if covered:
+            self._clear_cache()
+
+    def __iter__(self):
+        """Get an iterator over host objects stored in the collection."""
+        return (self._host_factory(h) for h in self.hosts)
+
+    def _get_match(self, host_object):
+        """Get a listed value matching the given host object.
+
+        The value may be either a parent domain or identical value.
+        Since the collection contains no values matching other listed
+        values, the first listed node found on the path of the labels
+        of the host object contains the match.
+
+        :param host_object: an object representing ip address
+        or hostname whose match we are trying to find
+        :returns: a tuple containing the matching value and an id of its
+        classification, or None if there is no match
+        """
+        node = self._root
+        for label in host_object.index_labels:
+            node = node.get(label)
+            if node is None:
+                return None
+            if _LISTED in node:
+                return node[_LISTED]
+        return None
+
+    def _add_host(self, host_object, class_id):
+        labels = host_object.index_labels
+        node = self._root
+        for depth, label in enumerate(labels, 1):
+            node = node.get(label)
+            if node is None:
                 break
-            self.hosts.pop(i)
+            if _LISTED in node:
+                if depth == len(labels):
+                    value, listed_id = node[_LISTED]
+                    node[_LISTED] = value, self._merge_class_ids(
+                        listed_id,
+                        class_id
+                    )
+                    self._clear_cache()
+                return False
+        self._add_new(host_object, class_id)
+        return True
+
+    def _add_new(self, host_object, class_id):
+        """Add a new host to the collection.
+
+        Subdomains of the new host, already present in the collection,
+        are stored in the subtree of the node of the host, so they are
+        removed by clearing the node.
+
+        :param host_obj: an object representing value to be added.
+        It is assumed that, during execution of this method,
+        the value to be added is not currently listed.
+        :param class_id: an id of classification of the value
+        """
+        node = self._root
+        for label in host_object.index_labels:
+            node = node.setdefault(label, {})
+        self._size -= sum(1 for _ in self._iter_listed(node))
+        node.clear()
+        node[_LISTED] = host_object.to_unicode(), class_id
+        self._size += 1
+        self._clear_cache()
+
+
+class ReloadableHostList(HostList):
+    """A host list using a host collection that can be replaced.
+
+    Lookups are delegated to the current collection, which is never
+    modified after being published. A new collection is built
+    separately and published by replacing a single reference to it, so
+    readers are never blocked and each lookup uses either the old or
+    the new contents, never a partially built collection.
+
+    Reloads are serialized, so at most one new collection is built at
+    a time, and the old collection is released as soon as lookups in
+    progress finish using it.
 
-        self.hosts.insert(i, host_object.to_unicode())
+    Each lookup is delegated as a whole to the collection published
+    when it starts, so host objects are always created by the host
+    factory of the collection in which they are searched.
+
+    If the current collection has a prefilter, a collection created
+    by reload or reload_snapshot gets a new one, built for its contents
+    with the same expected false positive rate.
+    """
+
+    def __init__(self, collection):
+        """Initialize a new instance.
+
+        :param collection: an instance of a subclass of
+        BaseHostCollection containing initial contents of the list
+        """
+        super(ReloadableHostList, self).__init__(None)
+        self._collection = collection
+        self._reload_lock = Lock()
+
+    @property
+    def collection(self):
+        """Get the currently published host collection."""
+        return self._collection
+
+    @property
+    def identifier(self):
+        """Get an identifier of the current collection."""
+        return self._collection.identifier
+
+    @property
+    def classification(self):
+        """Get classification of items of the current collection."""
+        return self._collection.classification
+
+    def __len__(self):
+        """Get the number of elements in the current collection."""
+        return len(self._collection)
+
+    def __contains__(self, host_value):
+        """Check if the given host value is listed by the current collection.
+
+        :param host_value: a string representing a valid host
+        :returns: True if the host is listed
+        :raises InvalidHostError: if the argument is not a valid
+        host string
+        """
+        return host_value in self._collection
+
+    def lookup(self, host_value):
+        """Get a value of the current collection matching the given value.
+
+        :param host_value: a value of the host of a type that can be
+        listed by the collection
+        :returns: an instance of AddressListItem representing
+        a matched value, with this object as its source
+        :raises InvalidHostError: if the argument is not a valid
+        host string
+        """
+        item = self._collection.lookup(host_value)
+        if item is None:
+            return None
+        return item._replace(source=self)
+
+    def swap(self, collection):
+        """Publish a new host collection.
+
+        The collection must not be modified after being published.
+
+        :param collection: an instance of a subclass of
+        BaseHostCollection
+        :returns: the previously published collection
+        """
+        with self._reload_lock:
+            previous, self._collection = self._collection, collection
+        return previous
+
+    def reload(self, host_values, classification=None):
+        """Replace contents of the list with the given values.
+
+        A new collection of the same class, identifier, classification
+        and host factory as the current one is built from the values,
+        and then published.
+
+        :param host_values: an iterable containing ip addresses,
+        networks of ip addresses in CIDR notation and hostnames, or
+        a dictionary mapping such values to iterables containing
+        classification terms of each of them
+        :param classification: an iterable containing classification
+        terms of values that are not given in a dictionary, or None if
+        they have classification of the collection
+        :raises InvalidHostError: if any of the values is not a valid
+        host. The current collection remains published.
+        """
+        groups = {}
+        if isinstance(host_values, dict):
+            for host_value, terms in host_values.items():
+                groups.setdefault(frozenset(terms or ()), []).append(
+                    host_value
+                )
+        else:
+            groups[frozenset(classification or ())] = host_values
+        with self._reload_lock:
+            current = self._collection
+            # pylint: disable=protected-access
+            collection = current.__class__(
+                current.identifier,
+                current.classification,
+                host_factory=current._host_factory
+            )
+            for terms, values in groups.items():
+                collection.update(values, terms)
+            self._publish(collection)
+
+    def reload_snapshot(self, path):
+        """Replace contents of the list with a saved snapshot.
+
+        :param path: a path of a snapshot file saved by a collection of
+        the same class as the current one
+        :raises InvalidSnapshotError: if the file is not a valid
+        snapshot. The current collection remains published.
+        """
+        with self._reload_lock:
+            current = self._collection
+            # pylint: disable=protected-access
+            collection = current.__class__.load(
+                path,
+                current._host_factory
+            )
+            self._publish(collection)
+
+    def _publish(self, collection):
+        """Publish a collection built to replace the current one.
+
+        A prefilter is built for the new collection if the current one
+        has it.
+
+        :param collection: an instance of a subclass of
+        BaseHostCollection
+        """
+        prefilter = self._collection.prefilter
+        if prefilter is not None:
+            collection.build_prefilter(prefilter.target_false_positive_rate)
+        self._collection = collection
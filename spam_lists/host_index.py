@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+
+"""A compact on-disk index of hosts, searched without loading it.
+
+An index file contains sort keys of listed hosts, sorted and with
+the hosts covered by other ones removed, like the contents of
+a SortedHostCollection. Its layout is the following:
+
+    * a header: an 8-byte magic value, a 4-byte version of the format
+    and an 8-byte number of keys
+    * a table of 8-byte offsets of the keys, relative to the end of
+    the table, followed by an offset of the end of the last key
+    * the keys
+
+All numbers are unsigned and little-endian.
+
+HostIndex instances map the file into memory and binary-search it in
+place, so opening an index takes the same time regardless of its size,
+and many processes using the same file share a single copy of it in
+the page cache.
+
+An index file can be built by calling build_host_index function or by
+running this module:
+
+    python -m spam_lists.host_index hosts.txt hosts.idx
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import io
+import mmap
+import struct
+
+# pylint: disable=redefined-builtin
+from builtins import str, range
+from future.utils import native_str
+
+from .exceptions import InvalidHostIndexError
+from .host_collections import is_matching_key, remove_covered
+from .host_list import HostList
+from .structures import get_index_labels, hostname_or_ip
+
+
+MAGIC = b'SPAMLIDX'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct(native_str('<8sIQ'))
+_OFFSET = struct.Struct(native_str('<Q'))
+_OFFSET_PAIR = struct.Struct(native_str('<QQ'))
+
+
+def get_host_value(sort_key):
+    """Get a host value represented by a sort key of a host object.
+
+    :param sort_key: a sort key of a hostname or an ip address
+    :returns: a string representing the host
+    """
+    labels = get_index_labels(sort_key)
+    if hasattr(labels[0], 'version'):
+        return str(labels[0])
+    return '.'.join(label.decode('utf-8') for label in reversed(labels))
+
+
+def write_host_index(index_file, keys):
+    """Write sorted keys of hosts in the index format.
+
+    :param index_file: a binary file to which the index is written
+    :param keys: a sorted list of keys of hosts not covered by each
+    other
+    """
+    index_file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(keys)))
+    offset = 0
+    for key in keys:
+        index_file.write(_OFFSET.pack(offset))
+        offset += len(key)
+    index_file.write(_OFFSET.pack(offset))
+    for key in keys:
+        index_file.write(key)
+
+
+def build_host_index(path, host_values, host_factory=hostname_or_ip):
+    """Build an index file for the given host values.
+
+    :param path: a path of the index file to be created
+    :param host_values: an iterable containing ip addresses and
+    hostnames
+    :param host_factory: a callable used to create host objects for
+    the values
+    :returns: the number of hosts stored in the index. It may be
+    smaller than the number of the values, because duplicates and
+    subdomains of listed domains are not stored.
+    :raises InvalidHostError: if any of the values is not a valid
+    host accepted by the host factory
+    """
+    items = [(host_factory(v).sort_key, None) for v in host_values]
+    keys = [k for k, _, _ in remove_covered(items)]
+    with io.open(path, 'wb') as index_file:
+        write_host_index(index_file, keys)
+    return len(keys)
+
+
+class HostIndex(HostList):
+    """A host list searching an index file mapped into memory.
+
+    :ivar identifier: an identifier of the index
+    :ivar classification: a set of strings representing types of
+    items, assigned to each element of the index
+    """
+
+    def __init__(
+            self,
+            identifier,
+            classification,
+            path,
+            host_factory=hostname_or_ip
+    ):
+        """Initialize a new instance.
+
+        :param identifier: an identifier of the index
+        :param classification: a list or tuple containing strings
+        representing types of items, assigned to each element of
+        the index
+        :param path: a path of the index file
+        :param host_factory: a callable used to create host objects
+        representing values searched in the index
+        :raises InvalidHostIndexError: if the file is not a valid index
+        """
+        self.identifier = identifier
+        self.classification = set(classification)
+        with io.open(path, 'rb') as index_file:
+            try:
+                self._mmap = mmap.mmap(
+                    index_file.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ
+                )
+            except ValueError:
+                msg = "'{}' is not a valid host index".format(path)
+                raise InvalidHostIndexError(msg)
+        try:
+            self._size = self._read_header(path)
+        except InvalidHostIndexError:
+            self.close()
+            raise
+        self._offsets_start = _HEADER.size
+        self._keys_start = _HEADER.size + _OFFSET.size * (self._size + 1)
+        super(HostIndex, self).__init__(host_factory)
+
+    def _read_header(self, path):
+        """Validate the index file and get the number of its keys.
+
+        :param path: a path of the index file
+        :returns: the number of keys stored in the index
+        :raises InvalidHostIndexError: if the header or the size of
+        the file is not valid
+        """
+        msg_tpl = "'{}' is not a valid host index: {}"
+        if len(self._mmap) < _HEADER.size:
+            raise InvalidHostIndexError(msg_tpl.format(path, 'no header'))
+        magic, version, size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise InvalidHostIndexError(msg_tpl.format(path, 'bad magic'))
+        if version != FORMAT_VERSION:
+            reason = 'unsupported version {}'.format(version)
+            raise InvalidHostIndexError(msg_tpl.format(path, reason))
+        keys_start = _HEADER.size + _OFFSET.size * (size + 1)
+        if len(self._mmap) < keys_start:
+            raise InvalidHostIndexError(msg_tpl.format(path, 'bad size'))
+        keys_end = _OFFSET.unpack_from(self._mmap, keys_start - _OFFSET.size)
+        if len(self._mmap) != keys_start + keys_end[0]:
+            raise InvalidHostIndexError(msg_tpl.format(path, 'bad size'))
+        return size
+
+    def close(self):
+        """Unmap the index file."""
+        self._mmap.close()
+
+    def __len__(self):
+        """Get the number of hosts stored in the index."""
+        return self._size
+
+    def _get_key(self, index):
+        start, end = _OFFSET_PAIR.unpack_from(
+            self._mmap,
+            self._offsets_start + _OFFSET.size * index
+        )
+        return self._mmap[self._keys_start + start:self._keys_start + end]
+
+    def _get_insertion_point(self, key):
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if key < self._get_key(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _get_match(self, host_object):
+        """Get an item matching the given host object.
+
+        :param host_object: an object representing ip address
+        or hostname whose match we are trying to find
+        :returns: an object representing the listed parent domain or
+        identical value, or None if there is no match
+        """
+        key = host_object.sort_key
+        i = self._get_insertion_point(key)
+        if i:
+            listed_key = self._get_key(i - 1)
+            if is_matching_key(key, listed_key):
+                return self._host_factory(get_host_value(listed_key))
+        return None
+
+    def _contains(self, host_object):
+        return self._get_match(host_object) is not None
+
+    def _get_match_and_classification(self, host_object):
+        match = self._get_match(host_object)
+        _class = None if match is None else self.classification
+        return match, _class
+
+    @property
+    def hosts(self):
+        """Get a list of values stored in the index."""
+        return [get_host_value(self._get_key(i)) for i in range(self._size)]
+
+
+def read_host_values(lines):
+    """Get host values from lines of a text file.
+
+    :param lines: an iterable containing lines, each containing
+    a single host value. Empty lines and lines starting with "#" are
+    skipped.
+    :returns: a generator yielding the host values
+    """
+    for line in lines:
+        value = line.strip()
+        if value and not value.startswith('#'):
+            yield value
+
+
+def main(argv=None):
+    """Build an index file from a text file containing host values.
+
+    :param argv: command line arguments, or None if the arguments
+    of the current process are to be used
+    """
+    parser = argparse.ArgumentParser(
+        description='Build a host index file from a list of hosts.'
+    )
+    parser.add_argument('source', help='a file containing one host per line')
+    parser.add_argument('index', help='a path of the index file to create')
+    args = parser.parse_args(argv)
+    with io.open(args.source, encoding='utf-8') as lines:
+        size = build_host_index(args.index, read_host_values(lines))
+    print('{} hosts written to {}'.format(size, args.index))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,9 @@ from __future__ import unicode_literals
 
 # pylint: disable=redefined-builtin
 from builtins import object
-from future.moves.urllib.parse import urlparse
 
+from .compat import urlparse
+from .concurrency import map_concurrently
 from .exceptions import InvalidHostError
 from .structures import AddressListItem
 from .validation import accepts_valid_urls, accepts_valid_host
@@ -89,6 +90,55 @@ class HostList(object):
             )
         return None
 
+    def contains_many(self, host_values, max_workers=10, ordered=True):
+        """Check if the given host values are listed by the host list.
+
+        The values are tested concurrently, using a pool of threads.
+
+        :param host_values: an iterable containing strings representing
+        valid hosts
+        :param max_workers: a maximum number of tests running at
+        the same time
+        :param ordered: if True, the results are returned in order of
+        the host values. Otherwise, they are returned in order of
+        completion of the tests.
+        :returns: a generator yielding tuples containing a host value
+        and a boolean value: True if the host is listed
+        :raises InvalidHostError: if any of the values is not a valid
+        host string
+        """
+        return map_concurrently(
+            self.__contains__,
+            host_values,
+            max_workers,
+            ordered
+        )
+
+    def lookup_many(self, host_values, max_workers=10, ordered=True):
+        """Get host values matching the given values.
+
+        The values are looked up concurrently, using a pool of threads.
+
+        :param host_values: an iterable containing values of hosts of
+        a type that can be listed by the service
+        :param max_workers: a maximum number of lookups running at
+        the same time
+        :param ordered: if True, the results are returned in order of
+        the host values. Otherwise, they are returned in order of
+        completion of the lookups.
+        :returns: a generator yielding tuples containing a host value
+        and an instance of AddressListItem representing a matched value,
+        or None if the host is not listed
+        :raises InvalidHostError: if any of the values is not a valid
+        host string
+        """
+        return map_concurrently(
+            self.lookup,
+            host_values,
+            max_workers,
+            ordered
+        )
+
     @accepts_valid_urls
     def any_match(self, urls):
         """Check if any of the given URLs has a matching host.
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+"""Extraction of registered domains with a bundled public suffix list.
+
+The library contains a snapshot of rules of the public suffix list
+(https://publicsuffix.org/), compiled into a file with one rule per
+line and labels of each rule in reversed order, for example:
+
+    uk.co
+    ck.*
+    !ck.www
+
+The snapshot is loaded on the first extraction of a registered domain,
+into a tree of labels searched starting with the top-level domain.
+No network connections are made.
+
+The snapshot can be refreshed from a local copy of the list by running
+this module:
+
+    python -m spam_lists.public_suffix public_suffix_list.dat
+
+By default, only the rules from the ICANN section of the list are
+compiled, and suffixes provided by private domains are treated like
+other domains.
+"""
+from __future__ import print_function, unicode_literals
+
+import io
+import os
+import pkgutil
+
+# pylint: disable=redefined-builtin
+from builtins import object
+
+SNAPSHOT_NAME = 'public_suffixes.dat'
+
+_WILDCARD = '*'
+_EXCEPTION = '!'
+# markers of nodes representing rules and exceptions; they are not
+# strings, so they can't collide with labels of a hostname
+_RULE_MARKER = object()
+_EXCEPTION_MARKER = object()
+_PRIVATE_SECTION_START = '// ===BEGIN PRIVATE DOMAINS==='
+_SNAPSHOT_HEADER = '''\
+// A compiled snapshot of the public suffix list (https://publicsuffix.org/)
+// This Source Code Form is subject to the terms of the Mozilla Public
+// License, v. 2.0. If a copy of the MPL was not distributed with this
+// file, You can obtain one at https://mozilla.org/MPL/2.0/.
+'''
+
+
+def compile_rules(lines, include_private=False):
+    """Convert rules of the public suffix list to their compiled form.
+
+    :param lines: an iterable containing lines of the list
+    :param include_private: if True, rules from the private domains
+    section of the list are included
+    :returns: a generator yielding rules with their labels reversed
+    and lowercase, and with exception rules prefixed with
+    an exclamation mark
+    """
+    for line in lines:
+        line = line.strip()
+        if line == _PRIVATE_SECTION_START and not include_private:
+            return
+        if not line or line.startswith('//'):
+            continue
+        rule = line.split()[0].lower()
+        prefix = ''
+        if rule.startswith(_EXCEPTION):
+            prefix, rule = _EXCEPTION, rule[1:]
+        yield prefix + '.'.join(reversed(rule.split('.')))
+
+
+class PublicSuffixList(object):
+    """A tree of labels of public suffixes.
+
+    Each node of the tree is a dictionary mapping labels to child
+    nodes, and containing special keys for nodes representing rules
+    and exceptions from wildcard rules.
+    """
+
+    def __init__(self, rules):
+        """Initialize a new instance.
+
+        :param rules: an iterable containing compiled rules, as yielded
+        by compile_rules function
+        """
+        self._root = {}
+        for rule in rules:
+            marker = _RULE_MARKER
+            if rule.startswith(_EXCEPTION):
+                marker, rule = _EXCEPTION_MARKER, rule[1:]
+            node = self._root
+            for label in rule.split('.'):
+                node = node.setdefault(label, {})
+            node[marker] = True
+
+    @classmethod
+    def load(cls, path=None):
+        """Load a compiled snapshot of the list.
+
+        :param path: a path of the snapshot file, or None if
+        the snapshot bundled with the library is to be loaded
+        :returns: a new instance of the class
+        """
+        if path is None:
+            package = __name__.rpartition('.')[0]
+            data = pkgutil.get_data(package, SNAPSHOT_NAME)
+        else:
+            with io.open(path, 'rb') as snapshot:
+                data = snapshot.read()
+        lines = data.decode('utf-8').splitlines()
+        return cls(
+            line for line in lines if line and not line.startswith('//')
+        )
+
+    def _get_suffix_length(self, labels):
+        """Get the number of labels of the public suffix of a domain.
+
+        :param labels: lowercase labels of the domain, starting with
+        the top-level one
+        :returns: the number of labels of the longest public suffix
+        of the domain, or 0 if it has no known public suffix
+        """
+        node = self._root
+        length = 0
+        index = 0
+        for label in labels:
+            child = node.get(label)
+            wildcard = node.get(_WILDCARD)
+            if child is not None:
+                if _EXCEPTION_MARKER in child:
+                    return index
+                if _RULE_MARKER in child or wildcard is not None:
+                    length = index + 1
+                node = child
+            elif wildcard is not None:
+                length = index + 1
+                node = wildcard
+            else:
+                break
+            index += 1
+        return length
+
+    def get_registered_domain(self, value):
+        """Get a registered domain of the hostname.
+
+        :param value: a hostname
+        :returns: the public suffix of the hostname preceded by one more
+        of its labels, or an empty string if the hostname is a public
+        suffix or has no known public suffix
+        """
+        labels = value.split('.')
+        lowercase = value.lower()
+        normalized = lowercase.split('.')
+        if 'xn--' in lowercase:
+            normalized = [get_normalized_label(n) for n in normalized]
+        normalized.reverse()
+        length = self._get_suffix_length(normalized)
+        if not length or length >= len(labels):
+            return ''
+        return '.'.join(labels[-length - 1:])
+
+
+def get_normalized_label(label):
+    """Get a label in the form used by the public suffix list.
+
+    :param label: a lowercase label of a hostname
+    :returns: the label, or its unicode form if it is
+    an internationalized label in ASCII-compatible encoding
+    """
+    if label.startswith('xn--'):
+        try:
+            return label.encode('ascii').decode('idna')
+        except UnicodeError:
+            pass
+    return label
+
+
+_PUBLIC_SUFFIX_LIST = None
+
+
+def get_public_suffix_list():
+    """Get the public suffix list bundled with the library.
+
+    :returns: an instance of PublicSuffixList, loaded on the first call
+    and reused afterwards
+    """
+    global _PUBLIC_SUFFIX_LIST  # pylint: disable=global-statement
+    if _PUBLIC_SUFFIX_LIST is None:
+        _PUBLIC_SUFFIX_LIST = PublicSuffixList.load()
+    return _PUBLIC_SUFFIX_LIST
+
+
+def get_registered_domain(value):
+    """Get a registered domain of the hostname.
+
+    :param value: a hostname
+    :returns: the registered domain, or an empty string if it can't be
+    extracted from the hostname
+    """
+    return get_public_suffix_list().get_registered_domain(value)
+
+
+def main(argv=None):
+    """Compile a snapshot of the public suffix list from a local file.
+
+    :param argv: command line arguments, or None if the arguments
+    of the current process are to be used
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Compile a snapshot of the public suffix list.'
+    )
+    parser.add_argument('source', help='a copy of public_suffix_list.dat')
+    parser.add_argument(
+        '-o', '--output',
+        default=os.path.join(os.path.dirname(__file__), SNAPSHOT_NAME),
+        help='a path of the snapshot to create, by default the one'
+        ' bundled with the library'
+    )
+    parser.add_argument(
+        '--include-private',
+        action='store_true',
+        help='include rules for suffixes provided by private domains'
+    )
+    args = parser.parse_args(argv)
+    with io.open(args.source, encoding='utf-8') as lines:
+        rules = list(compile_rules(lines, args.include_private))
+    with io.open(args.output, 'w', encoding='utf-8', newline='\n') as output:
+        output.write(_SNAPSHOT_HEADER)
+        for rule in rules:
+            output.write(rule + '\n')
+    print('{} rules written to {}'.format(len(rules), args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""A radix tree of ip network prefixes and a host list using it."""
+from __future__ import unicode_literals
+
+# pylint: disable=redefined-builtin
+from builtins import object
+
+from .host_list import HostList
+from .structures import ip_address, ip_network
+
+
+class _Node(object):
+    """A node of a radix tree, representing a prefix of keys."""
+
+    __slots__ = ('key', 'length', 'data', 'listed', 'children')
+
+    def __init__(self, key, length, data=None, listed=False):
+        self.key = key
+        self.length = length
+        self.data = data
+        self.listed = listed
+        self.children = [None, None]
+
+
+class RadixTree(object):
+    """A compressed binary radix tree of prefixes of integer keys.
+
+    Each node stores a prefix of keys, and nodes with a single child
+    and no data are not created, so the number of nodes visited when
+    searching the tree is bounded by the number of bits of the keys,
+    and does not depend on the number of stored prefixes.
+    """
+
+    def __init__(self, width):
+        """Initialize a new instance.
+
+        :param width: the number of bits of the keys
+        """
+        self.width = width
+        self._root = _Node(0, 0)
+        self._size = 0
+
+    def __len__(self):
+        """Get the number of prefixes stored in the tree."""
+        return self._size
+
+    def _get_bit(self, key, index):
+        return (key >> (self.width - 1 - index)) & 1
+
+    def _get_common_length(self, node, key, length):
+        difference = node.key ^ key
+        common = self.width - difference.bit_length()
+        return min(common, node.length, length)
+
+    def insert(self, key, length, data):
+        """Add a prefix to the tree.
+
+        :param key: an integer key starting with the prefix, with
+        all other bits unset
+        :param length: the number of bits of the prefix
+        :param data: a value associated with the prefix, replacing
+        the value previously associated with it
+        """
+        node = self._root
+        while node.length < length:
+            bit = self._get_bit(key, node.length)
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = _Node(key, length, data, True)
+                self._size += 1
+                return
+            common = self._get_common_length(child, key, length)
+            if common < child.length:
+                mask = ((1 << common) - 1) << (self.width - common)
+                split = _Node(key & mask, common)
+                split.children[self._get_bit(child.key, common)] = child
+                node.children[bit] = split
+            node = node.children[bit]
+        self._size += not node.listed
+        node.data = data
+        node.listed = True
+
+    def find(self, key):
+        """Get the longest stored prefix of the key.
+
+        :param key: an integer key
+        :returns: a tuple containing the prefix, as an integer key with
+        the bits following it unset, its length and the value
+        associated with it, or None if the tree contains no prefix of
+        the key
+        """
+        node = self._root
+        match = None
+        while node is not None:
+            if (node.key ^ key) >> (self.width - node.length):
+                break
+            if node.listed:
+                match = node
+            if node.length == self.width:
+                break
+            node = node.children[self._get_bit(key, node.length)]
+        if match is None:
+            return None
+        return match.key, match.length, match.data
+
+    def __iter__(self):
+        """Get an iterator over the stored prefixes.
+
+        :returns: a generator yielding tuples containing a prefix,
+        its length and the value associated with it, in order of
+        the prefixes
+        """
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.listed:
+                yield node.key, node.length, node.data
+            stack.extend(c for c in reversed(node.children) if c is not None)
+
+
+class IPPrefixList(HostList):
+    """A host list of ip networks, matched by the longest prefix.
+
+    Networks of each version of ip addresses are stored in a radix
+    tree, so a lookup visits at most 32 or 128 nodes, regardless of
+    the number of listed networks. Nested networks may be listed with
+    different classification, and the most specific one matching
+    an address is returned.
+
+    :ivar identifier: an identifier of the list
+    :ivar classification: a set of strings representing types of
+    items, assigned to networks listed without their own classification
+    """
+
+    def __init__(
+            self,
+            identifier,
+            classification,
+            networks=None,
+            host_factory=ip_address
+    ):
+        """Initialize a new instance.
+
+        :param identifier: an identifier of the list
+        :param classification: a list or tuple containing strings
+        representing types of items, assigned to elements of the list
+        :param networks: an iterable containing networks in CIDR
+        notation or ip addresses to be listed
+        :param host_factory: a callable used to create ip address
+        objects representing values searched in the list
+        :raises InvalidHostError: if any of the networks is not valid
+        """
+        super(IPPrefixList, self).__init__(host_factory)
+        self.identifier = identifier
+        self.classification = set(classification)
+        self._trees = {4: RadixTree(32), 6: RadixTree(128)}
+        for network in networks or ():
+            self.add(network)
+
+    def __len__(self):
+        """Get the number of listed networks."""
+        return sum(len(t) for t in self._trees.values())
+
+    @property
+    def networks(self):
+        """Get a list of listed networks in CIDR notation."""
+        return [
+            network.to_unicode()
+            for version in (4, 6)
+            for _, _, (network, _) in self._trees[version]
+        ]
+
+    def add(self, network_value, classification=None):
+        """Add a network to the list.
+
+        :param network_value: a network in CIDR notation, or an ip
+        address representing a network containing only this address
+        :param classification: an iterable containing classification
+        terms of the network, or None if it has classification of
+        the list. Classification of a listed network is replaced.
+        :raises InvalidHostError: if the value is not a valid network
+        """
+        network = ip_network(network_value)
+        value = network.value
+        if classification is not None:
+            classification = frozenset(classification)
+        self._trees[value.version].insert(
+            int(value.network_address),
+            value.prefixlen,
+            (network, classification)
+        )
+
+    def _find(self, host_object):
+        address = getattr(host_object, 'value', None)
+        tree = self._trees.get(getattr(address, 'version', None))
+        if tree is None:
+            return None
+        match = tree.find(int(address))
+        return None if match is None else match[2]
+
+    def _contains(self, host_object):
+        return self._find(host_object) is not None
+
+    def _get_match_and_classification(self, host_object):
+        match = self._find(host_object)
+        if match is None:
+            return None, None
+        network, classification = match
+        return network, classification or self.classification
@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+
+"""A host list serving data of DNSBL zones from rbldnsd zone files.
+
+Instances of RbldnsdZone load local copies of DNSBL zones, like those
+distributed to rbldnsd mirrors of Spamhaus or SURBL, into compact
+in-memory indexes. They can be used instead of DNSBL clients, without
+querying DNS servers.
+
+The following rbldnsd dataset types are supported:
+
+    * ip4set and ip4trie: IPv4 addresses, CIDR blocks, ranges (like
+    127.0.0.1-127.0.0.10 or 127.0.0.1-10) and abbreviated networks
+    (like 127.0.0 for 127.0.0.0/24)
+    * ip6trie: IPv6 addresses and CIDR blocks
+    * dnset: domain names, their subdomains (*.example.com) and both
+    (.example.com)
+
+Each of the entries may be preceded by "!" to exclude a value from
+a less specific entry, and may be followed by a return value
+(":127.0.0.3:text", ":3:text" or just "text"). Return values set by
+lines starting with ":" apply to all following entries with no
+return address of their own.
+"""
+from __future__ import unicode_literals
+
+from array import array
+from bisect import bisect_right
+from heapq import heapify, heappop, heappush
+import io
+import ipaddress
+import re
+
+# pylint: disable=redefined-builtin
+from builtins import str, range, object
+from future.utils import native_str, raise_from
+
+from .clients import get_classification_table
+from .compat import UINT32_TYPECODE
+from .exceptions import InvalidZoneEntryError, UnknownCodeError
+from .host_list import HostList
+from .structures import IPv4Address, IPv6Address, hostname_or_ip
+
+
+DEFAULT_RETURN_CODE = 2
+_EXCLUDED = 0
+
+_UINT8 = native_str('B')
+
+_IP_ENTRY_REGEX = re.compile(r'^([^\s:]+)\s*(.*)$')
+_IPV6_ENTRY_REGEX = re.compile(r'^(\S+)\s*(.*)$')
+
+
+def parse_return_code(value, default):
+    """Get a return code from a return value of a zone entry.
+
+    :param value: a return value, like ":127.0.0.3:text", ":3:" or
+    "text"
+    :param default: a code to be returned if the value does not
+    specify a return address
+    :returns: the last octet of the return address
+    :raises ValueError: if the return address is not valid
+    """
+    if not value.startswith(':'):
+        return default
+    address = value[1:].split(':', 1)[0].strip()
+    if not address:
+        return default
+    code = int(address.rsplit('.', 1)[-1])
+    if not 0 < code < 256:
+        raise ValueError('{} is not a valid return address'.format(address))
+    return code
+
+
+def parse_ipv4_entry(entry):
+    """Get a range of IPv4 addresses represented by an ip4set entry.
+
+    :param entry: a string representing an address, a CIDR block,
+    a range or an abbreviated network
+    :returns: a tuple containing integer values of the first and
+    the last address in the range
+    :raises ValueError: if the entry is not valid
+    """
+    if '-' in entry:
+        first, last = entry.split('-', 1)
+        start = int(ipaddress.IPv4Address(str(first)))
+        if '.' in last:
+            end = int(ipaddress.IPv4Address(str(last)))
+        else:
+            last_octet = int(last)
+            if not 0 <= last_octet < 256:
+                raise ValueError('{} is not a valid range'.format(entry))
+            end = (start & ~0xFF) | last_octet
+        if end < start:
+            raise ValueError('{} is not a valid range'.format(entry))
+        return start, end
+    address, _, prefix = entry.partition('/')
+    octets = address.split('.')
+    if not 0 < len(octets) <= 4:
+        raise ValueError('{} is not a valid IPv4 entry'.format(entry))
+    if not prefix and len(octets) == 4:
+        value = 0
+        for octet in octets:
+            octet = int(octet)
+            if not 0 <= octet < 256:
+                raise ValueError('{} is not a valid IPv4 entry'.format(entry))
+            value = value << 8 | octet
+        return value, value
+    prefix = prefix or str(8 * len(octets))
+    octets += ['0'] * (4 - len(octets))
+    network = ipaddress.IPv4Network(
+        str('{}/{}'.format('.'.join(octets), prefix)),
+        strict=False
+    )
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def parse_ipv6_entry(entry):
+    """Get a range of IPv6 addresses represented by an ip6trie entry.
+
+    :param entry: a string representing an address or a CIDR block
+    :returns: a tuple containing integer values of the first and
+    the last address in the range
+    :raises ValueError: if the entry is not valid
+    """
+    network = ipaddress.IPv6Network(str(entry), strict=False)
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def read_zone_lines(lines, entry_regex, parse_entry):
+    """Read entries of a dataset from lines of an rbldnsd zone file.
+
+    :param lines: an iterable containing lines of the file
+    :param entry_regex: a regular expression splitting a line into
+    an entry and its return value
+    :param parse_entry: a function parsing the entry
+    :returns: a generator yielding tuples containing a parsed entry
+    and a return code for it, or 0 if the entry is an exclusion
+    :raises InvalidZoneEntryError: if any of the lines is not valid
+    """
+    default_code = DEFAULT_RETURN_CODE
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        try:
+            if not line or line[0] in '#;$':
+                continue
+            if line[0] == ':':
+                default_code = parse_return_code(line, DEFAULT_RETURN_CODE)
+                continue
+            excluded = line[0] == '!'
+            entry, value = entry_regex.match(line.lstrip('!')).groups()
+            parsed = parse_entry(entry)
+            code = parse_return_code(value, default_code)
+        except (ValueError, AttributeError) as ex:
+            msg = "Line {}: '{}' is not a valid entry".format(number, line)
+            raise_from(InvalidZoneEntryError(msg), ex)
+        yield parsed, _EXCLUDED if excluded else code
+
+
+class RangeIndex(object):
+    """An index of return codes assigned to ranges of integers.
+
+    The ranges may overlap or be nested in each other. When building
+    the index, they are divided into disjoint segments, each assigned
+    the code of the most specific range containing it. The segments
+    are stored in arrays, so a lookup is a single binary search.
+    """
+
+    def __init__(self, typecode=None):
+        """Initialize a new instance.
+
+        :param typecode: a type code of arrays used to store bounds of
+        the segments, or None if the bounds are to be stored in lists
+        """
+        create = list if typecode is None else lambda: array(typecode)
+        self._starts = create()
+        self._ends = create()
+        self._codes = array(_UINT8)
+
+    def __len__(self):
+        """Get the number of disjoint segments stored in the index."""
+        return len(self._starts)
+
+    def _append(self, start, end, code):
+        if start > end or code == _EXCLUDED:
+            return
+        if self._ends and self._ends[-1] + 1 == start and (
+                self._codes[-1] == code):
+            self._ends[-1] = end
+            return
+        self._starts.append(start)
+        self._ends.append(end)
+        self._codes.append(code)
+
+    def build(self, ranges, bits):
+        """Build the index from given ranges.
+
+        :param ranges: an iterable containing tuples, each containing
+        the first and the last value of a range and a return code
+        assigned to it. Code 0 marks ranges excluded from less
+        specific ones.
+        :param bits: a number of bits of the values
+        """
+        max_value = (1 << bits) - 1
+        code_shift = 9
+        start_shift = bits + code_shift
+
+        def pack(start, end, code):
+            # ranges are ordered by start and descending size, with
+            # exclusions following other ranges with the same bounds
+            return (
+                start << start_shift |
+                (max_value - end) << code_shift |
+                (code or 256)
+            )
+        heap = [pack(s, e, c) for (s, e), c in ranges]
+        heapify(heap)
+        stack = []
+        position = 0
+        while heap:
+            packed = heappop(heap)
+            start = packed >> start_shift
+            end = max_value - ((packed >> code_shift) & max_value)
+            code = packed & 0xFF
+            while stack and stack[-1][0] < start:
+                top_end, top_code = stack.pop()
+                self._append(position, top_end, top_code)
+                position = top_end + 1
+            if stack:
+                self._append(position, start - 1, stack[-1][1])
+                parent_end = stack[-1][0]
+                if end > parent_end:
+                    heappush(heap, pack(parent_end + 1, end, code))
+                    end = parent_end
+            position = start
+            stack.append((end, code))
+        while stack:
+            top_end, top_code = stack.pop()
+            self._append(position, top_end, top_code)
+            position = top_end + 1
+
+    def find(self, value):
+        """Get a return code assigned to the value.
+
+        :param value: an integer to be found
+        :returns: the code, or None if the value is not listed
+        """
+        i = bisect_right(self._starts, value) - 1
+        if i >= 0 and value <= self._ends[i]:
+            return self._codes[i]
+        return None
+
+
+class IPRangeDataset(object):
+    """A dataset of IPv4 or IPv6 addresses."""
+
+    def __init__(self, host_type, bits, entry_regex, parse_entry, typecode):
+        """Initialize a new instance.
+
+        :param host_type: a class of host objects listed by the dataset
+        :param bits: a number of bits of addresses
+        :param entry_regex: a regular expression splitting a line of
+        a zone file into an entry and its return value
+        :param parse_entry: a function parsing entries of the dataset
+        :param typecode: a type code of arrays storing the addresses,
+        or None if they are to be stored in lists
+        """
+        self._host_type = host_type
+        self._bits = bits
+        self._entry_regex = entry_regex
+        self._parse_entry = parse_entry
+        self._index = RangeIndex(typecode)
+
+    def __len__(self):
+        """Get the number of address ranges stored in the dataset."""
+        return len(self._index)
+
+    def load(self, lines):
+        """Load entries of the dataset from lines of a zone file.
+
+        :param lines: an iterable containing lines of the file
+        :raises InvalidZoneEntryError: if any of the lines is not valid
+        """
+        entries = read_zone_lines(lines, self._entry_regex, self._parse_entry)
+        self._index.build(entries, self._bits)
+
+    def find(self, host_object):
+        """Get a return code for given host.
+
+        :param host_object: an object representing a host
+        :returns: the code, or None if the host is not listed
+        """
+        if not isinstance(host_object, self._host_type):
+            return None
+        return self._index.find(int(host_object.value))
+
+
+class NameDataset(object):
+    """A dataset of domain names."""
+
+    def __init__(self):
+        """Initialize a new instance."""
+        self._names = {}
+        self._subdomains_of = {}
+
+    def __len__(self):
+        """Get the number of entries stored in the dataset."""
+        return len(self._names) + len(self._subdomains_of)
+
+    @staticmethod
+    def _get_key(value):
+        return value.rstrip('.').lower().encode('utf-8')
+
+    def load(self, lines):
+        """Load entries of the dataset from lines of a zone file.
+
+        :param lines: an iterable containing lines of the file
+        :raises InvalidZoneEntryError: if any of the lines is not valid
+        """
+        for entry, code in read_zone_lines(lines, _IP_ENTRY_REGEX, str):
+            if entry.startswith('*.'):
+                self._subdomains_of[self._get_key(entry[2:])] = code
+            elif entry.startswith('.'):
+                key = self._get_key(entry[1:])
+                self._names[key] = code
+                self._subdomains_of[key] = code
+            else:
+                self._names[self._get_key(entry)] = code
+
+    def find(self, host_object):
+        """Get a return code for given host.
+
+        The code is the one assigned to the host or, if the host is not
+        listed, to the closest of its parent domains whose subdomains
+        are listed.
+
+        :param host_object: an object representing a host
+        :returns: the code, or None if the host is not listed
+        """
+        if isinstance(host_object, (IPv4Address, IPv6Address)):
+            return None
+        key = self._get_key(host_object.to_unicode())
+        code = self._names.get(key)
+        if code is None:
+            labels = key.split(b'.')
+            for i in range(1, len(labels)):
+                code = self._subdomains_of.get(b'.'.join(labels[i:]))
+                if code is not None:
+                    break
+        return code or None
+
+
+DATASET_TYPES = {
+    'ip4set': lambda: IPRangeDataset(
+        IPv4Address, 32, _IP_ENTRY_REGEX, parse_ipv4_entry, UINT32_TYPECODE
+    ),
+    'ip6trie': lambda: IPRangeDataset(
+        IPv6Address, 128, _IPV6_ENTRY_REGEX, parse_ipv6_entry, None
+    ),
+    'dnset': NameDataset
+}
+DATASET_TYPES['ip4trie'] = DATASET_TYPES['ip4set']
+
+
+class RbldnsdZone(HostList):
+    """A host list serving data loaded from rbldnsd zone files.
+
+    A zone may consist of many datasets, like the Spamhaus ZEN zone
+    combining SBL, XBL and PBL. A host listed by many datasets is
+    classified using return codes of all of them.
+    """
+
+    def __init__(
+            self,
+            identifier,
+            classification_map,
+            host_factory=hostname_or_ip,
+            bitmasking=False
+    ):
+        """Initialize a new instance.
+
+        :param identifier: an identifier of the zone
+        :param classification_map: item classes associated with
+        return codes of the zone, like SPAMHAUS_ZEN_CLASSIFICATION
+        :param host_factory: a function creating host objects for
+        values looked up in the zone
+        :param bitmasking: if True, the return codes are treated as
+        bit vectors, like those of SURBL multi zone
+        """
+        self.identifier = identifier
+        self._classification_table = get_classification_table(
+            classification_map,
+            bitmasking
+        )
+        self._datasets = []
+        super(RbldnsdZone, self).__init__(host_factory)
+
+    def __str__(self):
+        """Convert the zone to a string."""
+        return str(self.identifier)
+
+    def __len__(self):
+        """Get the number of entries stored in the datasets."""
+        return sum(len(d) for d in self._datasets)
+
+    def load(self, dataset_type, lines):
+        """Load a dataset of the zone from lines of a zone file.
+
+        :param dataset_type: a name of rbldnsd dataset type: ip4set,
+        ip4trie, ip6trie or dnset
+        :param lines: an iterable containing lines of the file
+        :raises ValueError: if the dataset type is not supported
+        :raises InvalidZoneEntryError: if any of the lines is not valid
+        """
+        try:
+            dataset = DATASET_TYPES[dataset_type]()
+        except KeyError:
+            msg = "Unsupported dataset type: '{}'".format(dataset_type)
+            raise ValueError(msg)
+        dataset.load(lines)
+        self._datasets.append(dataset)
+
+    def load_file(self, dataset_type, path):
+        """Load a dataset of the zone from a zone file.
+
+        :param dataset_type: a name of rbldnsd dataset type: ip4set,
+        ip4trie, ip6trie or dnset
+        :param path: a path of the file
+        :raises ValueError: if the dataset type is not supported
+        :raises InvalidZoneEntryError: if any of the lines is not valid
+        """
+        with io.open(path, encoding='utf-8', errors='replace') as lines:
+            self.load(dataset_type, lines)
+
+    def _get_codes(self, host_object):
+        codes = (d.find(host_object) for d in self._datasets)
+        return [c for c in codes if c is not None]
+
+    def _contains(self, host_object):
+        return bool(self._get_codes(host_object))
+
+    def _get_match_and_classification(self, host_object):
+        codes = self._get_codes(host_object)
+        if not codes:
+            return None, None
+        classification = set()
+        for code in codes:
+            classes = self._classification_table[code]
+            if classes is None:
+                msg_tpl = (
+                    "The code '{}' has no corresponding classification value"
+                )
+                raise UnknownCodeError(msg_tpl.format(code))
+            classification.update(classes)
+        return host_object, classification
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+"""Binary snapshots of contents of host collections.
+
+A snapshot stores hosts already validated and sorted by their sort
+keys, so a collection can be restored from it without parsing or
+validating any of them. A snapshot file consists of:
+
+    * a header: an 8-byte magic value, a 4-byte version of the format,
+    a 4-byte CRC-32 checksum of the payload and an 8-byte length of
+    the payload
+    * the payload: a sequence of sections, each preceded by its 8-byte
+    length. They contain, in this order: an identifier of
+    the collection, its classification terms separated by new lines,
+    host values separated by new lines, 4-byte offsets of sort keys of
+    the hosts, the sort keys, first and last addresses of IPv4 ranges
+    as 4-byte numbers, first and last addresses of IPv6 ranges as
+    16-byte numbers, sets of classification terms of entries, one per
+    line and with terms separated by the unit separator character, and
+    4-byte indexes of the sets, increased by one, for all hosts.
+    An index of 0 represents classification of the collection.
+
+Snapshots of version 1 of the format contain no sections describing
+classification of entries.
+
+All numbers are unsigned and little-endian, except for the 16-byte
+ones, which are big-endian.
+"""
+from __future__ import unicode_literals
+
+from array import array
+import binascii
+import io
+import struct
+import sys
+import zlib
+
+# pylint: disable=redefined-builtin
+from builtins import range, zip
+from future.utils import native_str
+
+from .compat import UINT32_TYPECODE
+from .exceptions import InvalidSnapshotError
+
+
+MAGIC = b'SPAMLSNP'
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct(native_str('<8sIIQ'))
+_LENGTH = struct.Struct(native_str('<Q'))
+_SEPARATOR = '\n'
+_TERM_SEPARATOR = '\x1f'
+_IPV6_SIZE = 16
+
+
+def _pack_uint32_array(values):
+    values = array(UINT32_TYPECODE, values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tostring() if sys.version_info < (3,) else (
+        values.tobytes()
+    )
+
+
+def _unpack_uint32_array(data):
+    values = array(UINT32_TYPECODE)
+    if sys.version_info < (3,):
+        values.fromstring(data)
+    else:
+        values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _pack_ipv6_bounds(starts, ends):
+    return b''.join(
+        binascii.unhexlify('{:032x}'.format(v).encode('ascii'))
+        for pair in zip(starts, ends) for v in pair
+    )
+
+
+def _unpack_ipv6_bounds(data):
+    values = [
+        int(binascii.hexlify(data[i:i + _IPV6_SIZE]), 16)
+        for i in range(0, len(data), _IPV6_SIZE)
+    ]
+    return values[::2], values[1::2]
+
+
+def _join_text(values):
+    return _SEPARATOR.join(values).encode('utf-8')
+
+
+def _split_text(data):
+    return data.decode('utf-8').split(_SEPARATOR) if data else []
+
+
+def write_snapshot(
+        path,
+        identifier,
+        classification,
+        items,
+        bounds,
+        entry_classification=None
+):
+    """Write a snapshot of contents of a host collection to a file.
+
+    :param path: a path of the file
+    :param identifier: an identifier of the collection
+    :param classification: classification terms of the collection
+    :param items: a list of tuples containing sort keys and values
+    of hosts, sorted by the keys
+    :param bounds: a dictionary mapping ip versions to tuples
+    containing sequences of first and last addresses of ranges
+    of ip addresses, as integers
+    :param entry_classification: a tuple containing a list of sets of
+    classification terms and a sequence of ids of classification of
+    the hosts, each being 0 for classification of the collection or
+    an index of a set increased by one, or None if all hosts have
+    classification of the collection
+    """
+    class_sets, class_ids = entry_classification or ([], [])
+    offsets = [0]
+    for key, _ in items:
+        offsets.append(offsets[-1] + len(key))
+    sections = [
+        identifier.encode('utf-8'),
+        _join_text(sorted(classification)),
+        _join_text(v for _, v in items),
+        _pack_uint32_array(offsets),
+        b''.join(k for k, _ in items),
+        _pack_uint32_array(bounds[4][0]),
+        _pack_uint32_array(bounds[4][1]),
+        _pack_ipv6_bounds(*bounds[6]),
+        _join_text(_TERM_SEPARATOR.join(sorted(c)) for c in class_sets),
+        _pack_uint32_array(class_ids)
+    ]
+    payload = b''.join(_LENGTH.pack(len(s)) + s for s in sections)
+    checksum = zlib.crc32(payload) & 0xffffffff
+    with io.open(path, 'wb') as snapshot_file:
+        snapshot_file.write(
+            _HEADER.pack(MAGIC, FORMAT_VERSION, checksum, len(payload))
+        )
+        snapshot_file.write(payload)
+
+
+def _read_sections(payload):
+    position = 0
+    while position < len(payload):
+        length = _LENGTH.unpack_from(payload, position)[0]
+        position += _LENGTH.size
+        yield payload[position:position + length]
+        position += length
+
+
+def read_snapshot(path):
+    """Read a snapshot of contents of a host collection from a file.
+
+    :param path: a path of the file
+    :returns: a tuple containing an identifier of the collection, its
+    classification terms, a list of tuples containing sort keys and
+    values of hosts, sorted by the keys, a dictionary mapping ip
+    versions to tuples containing sequences of first and last
+    addresses of ranges of ip addresses, and a tuple containing a list
+    of sets of classification terms and an array of ids of
+    classification of the hosts, as accepted by write_snapshot
+    :raises InvalidSnapshotError: if the file is not a valid snapshot
+    """
+    with io.open(path, 'rb') as snapshot_file:
+        data = snapshot_file.read()
+    msg_tpl = "'{}' is not a valid snapshot: {}"
+    if len(data) < _HEADER.size:
+        raise InvalidSnapshotError(msg_tpl.format(path, 'no header'))
+    magic, version, checksum, length = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise InvalidSnapshotError(msg_tpl.format(path, 'bad magic'))
+    if version not in (1, FORMAT_VERSION):
+        reason = 'unsupported version {}'.format(version)
+        raise InvalidSnapshotError(msg_tpl.format(path, reason))
+    payload = data[_HEADER.size:]
+    if len(payload) != length or (
+            zlib.crc32(payload) & 0xffffffff != checksum):
+        raise InvalidSnapshotError(msg_tpl.format(path, 'bad checksum'))
+    try:
+        sections = list(_read_sections(payload))
+        if version == 1:
+            sections.extend([b'', b''])
+        (identifier, classification, values, offsets, keys, ipv4_starts,
+         ipv4_ends, ipv6_bounds, class_sets, class_ids) = sections
+    except (ValueError, struct.error):
+        raise InvalidSnapshotError(msg_tpl.format(path, 'bad sections'))
+    offsets = _unpack_uint32_array(offsets)
+    items = list(zip(
+        (keys[s:e] for s, e in zip(offsets, offsets[1:])),
+        _split_text(values)
+    ))
+    bounds = {
+        4: (_unpack_uint32_array(ipv4_starts),
+            _unpack_uint32_array(ipv4_ends)),
+        6: _unpack_ipv6_bounds(ipv6_bounds)
+    }
+    class_sets = [
+        set(c.split(_TERM_SEPARATOR)) for c in _split_text(class_sets)
+    ]
+    return (
+        identifier.decode('utf-8'),
+        _split_text(classification),
+        items,
+        bounds,
+        (class_sets, _unpack_uint32_array(class_ids))
+    )
@@ -4,27 +4,74 @@
 
 from __future__ import unicode_literals
 
+import binascii
 from collections import namedtuple
 import ipaddress
+import re
 
-from builtins import str, object  # pylint: disable=redefined-builtin
+from builtins import str, range, object  # pylint: disable=redefined-builtin
 from dns import name
-from dns.reversename import (
-    ipv4_reverse_domain, ipv6_reverse_domain, from_address as name_from_ip
-)
+from dns.reversename import ipv4_reverse_domain, ipv6_reverse_domain
 from future.utils import raise_with_traceback
-import tldextract
-import validators
 
+from .cache import HostObjectCache
 from .exceptions import (
     InvalidHostError, InvalidHostnameError, InvalidIPv4Error, InvalidIPv6Error
 )
-from .compat import lru_cache
+from .public_suffix import get_registered_domain
+from .validation import is_valid_hostname
+
+
+SORT_KEY_SEPARATOR = b'\x00'
+
+_DECIMAL_LABELS = tuple(str(i).encode('ascii') for i in range(256))
+_NIBBLE_LABELS = tuple(
+    ('{:x}'.format(i & 0xF).encode('ascii'),
+     '{:x}'.format(i >> 4).encode('ascii'))
+    for i in range(256)
+)
+_ACE_LABEL_REGEX = re.compile(r'(?:\A|\.)xn--', re.IGNORECASE)
+
+
+def get_index_labels(sort_key):
+    """Get index labels of a host represented by a sort key.
+
+    :param sort_key: a sort key of a hostname or an ip address
+    :returns: a tuple equal to index labels of the host
+    """
+    prefix, body = sort_key[:1], sort_key[1:]
+    factory = {
+        b'\x04': ipaddress.IPv4Address,
+        b'\x06': ipaddress.IPv6Address
+    }.get(prefix)
+    if factory is None:
+        return tuple(body.split(SORT_KEY_SEPARATOR))
+    return (factory(int(binascii.hexlify(body), 16)),)
+
+
+def get_sort_key(index_labels):
+    """Get a sort key of a host identified by index labels.
+
+    :param index_labels: a tuple equal to index labels of a hostname
+    or an ip address
+    :returns: a byte string equal to the sort key of the host
+    """
+    version = getattr(index_labels[0], 'version', None)
+    if version is None:
+        return Hostname.sort_key_prefix + SORT_KEY_SEPARATOR.join(
+            index_labels
+        )
+    prefix = IPv4Address.sort_key_prefix if version == 4 else (
+        IPv6Address.sort_key_prefix
+    )
+    return prefix + index_labels[0].packed
 
 
 class Host(object):
     """A base class for host objects."""
 
+    __slots__ = ()
+
     def __lt__(self, other):
         """Check if self is less than the other.
 
@@ -64,8 +111,17 @@ class Hostname(Host):
     The instances are used as values tested by clients of
     hostname-listing services or as items stored by custom host list
     objects.
+
+    An instance stores the hostname string and its sort key. A domain
+    name object used for DNS queries and comparisons is created only
+    when first used, including decoding of punycode labels for
+    the unicode representation of the hostname.
     """
 
+    __slots__ = ('_hostname', '_name', '_sort_key')
+
+    sort_key_prefix = b'\x01'
+
     def __init__(self, value):
         """Initialize a new instance.
 
@@ -74,12 +130,29 @@ class Hostname(Host):
         a valid domain
         """
         value = str(value)
-        if not validators.domain(value):
+        if not is_valid_hostname(value):
             msg = "'{}' is not a valid hostname".format(value)
             raise_with_traceback(InvalidHostnameError(msg))
-        hostname = name.Name(value.split('.'))
-        self.value = hostname
-        self.relative_domain = hostname
+        self._hostname = value
+        self._name = None
+        labels = value.encode('utf-8').lower().split(b'.')
+        labels.reverse()
+        self._sort_key = self.sort_key_prefix + SORT_KEY_SEPARATOR.join(
+            labels
+        )
+
+    @property
+    def value(self):
+        """Get a domain name representing the hostname.
+
+        :returns: an instance of dns.name.Name, created on the first
+        access and reused afterwards
+        """
+        if self._name is None:
+            self._name = name.Name(self._hostname.split('.'))
+        return self._name
+
+    relative_domain = value
 
     def is_subdomain(self, other):
         """Test if the object is a subdomain of the other.
@@ -87,20 +160,45 @@ class Hostname(Host):
         :param other: the object to which we compare this instance
         :returns: True if this instance is a subdomain of the other
         """
-        compared = other.value if hasattr(other, 'value') else other
-        try:
-            return self.value.is_subdomain(compared)
-        except AttributeError:
+        if not isinstance(other, Hostname):
             return False
+        parent_key = other.sort_key
+        return self._sort_key == parent_key or self._sort_key.startswith(
+            parent_key + SORT_KEY_SEPARATOR
+        )
 
     is_match = is_subdomain
 
+    @property
+    def index_labels(self):
+        """Get labels identifying the hostname in indexes of hosts.
+
+        :returns: a tuple containing lowercase labels of the hostname,
+        starting with the top-level domain. Labels of the hostname
+        start with labels of all its parent domains.
+        """
+        return tuple(self._sort_key[1:].split(SORT_KEY_SEPARATOR))
+
+    @property
+    def sort_key(self):
+        """Get a key used for sorting and searching host objects.
+
+        :returns: a byte string consisting of a type prefix and index
+        labels of the hostname separated by SORT_KEY_SEPARATOR. A key of
+        a parent domain followed by the separator is a prefix of keys
+        of all its subdomains, so they are sorted right after it.
+        """
+        return self._sort_key
+
     def to_unicode(self):
         """Get a string value of the object.
 
-        :returns: the hostname as a unicode string
+        :returns: the hostname as a unicode string, with labels encoded
+        in punycode decoded
         """
-        return self.value.to_unicode()
+        if _ACE_LABEL_REGEX.search(self._hostname):
+            return self.value.to_unicode()
+        return self._hostname
 
 
 class IPAddress(Host):
@@ -112,6 +210,8 @@ class IPAddress(Host):
     """
 
     reverse_domain = None
+    sort_key_prefix = None
+    _relative_domain = None
 
     def __init__(self, value):
         """Initialize a new instance.
@@ -131,11 +231,36 @@ class IPAddress(Host):
     def relative_domain(self):
         """Get a relative domain name representing the ip address.
 
+        The name is built from the packed address on the first access
+        and reused afterwards.
+
         :returns: the reverse pointer relative to the common root
         depending on the version of ip address represented by
         this object
         """
-        return name_from_ip(str(self.value)).relativize(self.reverse_domain)
+        if self._relative_domain is None:
+            packed = bytearray(self.value.packed)
+            packed.reverse()
+            self._relative_domain = name.Name(self._get_labels(packed))
+        return self._relative_domain
+
+    @property
+    def index_labels(self):
+        """Get labels identifying the ip address in indexes of hosts.
+
+        :returns: a tuple containing the value of the address as its
+        only label, since ip addresses have no parent domains
+        """
+        return (self.value,)
+
+    @property
+    def sort_key(self):
+        """Get a key used for sorting and searching host objects.
+
+        :returns: a byte string consisting of a type prefix and
+        the packed value of the address
+        """
+        return self.sort_key_prefix + self.value.packed
 
     def is_subdomain(self, _):
         # pylint: disable=no-self-use
@@ -156,9 +281,17 @@ class IPAddress(Host):
     def is_match(self, other):
         """Check if self matches the other.
 
+        The addresses are compared by their sort keys, so the result
+        does not depend on whether both objects come from HOST_CACHE.
+
         :param other: the object to which this instance is compared
+        :returns: True if the other is an ip address of the same
+        version and value
         """
-        return self == other
+        try:
+            return self.sort_key == other.sort_key
+        except AttributeError:
+            return False
 
 
 class IPv4Address(IPAddress):
@@ -166,19 +299,102 @@ class IPv4Address(IPAddress):
 
     factory = ipaddress.IPv4Address
     reverse_domain = ipv4_reverse_domain
+    sort_key_prefix = b'\x04'
     invalid_ip_error_type = InvalidIPv4Error
 
+    @staticmethod
+    def _get_labels(reversed_octets):
+        return [_DECIMAL_LABELS[o] for o in reversed_octets]
+
 
 class IPv6Address(IPAddress):
     """A class of objects representing IPv6 addresses."""
 
     factory = ipaddress.IPv6Address
     reverse_domain = ipv6_reverse_domain
+    sort_key_prefix = b'\x06'
+    invalid_ip_error_type = InvalidIPv6Error
+
+    @staticmethod
+    def _get_labels(reversed_octets):
+        return [n for o in reversed_octets for n in _NIBBLE_LABELS[o]]
+
+
+class IPNetwork(Host):
+    """A class of objects representing networks of IP addresses.
+
+    The instances are used as items stored by custom host list objects,
+    matching all addresses belonging to the networks.
+    """
+
+    def __init__(self, value):
+        """Initialize a new instance.
+
+        :param value: a network in CIDR notation, valid for this class.
+        Host bits of the address may be set.
+        :raises self.invalid_ip_error_type: if the value is not
+        a valid network for this class
+        """
+        try:
+            self.value = self.factory(str(value), strict=False)
+        except ValueError:
+            msg_tpl = '{} is not a valid ip network for {}'
+            msg = msg_tpl.format(value, self.__class__)
+            raise_with_traceback(self.invalid_ip_error_type(msg))
+
+    def is_subdomain(self, _):
+        # pylint: disable=no-self-use
+        """Check if this object is a subdomain of the other.
+
+        :param other: another host
+        :returns: False, because ip network is not a domain
+        """
+        return False
+
+    def to_unicode(self):
+        """Get unicode string representing the object.
+
+        :returns: the network in CIDR notation as unicode string
+        """
+        return str(self.value)
+
+    def is_match(self, other):
+        """Check if the other belongs to the network.
+
+        :param other: the object to which this instance is compared
+        :returns: True if the other is an ip address belonging to
+        the network
+        """
+        try:
+            return other.value in self.value
+        except (AttributeError, TypeError):
+            return False
+
+
+class IPv4Network(IPNetwork):
+    """A class of objects representing IPv4 networks."""
+
+    factory = ipaddress.IPv4Network
+    invalid_ip_error_type = InvalidIPv4Error
+
+
+class IPv6Network(IPNetwork):
+    """A class of objects representing IPv6 networks."""
+
+    factory = ipaddress.IPv6Network
     invalid_ip_error_type = InvalidIPv6Error
 
 
+HOST_CACHE = HostObjectCache()
+
+
 def cached(function):
-    return lru_cache()(function)
+    """Make the function use the cache of host objects.
+
+    :param function: a host factory
+    :returns: a function storing host objects in HOST_CACHE
+    """
+    return HOST_CACHE.wrap(function)
 
 
 hostname = cached(Hostname)
@@ -202,18 +418,85 @@ def create_host(factories, value):
     :raises InvalidHostError: if the value is not a valid input for any
     factory used by this function
     """
-    data = [value]
+    errors = []
     for func in factories:
         try:
             return func(value)
         except InvalidHostError as ex:
-            data.append(str(ex))
+            errors.append(str(ex))
+    raise _host_creation_error(value, errors)
+
+
+def _host_creation_error(value, errors):
+    """Create an error reporting a failure to create a host object.
+
+    :param value: a value rejected by factories of host objects
+    :param errors: a list of messages of errors raised by the factories
+    :returns: an instance of InvalidHostError
+    """
+    data = [str(value)] + errors
     msg_tpl = (
         "Failed to create a host object for '{}', raising the following errors"
         " in the process:" + "\n".join(data)
     )
+    return InvalidHostError(msg_tpl.format(value))
+
+
+HOST_TYPE_IPV4, HOST_TYPE_IPV6, HOST_TYPE_HOSTNAME = 0, 1, 2
+
+_IPV4_CHARS_REGEX = re.compile(r'[0-9.]+\Z')
 
-    raise InvalidHostError(msg_tpl.format(value))
+
+def get_host_type(value):
+    """Recognize a type of host by syntax of the value.
+
+    The value is not validated: it can be rejected by a constructor of
+    host objects of the recognized type.
+
+    :param value: a value representing a host
+    :returns: HOST_TYPE_IPV6 for values containing a colon,
+    HOST_TYPE_IPV4 for values consisting only of digits and dots,
+    HOST_TYPE_HOSTNAME for other strings, or None if the value is
+    not a string
+    """
+    if not isinstance(value, str):
+        return None
+    if ':' in value:
+        return HOST_TYPE_IPV6
+    if _IPV4_CHARS_REGEX.match(value):
+        return HOST_TYPE_IPV4
+    return HOST_TYPE_HOSTNAME
+
+
+def dispatch_host(factories, value):
+    """Create a host object with a factory chosen for the value.
+
+    The value is passed only to the factory for its type of host, as
+    recognized by get_host_type. No other factory could accept a value
+    of that type, so the error raised by the chosen one is reported
+    without calling the others. Only values that are not recognized
+    as any type of host are passed to all the factories with
+    create_host.
+
+    :param factories: a tuple containing factories of host objects
+    for IPv4 addresses, IPv6 addresses and hostnames, at indexes equal
+    to the corresponding host types. None is used for types of hosts
+    that are not accepted.
+    :param value: a value to be passed as argument to the factory
+    :returns: an object representing the value
+    :raises InvalidHostError: if the value is not a valid input for any
+    of the factories
+    """
+    host_type = get_host_type(value)
+    if host_type is None:
+        return create_host(tuple(f for f in factories if f is not None), value)
+    factory = factories[host_type]
+    if factory is None:
+        raise _host_creation_error(value, ['the type of host is not accepted'])
+    try:
+        return factory(value)
+    except InvalidHostError as ex:
+        raise _host_creation_error(value, [str(ex)])
 
 
 def ip_address(value):
@@ -228,6 +511,18 @@ def ip_address(value):
     return create_host(factories, value)
 
 
+def ip_network(value):
+    """Create an IP network object.
+
+    :param value: a valid IP network in CIDR notation
+    :returns: an instance of a subclass of .structures.IPNetwork
+    :raises InvalidHostError: if the value is not a valid IPv4 or
+    IPv6 network
+    """
+    factories = IPv4Network, IPv6Network
+    return create_host(factories, value)
+
+
 def hostname_or_ip(value):
     """Create a hostname or an IP address object.
 
@@ -237,10 +532,7 @@ def hostname_or_ip(value):
     IP address
     """
     factories = ip_v4, ip_v6, hostname
-    return create_host(factories, value)
-
-
-TLD_EXTRACTOR = tldextract.TLDExtract()
+    return dispatch_host(factories, value)
 
 
 def registered_domain(value):
@@ -248,10 +540,11 @@ def registered_domain(value):
 
     :param value: a valid host string
     :returns: a Hostname instance representing a registered domain
-    extracted from the given value.
+    extracted from the given value, using the public suffix list
+    bundled with the library.
     :raises InvalidHostnameError: if the value is not a valid hostname
     """
-    registered_domain_string = TLD_EXTRACTOR(value).registered_domain
+    registered_domain_string = get_registered_domain(str(value))
     return hostname(registered_domain_string)
 
 
@@ -264,7 +557,7 @@ def registered_domain_or_ip(value):
     :raises InvalidHostError: if the value is not a valid host
     """
     factories = ip_v4, ip_v6, registered_domain
-    return create_host(factories, value)
+    return dispatch_host(factories, value)
 
 
 def non_ipv6_host(value):
@@ -276,8 +569,8 @@ def non_ipv6_host(value):
     :raises InvalidHostError: if the value is not a valid hostname or
     IPv4 address
     """
-    factories = ip_v4, registered_domain
-    return create_host(factories, value)
+    factories = ip_v4, None, registered_domain
+    return dispatch_host(factories, value)
 
 
 AddressListItem = namedtuple('AddressListItem', 'value source classification')
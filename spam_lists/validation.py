@@ -4,22 +4,72 @@
 from __future__ import unicode_literals
 
 import functools
+import ipaddress
 import re
 
-from future.moves.urllib.parse import urlparse
-import validators
+# pylint: disable=redefined-builtin
+from builtins import str
 
+from .compat import urlparse
 from .exceptions import InvalidURLError, InvalidHostError
 
 
+def is_valid_ip_address(value):
+    """Check if given value is a valid IPv4 or IPv6 address.
+
+    :param value: a value to test
+    :returns: True if the value is valid. IPv6 addresses with a scope
+    identifier are not accepted.
+    """
+    if not isinstance(value, str) or '%' in value:
+        return False
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+
 def is_valid_host(value):
     """Check if given value is a valid host string.
 
     :param value: a value to test
     :returns: True if the value is valid
     """
-    host_validators = validators.ipv4, validators.ipv6, validators.domain
-    return any(f(value) for f in host_validators)
+    return is_valid_ip_address(value) or is_valid_hostname(value)
+
+
+HOSTNAME_REGEX = re.compile(
+    r'^(?:(?:[a-z]|[a-z0-9][a-z0-9\-_]{0,61}[a-z0-9])\.)+'  # subdomains
+    r'(?:[a-z]{2,13}|xn--[a-z0-9]{1,59})\Z',  # top-level domain
+    re.IGNORECASE
+)
+
+
+def is_valid_hostname(value):
+    """Check if given value is a valid hostname.
+
+    The value is matched against the same pattern as used by
+    validators.domain function of validators 0.11.0: labels of
+    subdomains contain letters, digits, hyphens and underscores, and
+    the top-level domain consists of 2 to 13 letters or is
+    an internationalized one in ASCII-compatible encoding.
+    Internationalized hostnames are validated after converting them
+    to their ASCII form.
+
+    :param value: a value to test
+    :returns: True if the value is valid
+    """
+    try:
+        value.encode('ascii')
+    except UnicodeError:
+        try:
+            value = value.encode('idna').decode('ascii')
+        except UnicodeError:
+            return False
+    except AttributeError:
+        return False
+    return HOSTNAME_REGEX.match(value) is not None
 
 
 URL_REGEX = re.compile(r'^[a-z0-9\.\-\+]*://'  # scheme
@@ -13,9 +13,13 @@ except ImportError:
     # pylint: disable=import-error
     from mock import Mock, MagicMock, patch  # @NoMove @UnusedImport
 
-from six import assertCountEqual, PY2
+try:
+    from functools import lru_cache  # @NoMove
+except ImportError:
+    # pylint: disable=import-error
+    from cachetools.func import lru_cache  # @NoMove @UnusedImport
 
-from spam_lists.compat import lru_cache  # @NoMove @UnusedImport
+from six import assertCountEqual, PY2
 
 
 class Py2TestCase(unittest.TestCase):
@@ -9,14 +9,13 @@ from __future__ import unicode_literals
 import os.path
 
 from builtins import object  # pylint: disable=redefined-builtin
-import tldextract
-from validators import ipv6
 
 from spam_lists.clients import (
     SPAMHAUS_ZEN, SPAMHAUS_ZEN_CLASSIFICATION, SPAMHAUS_DBL,
     SPAMHAUS_DBL_CLASSIFICATION, SURBL_MULTI, SURBL_MULTI_CLASSIFICATION
 )
 from spam_lists.clients import HpHosts, GoogleSafeBrowsing
+from spam_lists.public_suffix import get_registered_domain
 from spam_lists.structures import AddressListItem
 from test.compat import unittest
 
@@ -28,7 +27,7 @@ def ip_or_registered_domain(host):
     :returns: the host value if it is an IP address or a registered
     domain extracted from it if it is a hostname.
     """
-    registered_domain = tldextract.extract(host).registered_domain
+    registered_domain = get_registered_domain(host)
     return host if not registered_domain else registered_domain
 
 
@@ -38,7 +37,7 @@ def url_from_host(host):
     :param host: a host value to be used in the URL
     :returns: a URL to be used during testing
     """
-    if ipv6(host):
+    if ':' in host:
         host = '['+host+']'
     return 'http://'+host
 
@@ -261,6 +261,54 @@ class HostListTestMixin(URLTesterTestMixin):
         """
         self.assertIsNone(self.tested_instance.lookup(value))
 
+    def _test_batch_function(self, function_name, single_function, ordered):
+        """Test a method processing many host values concurrently.
+
+        :param function_name: a name of the method to be tested
+        :param single_function: a function whose results for single
+        host values are expected to be returned by the tested method
+        :param ordered: a value of ordered argument of the method
+        """
+        values = [v for _, v in self.valid_host_input]
+        self._set_matching_hosts(values[1:])
+        expected = [(v, single_function(v)) for v in values]
+        function = getattr(self.tested_instance, function_name)
+        actual = list(function(values, max_workers=2, ordered=ordered))
+        if ordered:
+            self.assertEqual(expected, actual)
+        else:
+            self.assertCountEqual(expected, actual)
+
+    @parameterized.expand([
+        ('ordered', True),
+        ('in_order_of_completion', False)
+    ])
+    def test_contains_many_returns_results(self, _, ordered):
+        """Test if results of membership tests are returned.
+
+        :param ordered: a value of ordered argument of the method
+        """
+        self._test_batch_function(
+            'contains_many',
+            lambda v: v in self.tested_instance,
+            ordered
+        )
+
+    @parameterized.expand([
+        ('ordered', True),
+        ('in_order_of_completion', False)
+    ])
+    def test_lookup_many_returns_results(self, _, ordered):
+        """Test if results of lookups are returned.
+
+        :param ordered: a value of ordered argument of the method
+        """
+        self._test_batch_function(
+            'lookup_many',
+            self.tested_instance.lookup,
+            ordered
+        )
+
 
 @lru_cache()
 def host_list_host_factory(host):
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for asynchronous DNSBL clients.
+
+The clients are tested against a local UDP DNS server serving
+preconfigured answers.
+"""
+from __future__ import unicode_literals
+
+import sys
+
+from dns import message, name, rcode, rrset
+from dns.exception import Timeout
+from dns.resolver import NoNameservers
+from nose_parameterized import parameterized
+
+from spam_lists.cache import TTLCache
+from spam_lists.clients import DNSBL, BitmaskingDNSBL, DNSResolver
+from spam_lists.exceptions import (
+    InvalidHostError, InvalidURLError, UnknownCodeError
+)
+from spam_lists.structures import AddressListItem, hostname_or_ip
+from test.compat import unittest
+
+ASYNC_CLIENTS_SUPPORTED = sys.version_info >= (3, 5)
+
+if ASYNC_CLIENTS_SUPPORTED:
+    import asyncio
+    from spam_lists.async_clients import AsyncDNSBL
+    DatagramProtocol = asyncio.DatagramProtocol
+else:
+    DatagramProtocol = object
+
+skip_if_unsupported = unittest.skipIf(
+    not ASYNC_CLIENTS_SUPPORTED,
+    'asynchronous clients require Python 3.5 or greater'
+)
+
+
+class StandInDNSServerProtocol(DatagramProtocol):
+    """A protocol of a local DNS server answering A queries.
+
+    :ivar answers: a dictionary mapping query names to last octets
+    of addresses returned for them. Other names are answered with
+    NXDOMAIN.
+    :ivar response_code: if not None, a code of all responses sent
+    by the server
+    :ivar silent: if True, the server does not respond at all
+    :ivar queries: a list of names queried so far
+    """
+
+    def __init__(self):
+        self.answers = {}
+        self.response_code = None
+        self.silent = False
+        self.queries = []
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        request = message.from_wire(data)
+        query_name = request.question[0].name
+        self.queries.append(query_name)
+        if self.silent:
+            return
+        response = message.make_response(request)
+        if self.response_code is not None:
+            response.set_rcode(self.response_code)
+        elif query_name in self.answers:
+            answer = rrset.from_text(
+                query_name,
+                300,
+                'IN',
+                'A',
+                *['127.0.0.{}'.format(o) for o in self.answers[query_name]]
+            )
+            response.answer.append(answer)
+        else:
+            response.set_rcode(rcode.NXDOMAIN)
+            soa = rrset.from_text(
+                query_name.parent(),
+                3600,
+                'IN',
+                'SOA',
+                'ns.test. admin.test. 1 3600 600 86400 60'
+            )
+            response.authority.append(soa)
+        self.transport.sendto(response.to_wire(), addr)
+
+
+class AsyncDNSBLTestMixin(object):
+    """Tests for AsyncDNSBL class.
+
+    :cvar dnsbl_factory: a class of the wrapped DNSBL client
+    :cvar classification_map: a classification map of the wrapped
+    client
+    :ivar loop: an event loop running the tests
+    :ivar server: a protocol of the stand-in DNS server
+    :ivar tested_instance: an instance of tested class
+    """
+
+    query_suffix = 'test.query.domain'
+    classification_map = {2: 'spam', 4: 'malware', 8: 'phishing'}
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        transport, self.server = self.loop.run_until_complete(
+            self.loop.create_datagram_endpoint(
+                StandInDNSServerProtocol,
+                local_addr=('127.0.0.1', 0)
+            )
+        )
+        self.transport = transport
+        port = transport.get_extra_info('sockname')[1]
+        self.dnsbl = self.dnsbl_factory(
+            'test_service',
+            self.query_suffix,
+            self.classification_map,
+            hostname_or_ip
+        )
+        self.tested_instance = AsyncDNSBL(
+            self.dnsbl,
+            nameservers=['127.0.0.1'],
+            port=port,
+            timeout=0.2
+        )
+
+    def tearDown(self):
+        self.transport.close()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def _set_listed(self, host, *codes):
+        host_object = hostname_or_ip(host)
+        query_name = host_object.relative_domain.derelativize(
+            name.from_text(self.query_suffix)
+        )
+        self.server.answers[query_name] = codes or (2,)
+
+    @parameterized.expand([
+        ('ipv4', '255.0.120.1'),
+        ('hostname', 'test.pl'),
+        ('ipv6', '2001:ddd:ccc:111::33')
+    ])
+    def test_contains_for_listed(self, _, host):
+        """Test if True is returned for a listed host.
+
+        :param host: a host value set up as listed
+        """
+        self._set_listed(host)
+        self.assertTrue(self._run(self.tested_instance.contains(host)))
+
+    def test_contains_for_not_listed(self):
+        """Test if False is returned for a host that is not listed."""
+        self.assertFalse(self._run(self.tested_instance.contains('test.pl')))
+
+    def test_contains_for_invalid_host(self):
+        """Test if InvalidHostError is raised for an invalid host."""
+        with self.assertRaises(InvalidHostError):
+            self._run(self.tested_instance.contains('-e'))
+
+    def test_lookup_for_listed(self):
+        """Test if an expected item is returned for a listed host."""
+        self._set_listed('test.pl', 2)
+        expected = AddressListItem('test.pl', self.dnsbl, {'spam'})
+        actual = self._run(self.tested_instance.lookup('test.pl'))
+        self.assertEqual(expected, actual)
+
+    def test_lookup_for_not_listed(self):
+        """Test if None is returned for a host that is not listed."""
+        self.assertIsNone(self._run(self.tested_instance.lookup('test.pl')))
+
+    def test_lookup_for_unknown_code(self):
+        """Test if UnknownCodeError is raised for an unknown return code."""
+        self._set_listed('test.pl', 3)
+        with self.assertRaises(UnknownCodeError):
+            self._run(self.tested_instance.lookup('test.pl'))
+
+    def test_lookup_for_server_failure(self):
+        """Test if NoNameservers is raised when the name server fails."""
+        self.server.response_code = rcode.SERVFAIL
+        with self.assertRaises(NoNameservers):
+            self._run(self.tested_instance.lookup('test.pl'))
+
+    def test_lookup_for_timeout(self):
+        """Test if Timeout is raised when the name server does not respond."""
+        self.server.silent = True
+        with self.assertRaises(Timeout):
+            self._run(self.tested_instance.lookup('test.pl'))
+
+    def test_lookup_result_equals_sync_result(self):
+        """Test if the classification is decoded by the wrapped client."""
+        self._set_listed('test.pl', 2, 4)
+        expected = self.dnsbl._get_classification(
+            self._run(self.tested_instance._query(hostname_or_ip('test.pl')))
+        )
+        actual = self._run(self.tested_instance.lookup('test.pl'))
+        self.assertEqual(expected, actual.classification)
+
+    def test_resolver_settings_used(self):
+        """Test if settings of the resolver of the client are used."""
+        self.dnsbl.resolver = DNSResolver(
+            ['127.0.0.1'],
+            port=self.tested_instance.port,
+            timeout=0.1,
+            retries=2
+        )
+        self.tested_instance = AsyncDNSBL(self.dnsbl)
+        self.server.silent = True
+        with self.assertRaises(Timeout):
+            self._run(self.tested_instance.lookup('test.pl'))
+        self.assertEqual(3, len(self.server.queries))
+
+    @parameterized.expand([
+        ('listed', ['test.pl']),
+        ('not_listed', [])
+    ])
+    def test_lookup_with_cache_for(self, _, listed_hosts):
+        """Test if a cached answer is used for a repeated query.
+
+        :param listed_hosts: hosts set up as listed
+        """
+        self.dnsbl.cache = TTLCache()
+        for host in listed_hosts:
+            self._set_listed(host)
+        expected = self._run(self.tested_instance.lookup('test.pl'))
+        actual = self._run(self.tested_instance.lookup('test.pl'))
+        self.assertEqual(expected, actual)
+        self.assertEqual(1, len(self.server.queries))
+
+    @parameterized.expand([
+        ('any_match'),
+        ('lookup_matching'),
+        ('filter_matching')
+    ])
+    def test_invalid_url_for(self, function_name):
+        """Test if InvalidURLError is raised for an invalid URL.
+
+        :param function_name: a name of a coroutine function to be tested
+        """
+        function = getattr(self.tested_instance, function_name)
+        with self.assertRaises(InvalidURLError):
+            self._run(function(['http://test.com', 'invalid']))
+
+    def test_any_match_returns_true(self):
+        """Test if True is returned when any of the URLs is listed."""
+        self._set_listed('listed.com')
+        urls = ['http://test.com', 'http://listed.com']
+        self.assertTrue(self._run(self.tested_instance.any_match(urls)))
+
+    def test_any_match_returns_false(self):
+        """Test if False is returned when none of the URLs is listed."""
+        urls = ['http://test.com', 'http://127.33.22.11']
+        self.assertFalse(self._run(self.tested_instance.any_match(urls)))
+
+    def test_lookup_matching(self):
+        """Test if items for matching URLs are returned in input order."""
+        self._set_listed('listed.com')
+        self._set_listed('127.33.22.11', 4)
+        urls = [
+            'http://test.com',
+            'http://127.33.22.11',
+            'https://listed.com/path'
+        ]
+        expected = [
+            AddressListItem('127.33.22.11', self.dnsbl, {'malware'}),
+            AddressListItem('listed.com', self.dnsbl, {'spam'})
+        ]
+        actual = self._run(self.tested_instance.lookup_matching(urls))
+        self.assertEqual(expected, actual)
+
+    def test_filter_matching(self):
+        """Test if all queries for a large batch of URLs are completed."""
+        hosts = ['host{}.com'.format(i) for i in range(300)]
+        listed = hosts[::7]
+        for host in listed:
+            self._set_listed(host)
+        urls = ['http://' + h for h in hosts]
+        expected = ['http://' + h for h in listed]
+        actual = self._run(self.tested_instance.filter_matching(urls))
+        self.assertEqual(expected, actual)
+        self.assertEqual(len(hosts), len(self.server.queries))
+
+
+@skip_if_unsupported
+class AsyncDNSBLTest(AsyncDNSBLTestMixin, unittest.TestCase):
+    """Tests for AsyncDNSBL wrapping a DNSBL instance."""
+
+    # pylint: disable=too-many-public-methods
+    dnsbl_factory = DNSBL
+
+
+@skip_if_unsupported
+class AsyncBitmaskingDNSBLTest(AsyncDNSBLTestMixin, unittest.TestCase):
+    """Tests for AsyncDNSBL wrapping a BitmaskingDNSBL instance."""
+
+    # pylint: disable=too-many-public-methods
+    dnsbl_factory = BitmaskingDNSBL
+
+    def test_lookup_for_bitmask(self):
+        """Test if classification is decoded from a bitmask code."""
+        self._set_listed('test.pl', 2 + 8)
+        expected = AddressListItem('test.pl', self.dnsbl, {'spam', 'phishing'})
+        actual = self._run(self.tested_instance.lookup('test.pl'))
+        self.assertEqual(expected, actual)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for BloomFilter class."""
+from __future__ import unicode_literals
+
+from threading import Thread
+
+# pylint: disable=redefined-builtin
+from builtins import range
+from nose_parameterized import parameterized
+
+from spam_lists.bloom import BloomFilter
+from test.compat import unittest
+
+
+class BloomFilterTest(unittest.TestCase):
+    """Tests for BloomFilter class.
+
+    :ivar tested_instance: an instance of tested class, containing
+    values from the values attribute
+    :ivar values: byte strings added to the tested instance
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.values = [
+            '{}.example.com'.format(i).encode('ascii') for i in range(1000)
+        ]
+        self.tested_instance = BloomFilter(len(self.values), 0.01)
+        for value in self.values:
+            self.tested_instance.add(value)
+
+    @parameterized.expand([
+        ('zero_capacity', 0, 0.01),
+        ('zero_rate', 10, 0),
+        ('rate_equal_to_one', 10, 1),
+    ])
+    def test_constructor_for_invalid(self, _, capacity, rate):
+        """Test if ValueError is raised for invalid arguments.
+
+        :param capacity: a capacity of the filter
+        :param rate: an expected false positive rate
+        """
+        with self.assertRaises(ValueError):
+            BloomFilter(capacity, rate)
+
+    def test_contains_for_added_values(self):
+        """Test if there are no false negative results."""
+        for value in self.values:
+            self.assertIn(value, self.tested_instance)
+
+    def test_contains_for_missing_values(self):
+        """Test if false positive results are rare."""
+        missing = [
+            '{}.example.org'.format(i).encode('ascii') for i in range(10000)
+        ]
+        false_positives = sum(1 for v in missing if v in self.tested_instance)
+        self.assertLess(false_positives, 300)
+
+    def test_len(self):
+        """Test if the number of added values is returned."""
+        self.assertEqual(len(self.values), len(self.tested_instance))
+
+    def test_memory_usage(self):
+        """Test if the size of the bit array is about 10 bits per value."""
+        self.assertEqual(1199, self.tested_instance.memory_usage)
+
+    def test_expected_false_positive_rate(self):
+        """Test if the rate at the capacity of the filter is expected."""
+        self.assertAlmostEqual(
+            0.01,
+            self.tested_instance.expected_false_positive_rate,
+            places=3
+        )
+
+    def test_false_positive_rate_without_tests(self):
+        """Test if None is returned when no tests were recorded."""
+        self.assertIsNone(self.tested_instance.false_positive_rate)
+
+    def test_false_positive_rate(self):
+        """Test if the measured rate is calculated from counters."""
+        self.tested_instance.false_positives = 1
+        self.tested_instance.true_negatives = 3
+        self.assertEqual(0.25, self.tested_instance.false_positive_rate)
+
+    def test_record_test_results(self):
+        """Test if recorded results are counted."""
+        self.tested_instance.record_false_positive()
+        for _ in range(3):
+            self.tested_instance.record_true_negative()
+        self.assertEqual(0.25, self.tested_instance.false_positive_rate)
+
+    def test_add_from_many_threads(self):
+        """Test if values added concurrently are all stored."""
+        values = [
+            '{}.example.net'.format(i).encode('ascii') for i in range(4000)
+        ]
+        tested_instance = BloomFilter(len(values), 0.01)
+
+        def add(part):
+            for value in values[part::4]:
+                tested_instance.add(value)
+
+        threads = [Thread(target=add, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(values), len(tested_instance))
+        self.assertTrue(all(v in tested_instance for v in values))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for caches defined in spam_lists.cache."""
+from __future__ import unicode_literals
+
+import gc
+import weakref
+
+from nose_parameterized import parameterized
+
+from spam_lists.cache import HostObjectCache, TTLCache
+from spam_lists.exceptions import InvalidHostError, InvalidHostnameError
+from test.compat import Mock, unittest
+
+
+class TTLCacheTest(unittest.TestCase):
+    """Tests for TTLCache class.
+
+    :ivar now: current time returned by the timer of tested instance
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.now = 100.0
+        self.tested_instance = TTLCache(maxsize=3, timer=lambda: self.now)
+
+    def test_get_for_missing_key(self):
+        """Test if the default value is returned for a missing key."""
+        default = object()
+        self.assertIs(default, self.tested_instance.get('key', default))
+        self.assertEqual(1, self.tested_instance.misses)
+
+    @parameterized.expand([
+        ('value', 'value'),
+        ('none', None)
+    ])
+    def test_get_for_stored(self, _, value):
+        """Test if a stored value is returned.
+
+        :param value: a value to be stored
+        """
+        self.tested_instance.set('key', value, 10)
+        self.assertEqual(value, self.tested_instance.get('key', 'default'))
+        self.assertEqual(1, self.tested_instance.hits)
+
+    def test_get_for_expired(self):
+        """Test if the default value is returned for an expired value."""
+        self.tested_instance.set('key', 'value', 10)
+        self.now += 10
+        self.assertIsNone(self.tested_instance.get('key'))
+        self.assertEqual(1, self.tested_instance.expirations)
+        self.assertEqual(1, self.tested_instance.misses)
+        self.assertEqual(0, len(self.tested_instance))
+
+    @parameterized.expand([
+        ('zero', 0),
+        ('negative', -5)
+    ])
+    def test_set_for_ttl(self, _, ttl):
+        """Test if a value with non-positive TTL is not stored.
+
+        :param ttl: a time-to-live of the value
+        """
+        self.tested_instance.set('key', 'value', ttl)
+        self.assertEqual(0, len(self.tested_instance))
+
+    def test_set_for_max_ttl(self):
+        """Test if TTL of the value is limited to max_ttl."""
+        self.tested_instance.max_ttl = 5
+        self.tested_instance.set('key', 'value', 10)
+        self.now += 5
+        self.assertIsNone(self.tested_instance.get('key'))
+
+    def test_set_evicts_least_recently_used(self):
+        """Test if the least recently used item is evicted."""
+        for key in 'abc':
+            self.tested_instance.set(key, key, 10)
+        self.tested_instance.get('a')
+        self.tested_instance.set('d', 'd', 10)
+        self.assertEqual(1, self.tested_instance.evictions)
+        self.assertIsNone(self.tested_instance.get('b'))
+        for key in 'acd':
+            self.assertEqual(key, self.tested_instance.get(key))
+
+    def test_set_for_stored_key(self):
+        """Test if a value is replaced without evicting other items."""
+        for key in 'abc':
+            self.tested_instance.set(key, key, 10)
+        self.tested_instance.set('a', 'new', 10)
+        self.assertEqual(0, self.tested_instance.evictions)
+        self.assertEqual('new', self.tested_instance.get('a'))
+
+    def test_clear(self):
+        """Test if all items are removed."""
+        self.tested_instance.set('key', 'value', 10)
+        self.tested_instance.clear()
+        self.assertEqual(0, len(self.tested_instance))
+
+
+class Local(object):
+    """A class of objects to which weak references can be created."""
+
+
+class HostObjectCacheTest(unittest.TestCase):
+    """Tests for HostObjectCache class.
+
+    :ivar factory: a mock of a host factory
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.factory = Mock(side_effect=lambda value: value.upper())
+        self.tested_instance = HostObjectCache(maxsize=3)
+
+    def test_call_for_new_value(self):
+        """Test if a value returned by the factory is returned."""
+        self.assertEqual('A', self.tested_instance.call(self.factory, 'a'))
+        self.assertEqual(1, self.tested_instance.misses)
+        self.assertEqual(1, len(self.tested_instance))
+
+    def test_call_for_cached_value(self):
+        """Test if a cached value is returned without calling factory."""
+        self.tested_instance.call(self.factory, 'a')
+        self.assertEqual('A', self.tested_instance.call(self.factory, 'a'))
+        self.factory.assert_called_once_with('a')
+        self.assertEqual(1, self.tested_instance.hits)
+
+    def test_call_for_different_factories(self):
+        """Test if values of different factories are stored separately."""
+        other_factory = Mock(return_value='other')
+        self.tested_instance.call(self.factory, 'a')
+        self.assertEqual(
+            'other',
+            self.tested_instance.call(other_factory, 'a')
+        )
+
+    def test_call_evicts_least_recently_used(self):
+        """Test if the least recently used value is evicted."""
+        for value in 'abc':
+            self.tested_instance.call(self.factory, value)
+        self.tested_instance.call(self.factory, 'a')
+        self.tested_instance.call(self.factory, 'd')
+        self.assertEqual(1, self.tested_instance.evictions)
+        self.factory.reset_mock()
+        for value in 'acd':
+            self.tested_instance.call(self.factory, value)
+        self.factory.assert_not_called()
+        self.tested_instance.call(self.factory, 'b')
+        self.factory.assert_called_once_with('b')
+
+    def _call_invalid(self, factory):
+        with self.assertRaises(InvalidHostnameError) as context:
+            self.tested_instance.call(factory, 'invalid')
+        self.assertEqual(('invalid',), context.exception.args)
+
+    @parameterized.expand([
+        ('not_cached', False, 2, 0),
+        ('cached', True, 1, 1)
+    ])
+    def test_call_for_error_when_errors_are(
+            self, _, cache_errors, expected_calls, expected_len):
+        """Test if an error raised by the factory is raised again.
+
+        :param cache_errors: a value of cache_errors attribute of
+        tested instance
+        :param expected_calls: an expected number of calls to
+        the factory
+        :param expected_len: an expected number of cached items
+        """
+        self.tested_instance.cache_errors = cache_errors
+        factory = Mock(side_effect=InvalidHostnameError('invalid'))
+        for _ in range(2):
+            self._call_invalid(factory)
+        self.assertEqual(expected_calls, factory.call_count)
+        self.assertEqual(expected_len, len(self.tested_instance))
+
+    def test_cached_error_does_not_keep_caller_alive(self):
+        """Test if a cached error keeps no reference to caller frames."""
+        self.tested_instance.cache_errors = True
+
+        def factory(value):
+            raise InvalidHostnameError(value)
+
+        def call():
+            local = Local()
+            try:
+                self.tested_instance.call(factory, 'invalid')
+            except InvalidHostnameError:
+                pass
+            return weakref.ref(local)
+
+        reference = call()
+        gc.collect()
+        self.assertIsNone(reference())
+        self._call_invalid(factory)
+
+    def test_call_does_not_cache_other_errors(self):
+        """Test if errors other than InvalidHostError are not cached."""
+        self.tested_instance.cache_errors = True
+        factory = Mock(side_effect=TypeError)
+        for _ in range(2):
+            self.assertRaises(
+                TypeError,
+                self.tested_instance.call,
+                factory,
+                'a'
+            )
+        self.assertEqual(2, factory.call_count)
+
+    def test_maxsize_setter_evicts_items(self):
+        """Test if items exceeding the new size are evicted."""
+        for value in 'abc':
+            self.tested_instance.call(self.factory, value)
+        self.tested_instance.maxsize = 1
+        self.assertEqual(1, len(self.tested_instance))
+        self.assertEqual(2, self.tested_instance.evictions)
+        self.factory.reset_mock()
+        self.tested_instance.call(self.factory, 'c')
+        self.factory.assert_not_called()
+
+    def test_call_for_zero_maxsize(self):
+        """Test if no values are stored by a disabled cache."""
+        self.tested_instance.maxsize = 0
+        self.tested_instance.call(self.factory, 'a')
+        self.assertEqual(0, len(self.tested_instance))
+
+    def test_wrap(self):
+        """Test if a wrapped factory uses the cache."""
+        wrapped = self.tested_instance.wrap(self.factory)
+        self.assertEqual('A', wrapped('a'))
+        self.assertEqual('A', wrapped('a'))
+        self.factory.assert_called_once_with('a')
+
+    def test_wrap_for_error_subclass(self):
+        """Test if a cached error is raised with its original type."""
+        self.tested_instance.cache_errors = True
+        factory = Mock(side_effect=InvalidHostnameError('invalid'))
+        wrapped = self.tested_instance.wrap(factory)
+        for _ in range(2):
+            self.assertRaises(InvalidHostError, wrapped, 'invalid')
+            self._call_invalid(factory)
+
+    def test_clear(self):
+        """Test if all items are removed."""
+        self.tested_instance.call(self.factory, 'a')
+        self.tested_instance.clear()
+        self.assertEqual(0, len(self.tested_instance))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -3,21 +3,59 @@
 """Tests for classes representing blacklist service clients."""
 from __future__ import unicode_literals
 
-from dns.resolver import NXDOMAIN
+from threading import Event, Thread
+import time
+import warnings
+
+from dns import message, rcode, rdatatype
+from dns.exception import Timeout
+from dns.resolver import NXDOMAIN, Resolver
 from future.moves.urllib.parse import urlparse, parse_qs
 from nose_parameterized import parameterized
 from requests.exceptions import HTTPError
 
+from spam_lists.cache import TTLCache
 from spam_lists.exceptions import UnathorizedAPIKeyError, UnknownCodeError
 from spam_lists.clients import (
-    DNSBL, GoogleSafeBrowsing, HpHosts, BitmaskingDNSBL
+    DNSBL, GoogleSafeBrowsing, HpHosts, BitmaskingDNSBL, DNSResolver,
+    get_classification_table
 )
-from test.compat import unittest, Mock, patch
+from test.compat import unittest, Mock, MagicMock, patch
 from test.unit.common_definitions import (
     HostListTestMixin, host_list_host_factory, URLTesterTestMixin
 )
 
 
+class DNSAnswerMock(list):
+    """A list of DNS records with a mock of rrset attribute."""
+
+    def __init__(self, records, ttl):
+        """Initialize a new instance.
+
+        :param records: mocks of DNS A records
+        :param ttl: a time-to-live of the records
+        """
+        super(DNSAnswerMock, self).__init__(records)
+        self.rrset = Mock()
+        self.rrset.ttl = ttl
+
+
+def get_nxdomain_response_mock(ttl, minimum):
+    """Get a mock of NXDOMAIN response containing a SOA record.
+
+    :param ttl: a time-to-live of the SOA record
+    :param minimum: a value of minimum field of the SOA record
+    :returns: a mock of an instance of dns.message.Message
+    """
+    soa = MagicMock()
+    soa.rdtype = rdatatype.SOA
+    soa.ttl = ttl
+    soa.__getitem__.return_value.minimum = minimum
+    response = Mock()
+    response.authority = [soa]
+    return response
+
+
 class DNSQuerySideEffects(object):
     """A class providing a side effect for a mock of query function."""
 
@@ -31,6 +69,8 @@ class DNSQuerySideEffects(object):
         """
         self.expected_query_names = expected_query_names
         self.last_octet = last_octet
+        self.ttl = 300
+        self.negative_ttl = 60
 
     def __call__(self, query_name):
         """Query for a DNS name.
@@ -43,9 +83,35 @@ class DNSQuerySideEffects(object):
         if query_name in self.expected_query_names:
             dns_answer_mock = Mock()
             return_value = '121.0.0.{}'.format(self.last_octet)
-            dns_answer_mock.to_text.return_value = return_value
-            return [dns_answer_mock]
-        raise NXDOMAIN
+            dns_answer_mock.address = return_value
+            return DNSAnswerMock([dns_answer_mock], self.ttl)
+        response = get_nxdomain_response_mock(3600, self.negative_ttl)
+        raise NXDOMAIN(qnames=[query_name], responses={query_name: response})
+
+
+def call_during_blocked_query(query_mock, function, *args):
+    """Call the function concurrently while the query is blocked.
+
+    :param query_mock: a mock of a function used by the function to
+    query a service. Its side effect is delayed until all the calls are
+    started.
+    :param function: a function to be called in multiple threads
+    :param args: arguments for the function
+    """
+    release = Event()
+    side_effect = query_mock.side_effect
+
+    def blocked_side_effect(*query_args):
+        release.wait()
+        return side_effect(*query_args)
+    query_mock.side_effect = blocked_side_effect
+    threads = [Thread(target=function, args=args) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
 
 
 class DNSBLTestMixin(HostListTestMixin):
@@ -119,6 +185,185 @@ class DNSBLTestMixin(HostListTestMixin):
 
         self.assertRaises(UnknownCodeError, function, tested_value)
 
+    @parameterized.expand([
+        ('listed', ['listed.com']),
+        ('not_listed', [])
+    ])
+    def test_concurrent_lookups_for(self, _, listed_hosts):
+        """Test if concurrent lookups of a host share a single query.
+
+        :param listed_hosts: hosts set up as listed
+        """
+        self._set_matching_hosts(listed_hosts)
+        call_during_blocked_query(
+            self.dns_query_mock,
+            self.tested_instance.lookup,
+            'listed.com'
+        )
+        self.assertEqual(1, self.dns_query_mock.call_count)
+
+    def _set_up_cache(self):
+        self.now = 100.0
+        self.tested_instance.cache = TTLCache(timer=lambda: self.now)
+
+    @parameterized.expand([
+        ('listed', ['listed.com']),
+        ('not_listed', [])
+    ])
+    def test_lookup_with_cache_for(self, _, listed_hosts):
+        """Test if a cached answer is used for a repeated query.
+
+        :param listed_hosts: hosts set up as listed
+        """
+        self._set_up_cache()
+        self._set_matching_hosts(listed_hosts)
+        expected = self.tested_instance.lookup('listed.com')
+        actual = self.tested_instance.lookup('listed.com')
+        self.assertEqual(expected, actual)
+        self.assertEqual(1, self.dns_query_mock.call_count)
+
+    @parameterized.expand([
+        ('listed', ['listed.com'], 300),
+        ('not_listed', [], 60)
+    ])
+    def test_lookup_with_cache_after_ttl_for(self, _, listed_hosts, ttl):
+        """Test if the service is queried after the answer expires.
+
+        :param listed_hosts: hosts set up as listed
+        :param ttl: a time for which the answer is expected to be
+        cached
+        """
+        self._set_up_cache()
+        self._set_matching_hosts(listed_hosts)
+        self.tested_instance.lookup('listed.com')
+        self.now += ttl - 1
+        self.tested_instance.lookup('listed.com')
+        self.assertEqual(1, self.dns_query_mock.call_count)
+        self.now += 1
+        self.tested_instance.lookup('listed.com')
+        self.assertEqual(2, self.dns_query_mock.call_count)
+
+
+class DNSBLWithResolverTest(DNSBLTestMixin, unittest.TestCase):
+    """Tests for DNSBL class using its own resolver.
+
+    :ivar default_query_mock: a mocked implementation of the query
+    function of the default resolver
+    :ivar dns_query_mock: a mocked implementation of query method
+    of the resolver used by tested instance
+    """
+
+    # pylint: disable=too-many-public-methods
+    dnsbl_factory = DNSBL
+
+    def setUp(self):
+        super(DNSBLWithResolverTest, self).setUp()
+        self.default_query_mock = self.dns_query_mock
+        resolver = Mock()
+        resolver.query.side_effect = self.default_query_mock.side_effect
+        self.dns_query_mock = resolver.query
+        self.tested_instance.resolver = resolver
+
+    def test_default_resolver_not_used(self):
+        """Test if the default resolver is not used by the instance."""
+        self._set_matching_hosts(['listed.com'])
+        self.tested_instance.lookup('listed.com')
+        self.assertEqual(1, self.dns_query_mock.call_count)
+        self.default_query_mock.assert_not_called()
+
+
+class DNSResolverTest(unittest.TestCase):
+    """Tests for DNSResolver class.
+
+    :ivar query_patcher: an object used for patching the method of
+    the base class used for resolving names: resolve or, for dnspython
+    older than 2.0, query
+    :ivar query_mock: a mock of the method
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.query_patcher = patch.object(
+            Resolver,
+            'resolve' if hasattr(Resolver, 'resolve') else 'query'
+        )
+        self.query_mock = self.query_patcher.start()
+
+    def tearDown(self):
+        self.query_patcher.stop()
+
+    def test_settings(self):
+        """Test if the resolver uses given settings."""
+        resolver = DNSResolver(['127.0.0.1'], 5353, 0.5, 1.5)
+        self.assertEqual(['127.0.0.1'], resolver.nameservers)
+        self.assertEqual(5353, resolver.port)
+        self.assertEqual(0.5, resolver.timeout)
+        self.assertEqual(1.5, resolver.lifetime)
+
+    def test_default_lifetime(self):
+        """Test if the lifetime allows querying each name server."""
+        resolver = DNSResolver(['127.0.0.1', '127.0.0.2'], timeout=0.5)
+        self.assertEqual(1.0, resolver.lifetime)
+
+    def test_default_lifetime_for_replaced_name_servers(self):
+        """Test if the lifetime depends on current name servers."""
+        resolver = DNSResolver(['127.0.0.1'], timeout=0.5)
+        resolver.nameservers = ['127.0.0.1', '127.0.0.2', '127.0.0.3']
+        self.assertEqual(1.5, resolver.lifetime)
+
+    def test_query_fails_over_to_next_name_server(self):
+        """Test if a timeout of a name server is followed by a retry.
+
+        The first name server does not respond, so the answer of
+        the second one is expected to be received within the default
+        lifetime of the query.
+        """
+        self.query_patcher.stop()
+        self.query_patcher = patch('dns.query.udp')
+        udp_mock = self.query_patcher.start()
+
+        def udp(request, where, timeout=None, *_, **__):
+            if where == '127.0.0.2':
+                time.sleep(timeout)
+                raise Timeout
+            response = message.make_response(request)
+            response.set_rcode(rcode.NXDOMAIN)
+            return response
+
+        udp_mock.side_effect = udp
+        resolver = DNSResolver(['127.0.0.2', '127.0.0.1'], timeout=0.1)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', DeprecationWarning)
+            self.assertRaises(NXDOMAIN, resolver.query, 'test.com')
+        self.assertEqual(2, udp_mock.call_count)
+        self.assertFalse(
+            [w for w in caught if issubclass(w.category, DeprecationWarning)]
+        )
+
+    @parameterized.expand([
+        ('no_timeout', 0, 1),
+        ('timeouts', 2, 3)
+    ])
+    def test_query_with(self, _, timeouts, expected_calls):
+        """Test if a query is repeated after a timeout.
+
+        :param timeouts: a number of times the query times out
+        :param expected_calls: an expected number of attempts
+        """
+        answer = Mock()
+        self.query_mock.side_effect = [Timeout] * timeouts + [answer]
+        resolver = DNSResolver(['127.0.0.1'], retries=2)
+        self.assertEqual(answer, resolver.query('test.com'))
+        self.assertEqual(expected_calls, self.query_mock.call_count)
+
+    def test_query_for_too_many_timeouts(self):
+        """Test if Timeout is raised when all attempts time out."""
+        self.query_mock.side_effect = Timeout
+        resolver = DNSResolver(['127.0.0.1'], retries=2)
+        self.assertRaises(Timeout, resolver.query, 'test.com')
+        self.assertEqual(3, self.query_mock.call_count)
+
 
 class DNSBLTest(DNSBLTestMixin, unittest.TestCase):
     """Tests for DNSBL class."""
@@ -134,6 +379,36 @@ class BitmaskingDNSBLTest(DNSBLTestMixin, unittest.TestCase):
     dnsbl_factory = BitmaskingDNSBL
 
 
+class GetClassificationTableTest(unittest.TestCase):
+    """Tests for get_classification_table function.
+
+    :cvar classification_map: a classification map used by the tests
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    classification_map = {2: 'spam', 4: 'phishing', 8: 'malware'}
+
+    @parameterized.expand([
+        ('known_code', 4, False, frozenset(['phishing'])),
+        ('unknown_code', 6, False, None),
+        ('bit_vector', 6, True, frozenset(['spam', 'phishing'])),
+        ('bit_vector_with_unknown_bit', 7, True, None),
+        ('empty_bit_vector', 0, True, frozenset()),
+    ])
+    def test_table_value_for(self, _, code, bitmasking, expected):
+        """Test if the table contains expected value for the code.
+
+        :param code: a return code
+        :param bitmasking: True if the codes are to be treated as
+        bit vectors
+        :param expected: the expected classification
+        """
+        table = get_classification_table(self.classification_map, bitmasking)
+        self.assertEqual(256, len(table))
+        self.assertEqual(expected, table[code])
+
+
 def create_hp_hosts_get(classification, listed_hosts):
     """Get a function to replace the get function used by HpHosts.
 
@@ -208,6 +483,16 @@ class HpHostsTest(HostListTestMixin, unittest.TestCase):
         )
         self.get_mock.side_effect = side_effect
 
+    def test_concurrent_lookups(self):
+        """Test if concurrent lookups of a host share a single request."""
+        self._set_matching_hosts(['listed.com'])
+        call_during_blocked_query(
+            self.get_mock,
+            self.tested_instance.lookup,
+            'listed.com'
+        )
+        self.assertEqual(1, self.get_mock.call_count)
+
 
 def create_gsb_post(expected_401, spam_urls, classification):
     """Get mock for post function used by GoogleSafeBrowsing.
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for classes and functions defined in spam_lists.compiled."""
+from __future__ import unicode_literals
+
+from nose_parameterized import parameterized
+
+from spam_lists.compiled import CompiledHostIndex, get_bit_indexes
+from spam_lists.composites import URLTesterChain
+from spam_lists.exceptions import InvalidHostError, InvalidURLError
+from spam_lists.host_collections import (
+    HostCollection, SortedHostCollection, TrieHostCollection
+)
+from spam_lists.structures import AddressListItem
+from test.compat import unittest, Mock
+
+
+class CompiledHostIndexTest(unittest.TestCase):
+    """Tests for CompiledHostIndex class.
+
+    :ivar collections: host collections from which the tested instance
+    is compiled
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        spam = SortedHostCollection('spam', ['SPAM'], ['a.com', '127.0.0.1'])
+        spam.add('c.com', ['SPAM', 'BOTNET'])
+        phishing = HostCollection('phishing', ['PHISHING'])
+        phishing.update(['sub.a.com', 'b.com', '10.0.0.0/8'])
+        malware = TrieHostCollection('malware', ['MALWARE'], ['b.com'])
+        self.collections = [spam, phishing, malware]
+        self.tested_instance = CompiledHostIndex(self.collections)
+
+    @parameterized.expand([
+        ('subdomain_listed_twice', 'x.sub.a.com', 0b011),
+        ('domain_listed_twice', 'b.com', 0b110),
+        ('ip_address', '127.0.0.1', 0b001),
+        ('address_in_network', '10.1.1.1', 0b010),
+        ('missing_host', 'd.com', 0),
+        ('parent_of_listed_domain', 'sub.b.com.pl', 0),
+    ])
+    def test_get_mask_for(self, _, value, expected):
+        """Test if a bitmask of matching collections is returned.
+
+        :param value: a host value
+        :param expected: the expected bitmask
+        """
+        self.assertEqual(expected, self.tested_instance.get_mask(value))
+
+    def test_get_mask_for_unsupported_host(self):
+        """Test if 0 is returned for a host rejected by the factory."""
+        host_factory = Mock(side_effect=InvalidHostError)
+        tested_instance = CompiledHostIndex(self.collections, host_factory)
+        self.assertEqual(0, tested_instance.get_mask('a.com'))
+        self.assertEqual([], tested_instance.lookup_all('a.com'))
+
+    def test_get_mask_for_invalid_host(self):
+        """Test if InvalidHostError is raised for an invalid value."""
+        with self.assertRaises(InvalidHostError):
+            self.tested_instance.get_mask('-invalid')
+
+    def test_get_sources(self):
+        """Test if collections represented by a bitmask are returned."""
+        self.assertEqual(
+            [self.collections[0], self.collections[2]],
+            self.tested_instance.get_sources(0b101)
+        )
+
+    def test_lookup_all(self):
+        """Test if an item is returned for each matching collection."""
+        expected = [
+            AddressListItem('a.com', self.collections[0], {'SPAM'}),
+            AddressListItem('sub.a.com', self.collections[1], {'PHISHING'})
+        ]
+        actual = self.tested_instance.lookup_all('x.sub.a.com')
+        self.assertEqual(expected, actual)
+
+    def test_lookup_all_for_entry_classification(self):
+        """Test if classification of a listed entry is returned."""
+        actual = self.tested_instance.lookup_all('c.com')
+        self.assertEqual({'SPAM', 'BOTNET'}, actual[0].classification)
+
+    def test_lookup_all_for_network(self):
+        """Test if a matching network is returned."""
+        expected = [
+            AddressListItem('10.0.0.0/8', self.collections[1], {'PHISHING'})
+        ]
+        self.assertEqual(expected, self.tested_instance.lookup_all('10.0.0.1'))
+
+    @parameterized.expand([
+        ('hostname', 'b.com', 'b.com', {'PHISHING'}),
+        ('network', '10.0.0.1', '10.0.0.0/8', {'PHISHING'}),
+    ])
+    def test_lookup_returns_first_match_for(
+            self, _, value, expected_value, expected_classification):
+        """Test if a match from the first matching collection is returned.
+
+        :param value: a host value to be looked up
+        :param expected_value: the expected matching value
+        :param expected_classification: the expected classification
+        """
+        actual = self.tested_instance.lookup(value)
+        self.assertEqual(
+            AddressListItem(
+                expected_value,
+                self.tested_instance,
+                expected_classification
+            ),
+            actual
+        )
+
+    @parameterized.expand([
+        ('listed_host', 'sub.b.com', True),
+        ('missing_host', 'd.com', False),
+    ])
+    def test_contains_for(self, _, value, expected):
+        """Test if True is returned only for matching values.
+
+        :param value: a host value
+        :param expected: the expected result
+        """
+        self.assertEqual(expected, value in self.tested_instance)
+
+    def test_lookup_matching_is_equal_to_url_tester_chain(self):
+        """Test if the same items are returned as by URLTesterChain.
+
+        The items are expected in the same order: grouped by
+        the collections, and then ordered like the URLs.
+        """
+        urls = ['http://x.sub.a.com/path', 'http://b.com', 'http://d.com',
+                'http://10.2.3.4', 'http://127.0.0.1:8080', 'https://c.com']
+        expected = URLTesterChain(*self.collections).lookup_matching(urls)
+        actual = self.tested_instance.lookup_matching(urls)
+        self.assertEqual(list(expected), list(actual))
+
+    def test_lookup_all_returns_value_of_each_collection(self):
+        """Test if each collection has its own value of a shared key."""
+        first = SortedHostCollection('first', ['SPAM'], ['host.com'])
+        second = HostCollection('second', ['SPAM'], ['HOST.com'])
+        tested_instance = CompiledHostIndex([first, second])
+        actual = tested_instance.lookup_all('host.com')
+        self.assertEqual(
+            ['host.com', 'HOST.com'],
+            [item.value for item in actual]
+        )
+
+    def test_lookup_matching_for_invalid_url(self):
+        """Test if InvalidURLError is raised for an invalid URL."""
+        with self.assertRaises(InvalidURLError):
+            list(self.tested_instance.lookup_matching(['invalid']))
+
+    def test_index_is_not_updated(self):
+        """Test if later changes of collections are not included."""
+        self.collections[2].add('d.com')
+        self.assertEqual(0, self.tested_instance.get_mask('d.com'))
+
+    def test_len(self):
+        """Test if the number of distinct hosts is returned."""
+        self.assertEqual(5, len(self.tested_instance))
+
+
+class GetBitIndexesTest(unittest.TestCase):
+    """Tests for get_bit_indexes function."""
+
+    # pylint: disable=too-many-public-methods
+
+    @parameterized.expand([
+        ('zero', 0, []),
+        ('single_bit', 0b1000, [3]),
+        ('many_bits', 0b1011, [0, 1, 3]),
+        ('high_bit', 1 << 100, [100]),
+    ])
+    def test_get_bit_indexes_for(self, _, mask, expected):
+        """Test if indexes of set bits are returned.
+
+        :param mask: a bitmask
+        :param expected: the expected indexes
+        """
+        self.assertEqual(expected, list(get_bit_indexes(mask)))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for functions and classes defined in spam_lists.concurrency."""
+from __future__ import unicode_literals
+
+# pylint: disable=redefined-builtin
+from builtins import range, object
+from threading import Event, Lock, Thread
+import time
+
+from nose_parameterized import parameterized
+
+from spam_lists.concurrency import map_concurrently, SingleFlight
+from test.compat import unittest, Mock
+
+
+class ConcurrencyCounter(object):
+    """A function recording the maximum number of its concurrent calls."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self._lock = Lock()
+
+    def __call__(self, value):
+        """Record the call and return the argument.
+
+        :param value: a value to be returned
+        """
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.001)
+        with self._lock:
+            self.running -= 1
+        return value
+
+
+class MapConcurrentlyTest(unittest.TestCase):
+    """Tests for map_concurrently function."""
+
+    # pylint: disable=too-many-public-methods
+
+    def test_results_in_order_of_values(self):
+        """Test if results are yielded in order of the values."""
+        values = list(range(50))
+        actual = list(map_concurrently(lambda v: v * 2, values, 4))
+        self.assertEqual([(v, v * 2) for v in values], actual)
+
+    def test_results_in_order_of_completion(self):
+        """Test if all results are yielded in order of completion."""
+        def function(value):
+            time.sleep(0.01 if value == 0 else 0)
+            return value
+
+        actual = list(map_concurrently(function, range(10), 4, False))
+        self.assertCountEqual([(v, v) for v in range(10)], actual)
+        self.assertNotEqual((0, 0), actual[0])
+
+    @parameterized.expand([
+        ('ordered', True),
+        ('in_order_of_completion', False)
+    ])
+    def test_concurrency_limit(self, _, ordered):
+        """Test if the number of concurrent calls is limited.
+
+        :param ordered: a value of ordered argument of the function
+        """
+        function = ConcurrencyCounter()
+        list(map_concurrently(function, range(100), 3, ordered))
+        self.assertLessEqual(function.max_running, 3)
+
+    def test_error_propagation(self):
+        """Test if an error raised by the function is not handled."""
+        def function(value):
+            if value == 5:
+                raise KeyError(value)
+            return value
+
+        with self.assertRaises(KeyError):
+            list(map_concurrently(function, range(10), 2))
+
+    def test_invalid_max_workers(self):
+        """Test if ValueError is raised for max_workers less than 1."""
+        with self.assertRaises(ValueError):
+            list(map_concurrently(lambda v: v, range(10), 0))
+
+
+class SingleFlightTest(unittest.TestCase):
+    """Tests for SingleFlight class.
+
+    :ivar started: an event set when the coalesced function is called
+    :ivar release: an event the coalesced function waits for
+    :ivar function: a mock of the coalesced function
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.started = Event()
+        self.release = Event()
+        self.function = Mock()
+
+        def side_effect(value):
+            self.started.set()
+            self.release.wait()
+            return value
+        self.function.side_effect = side_effect
+        self.tested_instance = SingleFlight()
+
+    def _call_concurrently(self, keys):
+        """Call the function for given keys in separate threads.
+
+        The first call is made before the others, which are started
+        while it is still in progress.
+
+        :param keys: keys (and arguments) for the calls
+        :returns: a list of results or errors, in order of the keys
+        """
+        results = [None] * len(keys)
+
+        def call(i):
+            try:
+                results[i] = self.tested_instance.call(
+                    keys[i],
+                    self.function,
+                    keys[i]
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                results[i] = error
+        threads = [Thread(target=call, args=(i,)) for i in range(len(keys))]
+        threads[0].start()
+        self.started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_call_for_the_same_key(self):
+        """Test if concurrent calls for the same key are coalesced."""
+        results = self._call_concurrently(['key'] * 10)
+        self.assertEqual(['key'] * 10, results)
+        self.assertEqual(1, self.function.call_count)
+
+    def test_call_for_different_keys(self):
+        """Test if calls for different keys are not coalesced."""
+        keys = ['key1', 'key2', 'key1']
+        results = self._call_concurrently(keys)
+        self.assertEqual(keys, results)
+        self.assertEqual(2, self.function.call_count)
+
+    def test_error_passed_to_all_callers(self):
+        """Test if an error raised by the call is raised for all callers."""
+        error = KeyError('key')
+
+        def side_effect(_):
+            self.started.set()
+            self.release.wait()
+            raise error
+        self.function.side_effect = side_effect
+        results = self._call_concurrently(['key'] * 5)
+        self.assertEqual([error] * 5, results)
+
+    def test_call_after_completion(self):
+        """Test if a new call is made after the previous one completes."""
+        self.release.set()
+        self.tested_instance.call('key', self.function, 'key')
+        self.tested_instance.call('key', self.function, 'key')
+        self.assertEqual(2, self.function.call_count)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -3,91 +3,39 @@
 """Tests for classes representing custom host collections."""
 from __future__ import unicode_literals
 
-from dns import name
-from ipaddress import ip_address
+import os
+import tempfile
+
+from threading import Thread
+
+# pylint: disable=redefined-builtin
+from builtins import range
 from nose_parameterized import parameterized
 
 from spam_lists.exceptions import InvalidHostError
-from spam_lists.host_collections import HostCollection, SortedHostCollection
+from spam_lists.host_collections import (
+    ClassificationTable, HostCollection, ReloadableHostList,
+    SortedHostCollection, TrieHostCollection
+)
+from spam_lists.structures import HOST_CACHE, hostname_or_ip
 from test.compat import unittest, Mock
 from test.unit.common_definitions import (
-    TestFunctionDoesNotHandleMixin, host_list_host_factory, HostListTestMixin
+    TestFunctionDoesNotHandleMixin, HostListTestMixin
 )
 
 
-def get_sorting_key(value):
-    """Get a key for sorting host values during tests.
-
-    :param value: a host value for which we generate key
-    :returns: a value used as the sorting key
-    """
-    try:
-        return ip_address(value)
-    except ValueError:
-        return name.from_text(value)
-
-
-def has_to_unicode(value):
-    """Check if an object has a to_unicode attribute.
-
-    :param value: a value for which we test membership of the attribute
-    :returns: True if the value has the attribute
-    """
-    return hasattr(value, 'to_unicode')
-
-
-def host_collection_host_factory(host):
-    """Get a mock of a host object stored in a collection.
-
-    :param host: a host value to be represented by the mock
-    :returns: an instance of Mock representing a host object stored
-    in a host collection
-    """
-    host_object = host_list_host_factory(host)
-    _str = host_object.to_unicode()
-
-    def test(other):
-        """Test if the other and the host object match each other.
-
-        :param other: an object to be compared
-        :returns: result of the test
-        """
-        return (has_to_unicode(other) and
-                other.to_unicode() in _str)
-    host_object.is_match.side_effect = test
-    host_object.is_subdomain.side_effect = test
-
-    def less_than(other):
-        """Check if the host object key is less than the other.
-
-        This function is an implementation of __lt__ expected from host
-        objects by bisect_right function.
-
-        :param other: a value to be compared
-        :returns: result of the comparison
-        """
-        host_object_key = get_sorting_key(_str)
-        other_value = other.to_unicode() if has_to_unicode(other) else other
-        other_key = get_sorting_key(other_value)
-        try:
-            result = host_object_key < other_key
-        except TypeError:
-            result = _str < other_value
-        return result
-
-    host_object.__lt__.side_effect = less_than
-    return host_object
-
-
 class HostCollectionBaseTest(
         HostListTestMixin,
         TestFunctionDoesNotHandleMixin,
 ):
     """Tests for subclasses or BaseHostCollection.
 
+    The collections search their contents using sort keys or index
+    labels of host objects, so the tests use hostname_or_ip as
+    an implementation of the host factory.
+
     :ivar host_factory_mock: a mocked implementation of host factory
-    used by tested instance. Uses host_collection_host_factory
-    as its implementation.
+    used by tested instance. Uses hostname_or_ip as its implementation.
     :ivar tested_instance: an instance of tested class
     """
 
@@ -97,7 +45,7 @@ class HostCollectionBaseTest(
 
     def setUp(self):
         self.host_factory_mock = Mock()
-        self.host_factory_mock.side_effect = host_collection_host_factory
+        self.host_factory_mock.side_effect = hostname_or_ip
         self.tested_instance = self.constructor(
             'test_host_collection',
             self.classification,
@@ -150,6 +98,17 @@ class HostCollectionBaseTest(
         self.tested_instance.add(value)
         self.assertCountEqual(initial_hosts, self.tested_instance.hosts)
 
+    def test_add_and_lookup_with_host_cache_disabled(self):
+        """Test if listed ip addresses match new host objects."""
+        self.addCleanup(setattr, HOST_CACHE, 'maxsize', HOST_CACHE.maxsize)
+        HOST_CACHE.maxsize = 0
+        initial_hosts = ['127.0.0.1', '2001:db8::1', 'domain.com']
+        self._set_matching_hosts(initial_hosts)
+        for value in initial_hosts:
+            self.tested_instance.add(value)
+            self.assertIsNotNone(self.tested_instance.lookup(value))
+        self.assertCountEqual(initial_hosts, self.tested_instance.hosts)
+
     def test_add_a_superdomain(self):
         """Test the method for a superdomain of a listed domain.
 
@@ -165,6 +124,285 @@ class HostCollectionBaseTest(
         initial_hosts.append(superdomain)
         self.assertCountEqual(initial_hosts, self.tested_instance.hosts)
 
+    def test_add_a_superdomain_of_many(self):
+        """Test if all subdomains of an added superdomain are removed."""
+        self._set_matching_hosts(
+            ['a.domain.com', 'b.a.domain.com', 'c.domain.com', 'host.com']
+        )
+        self.tested_instance.add('domain.com')
+        self.assertCountEqual(
+            ['domain.com', 'host.com'],
+            self.tested_instance.hosts
+        )
+        self.assertEqual(2, len(self.tested_instance))
+
+    @parameterized.expand([
+        ('new_values', [], ['b.com', '127.0.0.1', 'a.com']),
+        ('duplicates', ['a.com'], ['b.com', 'a.com', 'b.com', 'B.com']),
+        ('subdomains', ['a.b.com'], ['c.b.com', 'b.com', 'd.b.com']),
+        ('superdomain_of_listed', ['a.b.com', 'x.a.b.com', 'c.com'],
+         ['b.com']),
+        ('subdomain_of_listed', ['b.com'], ['a.b.com', 'a.com']),
+        ('similar_domains', ['b.com'], ['a.b-c.com', 'b-c.com', 'b.c.com']),
+        ('ip_addresses', ['::1'], ['127.0.0.1', '::1', '127.0.0.1']),
+        ('networks', ['10.0.0.1', '10.1.0.1'],
+         ['10.0.0.2', '10.0.0.0/24', '10.0.0.3', '2001:db8::/32']),
+    ])
+    def test_update_for(self, _, initial_hosts, values):
+        """Test if update has the same result as adding values one by one.
+
+        :param initial_hosts: values added to the collection before
+        the update
+        :param values: values to be added
+        """
+        expected = self.constructor('expected', self.classification)
+        for value in initial_hosts + values:
+            expected.add(value)
+        for value in initial_hosts:
+            self.tested_instance.add(value)
+        self.tested_instance.update(values)
+        self.assertEqual(expected.hosts, self.tested_instance.hosts)
+        self.assertEqual(
+            list(expected.networks),
+            list(self.tested_instance.networks)
+        )
+
+    @parameterized.expand([
+        ('ipv4_network', ['10.0.0.0/8'], '10.1.2.3', '10.0.0.0/8'),
+        ('ipv6_network', ['2001:db8::/32'], '2001:db8::1', '2001:db8::/32'),
+        ('network_with_host_bits', ['10.0.0.1/24'], '10.0.0.7',
+         '10.0.0.0/24'),
+        ('merged_networks', ['10.0.0.0/24', '10.0.1.0/24'], '10.0.1.1',
+         '10.0.0.0/23'),
+        ('unaligned_merged_networks', ['10.0.1.0/24', '10.0.2.0/24'],
+         '10.0.2.1', '10.0.2.0/24'),
+    ])
+    def test_lookup_returns_network_for(self, _, networks, value, expected):
+        """Test if a network containing the address is returned.
+
+        :param networks: networks added to the collection
+        :param value: an ip address to be looked up
+        :param expected: the expected network
+        """
+        for network in networks:
+            self.tested_instance.add(network)
+        self.assertEqual(expected, self.tested_instance.lookup(value).value)
+
+    @parameterized.expand([
+        ('address_outside_network', '10.0.1.0'),
+        ('ipv6_address', '::a00:1'),
+        ('hostname', 'network.com'),
+    ])
+    def test_lookup_for_network_returns_none_for(self, _, value):
+        """Test if None is returned for a value outside the network.
+
+        :param value: a host value to be looked up
+        """
+        self.tested_instance.add('10.0.0.0/24')
+        self.assertIsNone(self.tested_instance.lookup(value))
+
+    def test_add_network_merges_ranges(self):
+        """Test if overlapping, nested and adjacent ranges are merged."""
+        for network in ['10.0.0.0/16', '10.0.3.0/24', '10.0.255.0/23',
+                        '10.2.0.0/16', '10.0.0.0/8']:
+            self.tested_instance.add(network)
+        self.assertEqual(1, len(self.tested_instance.networks))
+
+    def test_add_network_removes_addresses(self):
+        """Test if addresses belonging to an added network are removed."""
+        self._set_matching_hosts(
+            ['10.0.0.1', '10.0.0.255', '10.0.1.0', '::1', 'host.com']
+        )
+        self.tested_instance.add('10.0.0.0/24')
+        self.assertCountEqual(
+            ['10.0.1.0', '::1', 'host.com'],
+            self.tested_instance.hosts
+        )
+
+    def test_add_address_belonging_to_network(self):
+        """Test if an address belonging to a listed network is skipped."""
+        self.tested_instance.add('10.0.0.0/24')
+        self.tested_instance.add('10.0.0.1')
+        self.assertEqual([], list(self.tested_instance.hosts))
+
+    def test_constructor_with_networks(self):
+        """Test if networks passed to the constructor are listed."""
+        collection = self.constructor(
+            'test',
+            self.classification,
+            ['10.0.0.0/8', 'a.com', '10.1.1.1']
+        )
+        self.assertCountEqual(['a.com'], collection.hosts)
+        self.assertIn('10.2.2.2', collection)
+
+    def test_set_hosts_replaces_networks(self):
+        """Test if networks are replaced when hosts are set."""
+        self.tested_instance.add('10.0.0.0/8')
+        self._set_matching_hosts(['a.com', '192.168.0.0/16'])
+        self.assertNotIn('10.1.1.1', self.tested_instance)
+        self.assertIn('192.168.1.1', self.tested_instance)
+
+    def test_getitem_for_slice_keeps_networks(self):
+        """Test if a slice of the collection contains its networks."""
+        self._set_matching_hosts(['a.com', 'b.com', '10.0.0.0/8'])
+        actual = self.tested_instance[1:]
+        self.assertEqual(1, len(actual))
+        self.assertIn('10.1.1.1', actual)
+
+    def test_add_invalid_network(self):
+        """Test if InvalidHostError is raised for an invalid network."""
+        with self.assertRaises(InvalidHostError):
+            self.tested_instance.add('10.0.0.0/33')
+
+    def test_load_saved_snapshot(self):
+        """Test if a saved collection is restored without validation."""
+        self.tested_instance.update(
+            ['b.com', 'a.com', '127.0.0.1', '10.0.0.0/8', '2001:db8::/32']
+        )
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        self.tested_instance.save(path)
+        self.host_factory_mock.reset_mock()
+        actual = self.constructor.load(path, self.host_factory_mock)
+        self.host_factory_mock.assert_not_called()
+        self.assertEqual(self.tested_instance.identifier, actual.identifier)
+        self.assertEqual(
+            self.tested_instance.classification,
+            actual.classification
+        )
+        self.assertCountEqual(self.tested_instance.hosts, actual.hosts)
+        self.assertEqual(
+            list(self.tested_instance.networks),
+            list(actual.networks)
+        )
+        for value in 'a.com', 'sub.b.com', '127.0.0.1', '10.1.1.1':
+            self.assertIn(value, actual)
+
+    def test_prefilter_rejects_missing_host(self):
+        """Test if a host rejected by the prefilter is not searched for."""
+        self._set_matching_hosts(['a.com', '127.0.0.1'])
+        self.tested_instance.build_prefilter()
+        self.tested_instance._get_match = Mock()
+        self.assertNotIn('b.com', self.tested_instance)
+        self.tested_instance._get_match.assert_not_called()
+        self.assertEqual(1, self.tested_instance.prefilter.true_negatives)
+
+    @parameterized.expand([
+        ('listed_value', 'a.com'),
+        ('subdomain', 'sub.a.com'),
+        ('ip_address', '127.0.0.1'),
+        ('added_value', 'added.com'),
+        ('subdomain_of_added_value', 'sub.added.com'),
+        ('updated_value', 'updated.com'),
+        ('address_in_network', '10.0.0.1'),
+    ])
+    def test_prefilter_accepts(self, _, value):
+        """Test if listed values and their matches pass the prefilter.
+
+        :param value: a host value to be looked up
+        """
+        self._set_matching_hosts(['a.com', '127.0.0.1'])
+        self.tested_instance.build_prefilter(0.001)
+        self.tested_instance.add('added.com')
+        self.tested_instance.update(['updated.com', '10.0.0.0/8'])
+        self.assertIn(value, self.tested_instance)
+
+    def test_prefilter_counts_false_positives(self):
+        """Test if a failed search accepted by the prefilter is counted."""
+        self._set_matching_hosts(['a.com'])
+        prefilter = self.tested_instance.build_prefilter()
+        prefilter.add(hostname_or_ip('b.com').sort_key)
+        self.assertNotIn('b.com', self.tested_instance)
+        self.assertEqual(1, prefilter.false_positives)
+        self.assertEqual(1.0, prefilter.false_positive_rate)
+
+    def test_update_with_invalid_host(self):
+        """Test if InvalidHostError is raised for an invalid value."""
+        self.host_factory_mock.side_effect = InvalidHostError
+        with self.assertRaises(InvalidHostError):
+            self.tested_instance.update(['invalid.com'])
+
+    @parameterized.expand([
+        ('entry', 'sub.a.com', {'phishing'}),
+        ('entry_with_merged_classification', 'b.com',
+         {'phishing', 'malware'}),
+        ('entry_with_default_classification', 'c.com', None),
+        ('network', '10.0.0.1', None),
+    ])
+    def test_lookup_returns_classification_of(self, _, value, expected):
+        """Test if classification of the matching entry is returned.
+
+        :param value: a host value to be looked up
+        :param expected: the expected classification, or None if it is
+        classification of the collection
+        """
+        self.tested_instance.add('a.com', ['phishing'])
+        self.tested_instance.update(['b.com', 'd.com'], ['phishing'])
+        self.tested_instance.add('b.com', ['malware'])
+        self.tested_instance.add('c.com')
+        self.tested_instance.add('10.0.0.0/8', ['ignored'])
+        expected = expected or self.classification
+        actual = self.tested_instance.lookup(value).classification
+        self.assertEqual(set(expected), set(actual))
+
+    def test_update_merges_classification_of_equal_values(self):
+        """Test if classification of duplicate values is merged."""
+        self.tested_instance.add('a.com', ['phishing'])
+        self.tested_instance.update(['a.com', 'sub.a.com'], ['malware'])
+        self.assertEqual(
+            {'phishing', 'malware'},
+            set(self.tested_instance.lookup('a.com').classification)
+        )
+
+    def test_superdomain_replaces_classification(self):
+        """Test if an added superdomain keeps its own classification."""
+        self.tested_instance.update(['a.b.com', 'c.b.com'], ['phishing'])
+        self.tested_instance.add('b.com', ['malware'])
+        self.assertEqual(
+            {'malware'},
+            set(self.tested_instance.lookup('a.b.com').classification)
+        )
+
+    def test_many_distinct_classifications(self):
+        """Test if ids of more than 65535 classifications are stored."""
+        # pylint: disable=protected-access
+        for i in range(2 ** 16):
+            self.tested_instance._classes.get_id([str(i)])
+        self.tested_instance.add('a.com', ['phishing'])
+        self.assertEqual(
+            {'phishing'},
+            set(self.tested_instance.lookup('a.com').classification)
+        )
+
+    def test_getitem_for_slice_keeps_classification(self):
+        """Test if entries of a slice keep their classification."""
+        self.tested_instance.add('a.com', ['phishing'])
+        self.tested_instance.add('b.com', ['malware'])
+        actual = self.tested_instance[:]
+        self.assertEqual(
+            {'malware'},
+            set(actual.lookup('b.com').classification)
+        )
+
+    def test_load_saved_entry_classification(self):
+        """Test if classification of entries is restored."""
+        self.tested_instance.add('a.com', ['phishing'])
+        self.tested_instance.add('b.com')
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        self.tested_instance.save(path)
+        actual = self.constructor.load(path)
+        self.assertEqual(
+            {'phishing'},
+            set(actual.lookup('a.com').classification)
+        )
+        self.assertEqual(
+            set(self.classification),
+            set(actual.lookup('b.com').classification)
+        )
+
     def _set_matching_hosts(self, hosts):
         self.tested_instance.hosts = list(hosts)
 
@@ -174,15 +412,405 @@ class HostCollectionTest(HostCollectionBaseTest, unittest.TestCase):
 
     constructor = HostCollection
 
+    def test_hosts_are_a_copy(self):
+        """Test if returned hosts do not share state with the collection."""
+        self._set_matching_hosts(['a.com', 'c.com'])
+        hosts = self.tested_instance.hosts
+        self.tested_instance.add('b.com')
+        self.assertEqual(('a.com', 'c.com'), hosts)
+        self.assertEqual(3, len(self.tested_instance))
+        self.assertIsNotNone(self.tested_instance.lookup('b.com'))
+
 
 class SortedHostCollectionTest(HostCollectionBaseTest, unittest.TestCase):
     """Tests for SortedHostCollection class."""
 
     constructor = SortedHostCollection
 
+    def test_add_a_superdomain_of_many(self):
+        """Test if all subdomains of an added superdomain are removed."""
+        self._set_matching_hosts(
+            ['a.domain.com', 'b.a.domain.com', 'c.domain.com', 'host.com',
+             'domain-a.com', 'zzz.com']
+        )
+        self.tested_instance.add('domain.com')
+        expected = ['domain-a.com', 'domain.com', 'host.com', 'zzz.com']
+        self.assertCountEqual(expected, self.tested_instance.hosts)
+
+    def test_hosts_are_sorted(self):
+        """Test if set hosts are sorted by their sort keys."""
+        self._set_matching_hosts(['b.com', '::1', 'a.com', '127.0.0.1'])
+        expected = ['127.0.0.1', '::1', 'a.com', 'b.com']
+        expected.sort(key=lambda h: hostname_or_ip(h).sort_key)
+        self.assertEqual(tuple(expected), self.tested_instance.hosts)
+
+    def test_hosts_are_a_copy(self):
+        """Test if returned hosts do not share state with the collection."""
+        self._set_matching_hosts(['a.com', 'c.com'])
+        hosts = self.tested_instance.hosts
+        self.tested_instance.add('b.com')
+        self.assertEqual(('a.com', 'c.com'), hosts)
+        self.assertEqual(3, len(self.tested_instance))
+        self.assertEqual('b.com', self.tested_instance[1].to_unicode())
+
+    def test_lookup_does_not_create_listed_objects(self):
+        """Test if only the matching listed value is converted."""
+        self._set_matching_hosts(['a{}.com'.format(i) for i in range(100)])
+        self.host_factory_mock.reset_mock()
+        self.tested_instance.lookup('sub.a50.com')
+        self.assertEqual(2, self.host_factory_mock.call_count)
+
+    @parameterized.expand([
+        ('parent_domain', 'domain.com'),
+        ('domain_with_listed_prefix', 'a.domain.com.pl'),
+        ('similar_domain', 'aa.domain.com'),
+        ('other_ip_address', '127.0.0.2'),
+    ])
+    def test_lookup_returns_none_for(self, _, value):
+        """Test if None is returned for a value not matching any item.
+
+        :param value: a host value to be looked up
+        """
+        self._set_matching_hosts(['a.domain.com', '127.0.0.1'])
+        self.assertIsNone(self.tested_instance.lookup(value))
+
+    @parameterized.expand([
+        ('new_values', ['b.com'], ['a.com', 'c.com'], [],
+         ['a.com', 'b.com', 'c.com'], ['a.com', 'c.com'], []),
+        ('removed_values', ['a.com', 'b.com', '::1'], [], ['A.com', '::1'],
+         ['b.com'], [], ['a.com', '::1']),
+        ('missing_removed_values', ['a.com'], [], ['sub.a.com', 'b.com'],
+         ['a.com'], [], []),
+        ('listed_values', ['a.com'], ['a.com', 'sub.a.com'], [],
+         ['a.com'], [], []),
+        ('superdomain', ['a.b.com', 'c.b.com', 'c.com'], ['b.com'], [],
+         ['b.com', 'c.com'], ['b.com'], ['a.b.com', 'c.b.com']),
+        ('subdomain_of_removed', ['b.com'], ['a.b.com'], ['b.com'],
+         ['a.b.com'], ['a.b.com'], ['b.com']),
+        ('removed_and_added', ['a.com', 'b.com'], ['a.com'], ['a.com'],
+         ['a.com', 'b.com'], [], []),
+        ('covered_new_values', [], ['b.com', 'a.b.com', 'b.com'], [],
+         ['b.com'], ['b.com'], []),
+        ('ip_addresses', ['127.0.0.1'], ['127.0.0.2', '::1'],
+         ['127.0.0.1'], ['127.0.0.2', '::1'], ['127.0.0.2', '::1'],
+         ['127.0.0.1']),
+    ])
+    def test_apply_delta_for(self, _, initial_hosts, added, removed,
+                             expected, expected_added, expected_removed):
+        """Test if the values are removed and added.
+
+        :param initial_hosts: values listed before applying the delta
+        :param added: values to be added
+        :param removed: values to be removed
+        :param expected: values expected to be listed
+        :param expected_added: values expected to be reported as added
+        :param expected_removed: values expected to be reported as
+        removed
+        """
+        # pylint: disable=too-many-arguments
+        self._set_matching_hosts(initial_hosts)
+        delta = self.tested_instance.apply_delta(added, removed)
+        self.assertCountEqual(expected, self.tested_instance.hosts)
+        self.assertCountEqual(expected_added, delta.added)
+        self.assertCountEqual(expected_removed, delta.removed)
+
+    def test_apply_delta_keeps_sort_order(self):
+        """Test if the result is the same as for a rebuilt collection."""
+        initial = ['h{}.d{}.com'.format(i, i % 7) for i in range(100)]
+        added = ['d3.com', 'x.d5.com', 'new.com', '10.0.0.1']
+        removed = ['h{}.d{}.com'.format(i, i % 7) for i in range(0, 100, 9)]
+        self._set_matching_hosts(initial)
+        self.tested_instance.apply_delta(added, removed)
+        expected = SortedHostCollection('expected', self.classification)
+        expected.update([h for h in initial if h not in removed] + added)
+        self.assertEqual(expected.hosts, self.tested_instance.hosts)
+        self.assertEqual(
+            [hostname_or_ip(h).sort_key for h in expected.hosts],
+            self.tested_instance._keys  # pylint: disable=protected-access
+        )
+
+    def test_apply_delta_with_invalid_host(self):
+        """Test if the collection is not modified after an error."""
+        self._set_matching_hosts(['a.com'])
+        with self.assertRaises(InvalidHostError):
+            self.tested_instance.apply_delta(['b.com'], ['-invalid'])
+        self.assertEqual(('a.com',), self.tested_instance.hosts)
+
+    def test_apply_delta_updates_prefilter(self):
+        """Test if added values pass the prefilter."""
+        self._set_matching_hosts(['a.com'])
+        self.tested_instance.build_prefilter(0.001)
+        self.tested_instance.apply_delta(['b.com'], [])
+        self.assertIn('sub.b.com', self.tested_instance)
+
+    def test_apply_delta_merges_classification(self):
+        """Test if classification of a listed added value is merged."""
+        self.tested_instance.update(['b.com', 'd.com'], ['phishing'])
+        self.tested_instance.apply_delta(['b.com'], [], ['malware'])
+        self.assertEqual(
+            {'phishing', 'malware'},
+            set(self.tested_instance.lookup('b.com').classification)
+        )
+
+
+class ClassificationTableTest(unittest.TestCase):
+    """Tests for ClassificationTable class."""
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.tested_instance = ClassificationTable()
+
+    @parameterized.expand([
+        ('none', None),
+        ('empty_list', []),
+    ])
+    def test_get_id_for_default_classification(self, _, classification):
+        """Test if 0 is returned for classification of a collection.
+
+        :param classification: a value representing classification of
+        a collection
+        """
+        self.assertEqual(0, self.tested_instance.get_id(classification))
+
+    def test_get_id_interns_sets(self):
+        """Test if equal sets of terms have the same id."""
+        first = self.tested_instance.get_id(['spam', 'phishing'])
+        second = self.tested_instance.get_id(('phishing', 'spam'))
+        self.assertEqual(1, first)
+        self.assertEqual(first, second)
+        self.assertEqual(2, self.tested_instance.get_id(['spam']))
+
+    def test_merge(self):
+        """Test if an id of a union of the sets is returned."""
+        first = self.tested_instance.get_id(['spam'])
+        merged = self.tested_instance.merge(first, 0, {'default'})
+        self.assertEqual(
+            {'spam', 'default'},
+            self.tested_instance.get(merged, None)
+        )
+
+
+class TrieHostCollectionTest(HostCollectionBaseTest, unittest.TestCase):
+    """Tests for TrieHostCollection class."""
+
+    constructor = TrieHostCollection
+
+    @parameterized.expand([
+        ('subdomain', 'a.b.domain.com', 'domain.com'),
+        ('uppercase_hostname', 'A.DOMAIN.com', 'domain.com'),
+        ('ip_address', '127.0.0.1', '127.0.0.1'),
+    ])
+    def test_lookup_returns_match_for(self, _, value, expected):
+        """Test if a listed value matching the given one is returned.
+
+        :param value: a host value to be looked up
+        :param expected: the expected matching value
+        """
+        self._set_matching_hosts(['domain.com', '127.0.0.1', 'host.com'])
+        self.assertEqual(expected, self.tested_instance.lookup(value).value)
+
+    @parameterized.expand([
+        ('parent_domain', 'domain.com'),
+        ('sibling_domain', 'b.domain.com'),
+        ('similar_domain', 'adomain.com'),
+        ('other_ip_address', '127.0.0.2'),
+    ])
+    def test_lookup_returns_none_for(self, _, value):
+        """Test if None is returned for a value not matching any item.
+
+        :param value: a host value to be looked up
+        """
+        self._set_matching_hosts(['a.domain.com', '127.0.0.1'])
+        self.assertIsNone(self.tested_instance.lookup(value))
+
+    def test_getitem_for_slice(self):
+        """Test if a slice of the collection is a new collection."""
+        self._set_matching_hosts(['a.com', 'b.com', 'c.com'])
+        actual = self.tested_instance[1:]
+        self.assertIsInstance(actual, TrieHostCollection)
+        self.assertEqual(2, len(actual))
+
+    def test_hosts_are_sorted(self):
+        """Test if hosts are sorted by their sort keys."""
+        self._set_matching_hosts(['b.com', '::1', 'a.com', '127.0.0.1'])
+        expected = ['127.0.0.1', '::1', 'a.com', 'b.com']
+        expected.sort(key=lambda h: hostname_or_ip(h).sort_key)
+        self.assertEqual(tuple(expected), self.tested_instance.hosts)
+        self.assertEqual(
+            expected,
+            [self.tested_instance[i].to_unicode() for i in range(4)]
+        )
+
+    def test_hosts_include_added_value(self):
+        """Test if hosts are rebuilt after the collection is modified."""
+        self._set_matching_hosts(['b.com', 'x.c.com'])
+        self.assertEqual(('b.com', 'x.c.com'), self.tested_instance.hosts)
+        self.tested_instance.add('c.com')
+        self.tested_instance.add('a.com')
+        self.assertEqual(
+            ('a.com', 'b.com', 'c.com'),
+            self.tested_instance.hosts
+        )
+
+
+class ReloadableHostListTest(HostListTestMixin, unittest.TestCase):
+    """Tests for ReloadableHostList class.
+
+    :ivar host_factory_mock: a mocked implementation of host factory
+    used by tested instance. Uses hostname_or_ip as its implementation.
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.host_factory_mock = Mock()
+        self.host_factory_mock.side_effect = hostname_or_ip
+        self.tested_instance = ReloadableHostList(
+            SortedHostCollection(
+                'test_host_collection',
+                self.classification,
+                host_factory=self.host_factory_mock
+            )
+        )
+
     def _set_matching_hosts(self, hosts):
-        self.tested_instance.hosts = list(hosts)
-        self.tested_instance.hosts.sort(key=self.host_factory_mock)
+        self.tested_instance.reload(hosts)
+
+    def test_reload_builds_new_collection(self):
+        """Test if a new collection of the same type is published."""
+        previous = self.tested_instance.collection
+        self.tested_instance.reload(['a.com', '10.0.0.0/8'])
+        actual = self.tested_instance.collection
+        self.assertIsNot(previous, actual)
+        self.assertIsInstance(actual, SortedHostCollection)
+        self.assertEqual(previous.identifier, actual.identifier)
+        self.assertEqual(previous.classification, actual.classification)
+        self.assertEqual((), previous.hosts)
+        self.assertIn('10.1.1.1', self.tested_instance)
+
+    def test_reload_with_classification(self):
+        """Test if classification of the values is kept."""
+        self.tested_instance.reload({'a.com': ['phishing'], 'b.com': None})
+        self.assertEqual(
+            {'phishing'},
+            set(self.tested_instance.lookup('a.com').classification)
+        )
+        self.assertEqual(
+            set(self.classification),
+            set(self.tested_instance.lookup('b.com').classification)
+        )
+        self.tested_instance.reload(['c.com'], ['malware'])
+        self.assertEqual(
+            {'malware'},
+            set(self.tested_instance.lookup('c.com').classification)
+        )
+
+    def test_reload_with_invalid_host(self):
+        """Test if the current collection is kept after an error."""
+        self.tested_instance.reload(['a.com'])
+        previous = self.tested_instance.collection
+        with self.assertRaises(InvalidHostError):
+            self.tested_instance.reload(['b.com', '-invalid'])
+        self.assertIs(previous, self.tested_instance.collection)
+
+    def test_reload_keeps_prefilter(self):
+        """Test if a prefilter is built for the new collection."""
+        self.tested_instance.reload(['a.com'])
+        self.tested_instance.collection.build_prefilter(0.05)
+        self.tested_instance.reload(['b.com', 'c.com'])
+        prefilter = self.tested_instance.collection.prefilter
+        self.assertIsNotNone(prefilter)
+        self.assertEqual(0.05, prefilter.target_false_positive_rate)
+        self.assertEqual(2, len(prefilter))
+        self.assertIn('sub.b.com', self.tested_instance)
+        self.assertNotIn('a.com', self.tested_instance)
+
+    def test_reload_without_prefilter(self):
+        """Test if no prefilter is built if the current one has none."""
+        self.tested_instance.reload(['a.com'])
+        self.assertIsNone(self.tested_instance.collection.prefilter)
+
+    def test_swap(self):
+        """Test if a given collection replaces the current one."""
+        previous = self.tested_instance.collection
+        collection = TrieHostCollection('other', ['TEST'], ['a.com'])
+        self.assertIs(previous, self.tested_instance.swap(collection))
+        self.assertIs(collection, self.tested_instance.collection)
+        self.assertEqual('other', self.tested_instance.identifier)
+        self.assertEqual(1, len(self.tested_instance))
+
+    def test_swap_uses_host_factory_of_new_collection(self):
+        """Test if hosts are created by the factory of the new collection."""
+        host_factory = Mock(side_effect=hostname_or_ip)
+        collection = SortedHostCollection(
+            'other',
+            ['TEST'],
+            ['a.com'],
+            host_factory
+        )
+        self.tested_instance.swap(collection)
+        self.host_factory_mock.reset_mock()
+        host_factory.reset_mock()
+        item = self.tested_instance.lookup('sub.a.com')
+        self.assertEqual('a.com', item.value)
+        self.assertIs(self.tested_instance, item.source)
+        self.assertIn('a.com', self.tested_instance)
+        self.host_factory_mock.assert_not_called()
+        self.assertTrue(host_factory.called)
+
+    def test_reload_snapshot(self):
+        """Test if a collection is restored from a snapshot."""
+        saved = SortedHostCollection('saved', ['TEST'], ['a.com'])
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        saved.save(path)
+        self.tested_instance.reload_snapshot(path)
+        self.assertEqual(
+            ('a.com',),
+            self.tested_instance.collection.hosts
+        )
+        self.assertEqual('saved', self.tested_instance.identifier)
+
+    def test_reload_snapshot_keeps_prefilter(self):
+        """Test if a prefilter is built for a restored collection."""
+        self.tested_instance.collection.build_prefilter()
+        saved = SortedHostCollection('saved', ['TEST'], ['a.com'])
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        saved.save(path)
+        self.tested_instance.reload_snapshot(path)
+        prefilter = self.tested_instance.collection.prefilter
+        self.assertIsNotNone(prefilter)
+        self.assertEqual(1, len(prefilter))
+
+    def test_readers_see_complete_contents(self):
+        """Test if lookups during reloads use either old or new hosts."""
+        old = ['old{}.com'.format(i) for i in range(200)]
+        new = ['new{}.com'.format(i) for i in range(200)]
+        self.tested_instance.reload(old)
+        errors = []
+
+        def read():
+            for i in range(2000):
+                value = 'sub.{}.com'.format((old + new)[i % 400][:-4])
+                item = self.tested_instance.lookup(value)
+                if item is not None and item.value != value[4:]:
+                    errors.append((value, item.value))
+                if len(self.tested_instance) != 200:
+                    errors.append(len(self.tested_instance))
+
+        readers = [Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(20):
+            self.tested_instance.reload(new if i % 2 == 0 else old)
+        for reader in readers:
+            reader.join()
+        self.assertEqual([], errors)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for classes and functions defined in spam_lists.host_index."""
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+
+from builtins import object  # pylint: disable=redefined-builtin
+from nose_parameterized import parameterized
+
+from spam_lists.exceptions import InvalidHostError, InvalidHostIndexError
+from spam_lists.host_index import (
+    HostIndex, build_host_index, get_host_value, main
+)
+from spam_lists.structures import hostname_or_ip
+from test.compat import unittest, Mock
+from test.unit.common_definitions import HostListTestMixin
+
+
+class HostIndexTestMixin(object):
+    """A mixin providing a temporary directory for index files.
+
+    :ivar directory: a path of the temporary directory
+    """
+
+    def _create_directory(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _get_path(self, name):
+        return os.path.join(self.directory, name)
+
+
+class HostIndexTest(HostIndexTestMixin, HostListTestMixin, unittest.TestCase):
+    """Tests for HostIndex class.
+
+    :ivar host_factory_mock: a mocked implementation of host factory
+    used by tested instance. Uses hostname_or_ip as its implementation.
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self._create_directory()
+        self.host_factory_mock = Mock()
+        self.host_factory_mock.side_effect = hostname_or_ip
+        self.tested_instance = HostIndex(
+            'test_index',
+            self.classification,
+            self._build([]),
+            self.host_factory_mock
+        )
+        self.addCleanup(self.tested_instance.close)
+
+    def _build(self, hosts):
+        handle, path = tempfile.mkstemp(suffix='.idx', dir=self.directory)
+        os.close(handle)
+        build_host_index(path, hosts)
+        return path
+
+    def _set_matching_hosts(self, hosts):
+        # pylint: disable=non-parent-init-called
+        self.tested_instance.close()
+        HostIndex.__init__(
+            self.tested_instance,
+            'test_index',
+            self.classification,
+            self._build(hosts),
+            self.host_factory_mock
+        )
+
+    @parameterized.expand([
+        ('subdomain', 'a.b.domain.com', 'domain.com'),
+        ('uppercase_hostname', 'A.DOMAIN.com', 'domain.com'),
+        ('ipv4_address', '127.0.0.1', '127.0.0.1'),
+        ('ipv6_address', '2001:db8::1', '2001:db8::1'),
+    ])
+    def test_lookup_returns_match_for(self, _, value, expected):
+        """Test if a listed value matching the given one is returned.
+
+        :param value: a host value to be looked up
+        :param expected: the expected matching value
+        """
+        self._set_matching_hosts(
+            ['domain.com', '127.0.0.1', 'host.com', '2001:db8::1']
+        )
+        self.assertEqual(expected, self.tested_instance.lookup(value).value)
+
+    @parameterized.expand([
+        ('parent_domain', 'domain.com'),
+        ('similar_domain', 'aa.domain.com'),
+        ('other_ip_address', '127.0.0.2'),
+    ])
+    def test_lookup_returns_none_for(self, _, value):
+        """Test if None is returned for a value not matching any item.
+
+        :param value: a host value to be looked up
+        """
+        self._set_matching_hosts(['a.domain.com', '127.0.0.1'])
+        self.assertIsNone(self.tested_instance.lookup(value))
+
+    def test_covered_hosts_are_not_stored(self):
+        """Test if duplicates and subdomains are not stored."""
+        self._set_matching_hosts(
+            ['a.domain.com', 'domain.com', 'Domain.com', '::1', '::1']
+        )
+        self.assertCountEqual(
+            ['domain.com', '::1'],
+            self.tested_instance.hosts
+        )
+        self.assertEqual(2, len(self.tested_instance))
+
+    def test_internationalized_hostname(self):
+        """Test if an internationalized hostname is stored and found."""
+        self._set_matching_hosts(['пример.рф', 'domain.com'])
+        self.assertEqual(
+            'пример.рф',
+            self.tested_instance.lookup('a.пример.рф').value
+        )
+        self.assertCountEqual(
+            ['пример.рф', 'domain.com'],
+            self.tested_instance.hosts
+        )
+
+
+class HostIndexFileTest(HostIndexTestMixin, unittest.TestCase):
+    """Tests for validation and building of host index files."""
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self._create_directory()
+
+    def _write(self, name, content):
+        path = self._get_path(name)
+        with io.open(path, 'wb') as index_file:
+            index_file.write(content)
+        return path
+
+    @parameterized.expand([
+        ('empty_file', b''),
+        ('no_header', b'SPAMLIDX'),
+        ('bad_magic', b'SPAMLXXX' + b'\x01\x00\x00\x00' + b'\x00' * 16),
+        ('unsupported_version',
+         b'SPAMLIDX' + b'\x02\x00\x00\x00' + b'\x00' * 16),
+        ('truncated_file',
+         b'SPAMLIDX' + b'\x01\x00\x00\x00' + b'\x01' + b'\x00' * 7),
+    ])
+    def test_constructor_for_invalid_file(self, _, content):
+        """Test if InvalidHostIndexError is raised for an invalid file.
+
+        :param content: content of the file
+        """
+        path = self._write('invalid.idx', content)
+        with self.assertRaises(InvalidHostIndexError):
+            HostIndex('test_index', ['TEST'], path)
+
+    def test_build_for_invalid_host(self):
+        """Test if InvalidHostError is raised for an invalid value."""
+        with self.assertRaises(InvalidHostError):
+            build_host_index(self._get_path('hosts.idx'), ['-invalid'])
+
+    @parameterized.expand([
+        ('hostname', 'sub.domain.com'),
+        ('ipv4_address', '192.0.2.1'),
+        ('ipv6_address', '2001:db8::1'),
+    ])
+    def test_get_host_value_for(self, _, value):
+        """Test if a value is restored from a sort key of a host.
+
+        :param value: a host value
+        """
+        sort_key = hostname_or_ip(value).sort_key
+        self.assertEqual(value, get_host_value(sort_key))
+
+    def test_main(self):
+        """Test if an index is built from a text file."""
+        source = self._write('hosts.txt', b'# hosts\nhost.com\n\n127.0.0.1\n')
+        path = self._get_path('hosts.idx')
+        main([source, path])
+        index = HostIndex('test_index', ['TEST'], path)
+        self.addCleanup(index.close)
+        self.assertCountEqual(['host.com', '127.0.0.1'], index.hosts)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
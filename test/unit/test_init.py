@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the API provided by spam_lists package."""
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+
+from nose_parameterized import parameterized
+
+import spam_lists
+from spam_lists import clients, composites, host_collections
+from test.compat import unittest
+
+HEAVY_MODULES = ['requests', 'concurrent.futures', 'validators', 'tldextract']
+
+
+def get_imported_modules(statement):
+    """Get modules imported by running the statement in a new interpreter.
+
+    :param statement: an import statement
+    :returns: a set of names of the imported modules
+    """
+    directory = os.path.dirname(os.path.dirname(spam_lists.__file__))
+    script = '{}\nimport sys\nprint("\\n".join(sys.modules))'.format(statement)
+    output = subprocess.check_output(
+        [sys.executable, '-c', script],
+        cwd=directory
+    )
+    return set(output.decode('utf-8').split())
+
+
+class PackageTest(unittest.TestCase):
+    """Tests for attributes of spam_lists package."""
+
+    # pylint: disable=too-many-public-methods
+
+    @parameterized.expand([
+        ('package', 'import spam_lists',
+         ['dns.resolver', 'spam_lists.clients']),
+        ('host_collection', 'from spam_lists import SortedHostCollection',
+         ['dns.resolver', 'spam_lists.clients']),
+        ('dnsbl_client', 'from spam_lists import SPAMHAUS_ZEN', []),
+    ])
+    @unittest.skipIf(sys.version_info < (3, 7), 'the API is imported eagerly')
+    def test_heavy_modules_are_not_imported_by(
+            self, _, statement, other_modules):
+        """Test if an import does not load modules it does not need.
+
+        :param statement: an import statement
+        :param other_modules: names of other modules expected not to be
+        imported by the statement
+        """
+        imported = get_imported_modules(statement)
+        for module in HEAVY_MODULES + other_modules:
+            self.assertNotIn(module, imported)
+
+    @parameterized.expand([
+        ('dnsbl_client', 'SPAMHAUS_ZEN', clients),
+        ('host_collection', 'SortedHostCollection', host_collections),
+        ('url_tester', 'URLTesterChain', composites),
+    ])
+    def test_attribute_for(self, _, name, module):
+        """Test if an attribute is the object defined by its module.
+
+        :param name: a name of the attribute
+        :param module: a module defining the attribute
+        """
+        self.assertIs(getattr(module, name), getattr(spam_lists, name))
+        self.assertIn(name, dir(spam_lists))
+
+    def test_missing_attribute(self):
+        """Test if AttributeError is raised for an unknown attribute."""
+        self.assertRaises(AttributeError, getattr, spam_lists, 'Missing')
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for classes and functions defined in spam_lists.public_suffix."""
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+
+from nose_parameterized import parameterized
+
+from spam_lists.public_suffix import (
+    PublicSuffixList, compile_rules, get_registered_domain, main
+)
+from test.compat import patch, unittest
+
+SOURCE = '''\
+// ===BEGIN ICANN DOMAINS===
+
+// uk
+uk
+co.uk
+
+// ck
+*.ck
+!www.ck
+
+// jp
+jp
+*.kawasaki.jp
+!city.kawasaki.jp
+
+// cn
+cn
+公司.cn
+
+// ===END ICANN DOMAINS===
+// ===BEGIN PRIVATE DOMAINS===
+
+blogspot.co.uk
+
+// ===END PRIVATE DOMAINS===
+'''
+
+
+class CompileRulesTest(unittest.TestCase):
+    """Tests for compile_rules function."""
+
+    # pylint: disable=too-many-public-methods
+
+    @parameterized.expand([
+        ('icann_rules', False, []),
+        ('all_rules', True, ['uk.co.blogspot']),
+    ])
+    def test_compile_rules_for(self, _, include_private, private_rules):
+        """Test if rules are reversed and private ones are included.
+
+        :param include_private: a value of include_private argument
+        :param private_rules: compiled rules from the private section
+        of the list, expected to be returned
+        """
+        expected = [
+            'uk', 'uk.co', 'ck.*', '!ck.www', 'jp', 'jp.kawasaki.*',
+            '!jp.kawasaki.city', 'cn', 'cn.公司'
+        ] + private_rules
+        actual = list(compile_rules(SOURCE.splitlines(), include_private))
+        self.assertEqual(expected, actual)
+
+
+class PublicSuffixListTest(unittest.TestCase):
+    """Tests for PublicSuffixList class.
+
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        rules = compile_rules(SOURCE.splitlines())
+        self.tested_instance = PublicSuffixList(rules)
+
+    @parameterized.expand([
+        ('registered_domain', 'example.co.uk', 'example.co.uk'),
+        ('subdomain', 'www.example.co.uk', 'example.co.uk'),
+        ('uppercase_hostname', 'WWW.Example.CO.uk', 'Example.CO.uk'),
+        ('top_level_domain_rule', 'a.b.example.uk', 'example.uk'),
+        ('wildcard_rule', 'a.b.c.ck', 'b.c.ck'),
+        ('exception_rule', 'a.www.ck', 'www.ck'),
+        ('nested_wildcard_rule', 'a.b.kawasaki.jp', 'a.b.kawasaki.jp'),
+        ('nested_exception_rule', 'a.city.kawasaki.jp', 'city.kawasaki.jp'),
+        ('unicode_rule', 'a.b.公司.cn', 'b.公司.cn'),
+        ('punycode_label', 'a.b.xn--55qx5d.cn', 'b.xn--55qx5d.cn'),
+        ('private_domain', 'a.blogspot.co.uk', 'blogspot.co.uk'),
+        ('public_suffix', 'co.uk', ''),
+        ('wildcard_suffix', 'b.ck', ''),
+        ('unknown_suffix', 'example.com', ''),
+        ('ip_address', '127.0.0.1', ''),
+    ])
+    def test_get_registered_domain_for(self, _, value, expected):
+        """Test if an expected registered domain is returned.
+
+        :param value: a hostname
+        :param expected: an expected return value
+        """
+        self.assertEqual(
+            expected,
+            self.tested_instance.get_registered_domain(value)
+        )
+
+
+class BundledListTest(unittest.TestCase):
+    """Tests for the public suffix list bundled with the library.
+
+    :ivar directory: a path of a temporary directory
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    @parameterized.expand([
+        ('generic_domain', 'www.example.com', 'example.com'),
+        ('country_code_domain', 'www.example.co.uk', 'example.co.uk'),
+        ('private_domain', 'a.b.blogspot.com', 'blogspot.com'),
+    ])
+    def test_get_registered_domain_for(self, _, value, expected):
+        """Test if a registered domain is found using the bundled list.
+
+        :param value: a hostname
+        :param expected: an expected return value
+        """
+        self.assertEqual(expected, get_registered_domain(value))
+
+    def test_main(self):
+        """Test if a snapshot is compiled from a local copy of the list."""
+        source = os.path.join(self.directory, 'public_suffix_list.dat')
+        with io.open(source, 'w', encoding='utf-8') as source_file:
+            source_file.write(SOURCE)
+        path = os.path.join(self.directory, 'snapshot.dat')
+        with patch('spam_lists.public_suffix.print', create=True):
+            main([source, '-o', path, '--include-private'])
+        tested_instance = PublicSuffixList.load(path)
+        self.assertEqual(
+            'a.blogspot.co.uk',
+            tested_instance.get_registered_domain('www.a.blogspot.co.uk')
+        )
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for classes defined in spam_lists.radix."""
+from __future__ import unicode_literals
+
+import ipaddress
+import random
+
+# pylint: disable=redefined-builtin
+from builtins import range
+from nose_parameterized import parameterized
+
+from spam_lists.exceptions import InvalidHostError
+from spam_lists.radix import IPPrefixList, RadixTree
+from spam_lists.structures import AddressListItem
+from test.compat import unittest
+
+
+class RadixTreeTest(unittest.TestCase):
+    """Tests for RadixTree class.
+
+    :ivar tested_instance: an instance of tested class, using 8-bit
+    keys
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.tested_instance = RadixTree(8)
+        for key, length in [(0b10000000, 1), (0b10100000, 3),
+                            (0b10101100, 6), (0b01000000, 2),
+                            (0b11111111, 8)]:
+            self.tested_instance.insert(key, length, (key, length))
+
+    @parameterized.expand([
+        ('shortest_prefix', 0b11000000, (0b10000000, 1)),
+        ('nested_prefix', 0b10111111, (0b10100000, 3)),
+        ('most_nested_prefix', 0b10101101, (0b10101100, 6)),
+        ('full_key', 0b11111111, (0b11111111, 8)),
+        ('sibling_of_full_key', 0b11111110, (0b10000000, 1)),
+        ('other_branch', 0b01011111, (0b01000000, 2)),
+    ])
+    def test_find_returns_longest_prefix_for(self, _, key, expected):
+        """Test if the longest matching prefix is returned.
+
+        :param key: a key to be searched for
+        :param expected: a tuple containing the expected prefix and
+        its length
+        """
+        self.assertEqual(
+            expected + (expected,),
+            self.tested_instance.find(key)
+        )
+
+    @parameterized.expand([
+        ('key_without_prefix', 0b00111111),
+        ('zero_key', 0b00000000),
+    ])
+    def test_find_returns_none_for(self, _, key):
+        """Test if None is returned for a key without stored prefixes.
+
+        :param key: a key to be searched for
+        """
+        self.assertIsNone(self.tested_instance.find(key))
+
+    def test_insert_replaces_data(self):
+        """Test if inserting a stored prefix replaces its data."""
+        self.tested_instance.insert(0b10100000, 3, 'new')
+        self.assertEqual('new', self.tested_instance.find(0b10100001)[2])
+        self.assertEqual(5, len(self.tested_instance))
+
+    def test_insert_into_split_node(self):
+        """Test if a prefix is stored in a node created by splitting."""
+        self.tested_instance.insert(0b10101000, 4, 'split')
+        self.assertEqual('split', self.tested_instance.find(0b10101001)[2])
+        self.assertEqual(6, len(self.tested_instance))
+
+    def test_zero_length_prefix(self):
+        """Test if a prefix of length 0 matches all keys."""
+        self.tested_instance.insert(0, 0, 'all')
+        self.assertEqual((0, 0, 'all'), self.tested_instance.find(0b00111111))
+
+    def test_iter(self):
+        """Test if stored prefixes are yielded in order."""
+        expected = [(0b01000000, 2), (0b10000000, 1), (0b10100000, 3),
+                    (0b10101100, 6), (0b11111111, 8)]
+        self.assertEqual(
+            expected,
+            [(k, l) for k, l, _ in self.tested_instance]
+        )
+
+    def test_find_is_equal_to_linear_search(self):
+        """Test if random prefixes are matched like by a linear search."""
+        rand = random.Random(0)
+        tree = RadixTree(32)
+        prefixes = set()
+        for _ in range(500):
+            length = rand.randint(0, 32)
+            key = rand.getrandbits(32) >> (32 - length) << (32 - length)
+            prefixes.add((key, length))
+            tree.insert(key, length, None)
+        for _ in range(2000):
+            key = rand.getrandbits(32)
+            matching = [
+                (k, l) for k, l in prefixes if key >> (32 - l) == k >> (32 - l)
+            ]
+            expected = max(matching, key=lambda p: p[1]) if matching else None
+            match = tree.find(key)
+            self.assertEqual(expected, match and match[:2])
+
+
+class IPPrefixListTest(unittest.TestCase):
+    """Tests for IPPrefixList class.
+
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    classification = {'TEST'}
+
+    def setUp(self):
+        self.tested_instance = IPPrefixList(
+            'test_prefix_list',
+            self.classification,
+            ['2001:db8::/32', '10.0.0.0/8', '192.0.2.1']
+        )
+        self.tested_instance.add('2001:db8:1::/48', ['ALLOCATION'])
+        self.tested_instance.add('2001:db8:1:2::/64', ['SUBNET'])
+
+    @parameterized.expand([
+        ('ipv6_address_in_64', '2001:db8:1:2::1', '2001:db8:1:2::/64',
+         {'SUBNET'}),
+        ('ipv6_address_in_48', '2001:db8:1:3::1', '2001:db8:1::/48',
+         {'ALLOCATION'}),
+        ('ipv6_address_in_32', '2001:db8:2::1', '2001:db8::/32', None),
+        ('ipv4_address', '10.1.2.3', '10.0.0.0/8', None),
+        ('single_address', '192.0.2.1', '192.0.2.1/32', None),
+    ])
+    def test_lookup_returns_longest_match_for(
+            self, _, value, expected_network, expected_classification):
+        """Test if the most specific matching network is returned.
+
+        :param value: an ip address to be looked up
+        :param expected_network: the expected network
+        :param expected_classification: the expected classification,
+        or None if it is classification of the list
+        """
+        expected = AddressListItem(
+            expected_network,
+            self.tested_instance,
+            expected_classification or self.classification
+        )
+        self.assertEqual(expected, self.tested_instance.lookup(value))
+
+    @parameterized.expand([
+        ('ipv6_address', '2001:db9::1'),
+        ('ipv4_address', '192.0.2.2'),
+        ('ipv4_mapped_address', '::ffff:10.0.0.1'),
+        ('hostname', 'test.com'),
+    ])
+    def test_lookup_returns_none_for(self, _, value):
+        """Test if None is returned for a value outside the networks.
+
+        :param value: a host value to be looked up
+        """
+        self.assertIsNone(self.tested_instance.lookup(value))
+        self.assertNotIn(value, self.tested_instance)
+
+    def test_contains_for_listed_address(self):
+        """Test if True is returned for an address in a network."""
+        self.assertIn('2001:db8:ffff::1', self.tested_instance)
+
+    def test_filter_matching(self):
+        """Test if URLs with hosts in the networks are returned."""
+        urls = ['http://[2001:db8:1::5]/path', 'http://10.0.0.1',
+                'http://test.com', 'http://11.0.0.1']
+        self.assertEqual(
+            urls[:2],
+            list(self.tested_instance.filter_matching(urls))
+        )
+
+    def test_add_invalid_network(self):
+        """Test if InvalidHostError is raised for an invalid network."""
+        with self.assertRaises(InvalidHostError):
+            self.tested_instance.add('2001:db8::/129')
+
+    def test_networks(self):
+        """Test if listed networks are returned."""
+        self.assertEqual(
+            ['10.0.0.0/8', '192.0.2.1/32', '2001:db8::/32',
+             '2001:db8:1::/48', '2001:db8:1:2::/64'],
+            self.tested_instance.networks
+        )
+        self.assertEqual(5, len(self.tested_instance))
+
+    def test_lookup_for_many_networks(self):
+        """Test if networks of a large list are matched."""
+        tested_instance = IPPrefixList('test', ['TEST'])
+        base = int(ipaddress.IPv6Address('2001:db8::'))
+        for i in range(1000):
+            network = ipaddress.IPv6Network((base + (i << 80), 48))
+            tested_instance.add(str(network))
+        address = str(ipaddress.IPv6Address(base + (500 << 80) + 1))
+        self.assertEqual(
+            str(ipaddress.IPv6Network((base + (500 << 80), 48))),
+            tested_instance.lookup(address).value
+        )
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
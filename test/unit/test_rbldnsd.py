@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for classes and functions defined in spam_lists.rbldnsd."""
+from __future__ import unicode_literals
+
+import ipaddress
+import os
+import tempfile
+
+# pylint: disable=redefined-builtin
+from builtins import str
+from nose_parameterized import parameterized
+
+from spam_lists.exceptions import InvalidZoneEntryError, UnknownCodeError
+from spam_lists.rbldnsd import (
+    RangeIndex, RbldnsdZone, parse_ipv4_entry, parse_return_code
+)
+from spam_lists.structures import hostname_or_ip
+from test.compat import unittest, Mock
+from test.unit.common_definitions import HostListTestMixin
+
+
+def get_ip_version(value):
+    """Get version of an IP address.
+
+    :param value: a host value
+    :returns: 4 or 6 for IP addresses, None for hostnames
+    """
+    try:
+        return ipaddress.ip_address(str(value)).version
+    except ValueError:
+        return None
+
+
+class RbldnsdZoneTest(HostListTestMixin, unittest.TestCase):
+    """Tests for RbldnsdZone class.
+
+    :ivar host_factory_mock: a mocked implementation of host factory
+    used by tested instance. Uses hostname_or_ip as its implementation.
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.host_factory_mock = Mock()
+        self.host_factory_mock.side_effect = hostname_or_ip
+        classification_map = dict(
+            (2**i, k) for i, k in enumerate(self.classification, 1)
+        )
+        self.tested_instance = RbldnsdZone(
+            'test_zone',
+            classification_map,
+            self.host_factory_mock
+        )
+
+    def _set_matching_hosts(self, hosts):
+        datasets = (('ip4set', 4), ('ip6trie', 6), ('dnset', None))
+        for dataset_type, version in datasets:
+            lines = [h for h in hosts if get_ip_version(h) == version]
+            self.tested_instance.load(dataset_type, lines)
+
+
+class RbldnsdZoneDataTest(unittest.TestCase):
+    """Tests for loading and querying data of RbldnsdZone instances.
+
+    :cvar classification_map: a classification map of tested instance
+    :ivar tested_instance: an instance of tested class
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    classification_map = {
+        2: 'spam',
+        3: 'snowshoe',
+        4: 'exploits',
+        8: 'phishing',
+        10: 'policy'
+    }
+
+    def setUp(self):
+        self.tested_instance = RbldnsdZone(
+            'test_zone',
+            self.classification_map
+        )
+
+    def _get_classification(self, host):
+        item = self.tested_instance.lookup(host)
+        return None if item is None else item.classification
+
+    @parameterized.expand([
+        ('address', ['127.0.0.2'], '127.0.0.2', {'spam'}),
+        ('cidr_block', ['10.0.0.0/8'], '10.200.3.4', {'spam'}),
+        ('range', ['10.0.0.5-10.0.1.5'], '10.0.0.255', {'spam'}),
+        ('short_range', ['10.0.0.5-10'], '10.0.0.10', {'spam'}),
+        ('abbreviated_network', ['10.1'], '10.1.255.3', {'spam'}),
+        ('address_outside_range', ['10.0.0.5-10'], '10.0.0.11', None),
+        ('explicit_code', ['10.0.0.1 :127.0.0.4:text'], '10.0.0.1',
+         {'exploits'}),
+        ('short_code', ['10.0.0.1:4:text'], '10.0.0.1', {'exploits'}),
+        ('text_value', ['10.0.0.1 listed'], '10.0.0.1', {'spam'}),
+        ('default_code', [':10:text', '10.0.0.1', '10.0.0.2 :3:'],
+         '10.0.0.1', {'policy'}),
+        ('exclusion', ['10.0.0.0/24', '!10.0.0.7'], '10.0.0.7', None),
+        ('exclusion_of_the_same_range', ['!10.0.0.7', '10.0.0.7'],
+         '10.0.0.7', None),
+        ('nested_ranges', ['10.0.0.0/8 :10:', '10.1.0.0/16 :3:'],
+         '10.1.2.3', {'snowshoe'}),
+        ('range_around_nested_one', ['10.0.0.0/8 :10:', '10.1.0.0/16 :3:'],
+         '10.2.0.1', {'policy'}),
+        ('overlapping_ranges', ['10.0.0.0-10.0.0.20 :10:',
+                                '10.0.0.10-10.0.0.30 :3:'],
+         '10.0.0.25', {'snowshoe'}),
+        ('comments_and_directives', ['# comment', '; comment',
+                                     '$TTL 300', '', '10.0.0.1'],
+         '10.0.0.1', {'spam'}),
+    ])
+    def test_ip4set_lookup_for(self, _, lines, host, expected):
+        """Test if ip4set entries are matched as expected.
+
+        :param lines: lines of a zone file
+        :param host: a host to be looked up
+        :param expected: expected classification of the host
+        """
+        self.tested_instance.load('ip4set', lines)
+        self.assertEqual(expected, self._get_classification(host))
+
+    @parameterized.expand([
+        ('address', ['2001:db8::1'], '2001:db8::1', {'spam'}),
+        ('cidr_block', ['2001:db8::/32 :3:'], '2001:db8:ff::1',
+         {'snowshoe'}),
+        ('exclusion', ['2001:db8::/32', '!2001:db8::/48'], '2001:db8::1',
+         None),
+        ('ipv4_address', ['2001:db8::/32'], '127.0.0.2', None),
+    ])
+    def test_ip6trie_lookup_for(self, _, lines, host, expected):
+        """Test if ip6trie entries are matched as expected.
+
+        :param lines: lines of a zone file
+        :param host: a host to be looked up
+        :param expected: expected classification of the host
+        """
+        self.tested_instance.load('ip6trie', lines)
+        self.assertEqual(expected, self._get_classification(host))
+
+    @parameterized.expand([
+        ('name', ['example.com'], 'example.com', {'spam'}),
+        ('case_insensitive_name', ['Example.COM'], 'example.com', {'spam'}),
+        ('subdomain_of_name', ['example.com'], 'a.example.com', None),
+        ('wildcard_subdomain', ['*.example.com :3:'], 'a.b.example.com',
+         {'snowshoe'}),
+        ('wildcard_parent', ['*.example.com'], 'example.com', None),
+        ('domain_and_subdomains', ['.example.com'], 'example.com',
+         {'spam'}),
+        ('subdomain_of_domain', ['.example.com'], 'a.example.com', {'spam'}),
+        ('closest_wildcard', ['.example.com :10:', '.a.example.com :3:'],
+         'b.a.example.com', {'snowshoe'}),
+        ('exclusion', ['.example.com', '!a.example.com'], 'a.example.com',
+         None),
+        ('ip_address', ['.example.com'], '127.0.0.2', None),
+    ])
+    def test_dnset_lookup_for(self, _, lines, host, expected):
+        """Test if dnset entries are matched as expected.
+
+        :param lines: lines of a zone file
+        :param host: a host to be looked up
+        :param expected: expected classification of the host
+        """
+        self.tested_instance.load('dnset', lines)
+        self.assertEqual(expected, self._get_classification(host))
+
+    def test_lookup_in_many_datasets(self):
+        """Test if classification from all datasets is returned."""
+        self.tested_instance.load('ip4set', ['127.0.0.2'])
+        self.tested_instance.load('ip4set', ['127.0.0.0/24 :4:'])
+        expected = {'spam', 'exploits'}
+        self.assertEqual(expected, self._get_classification('127.0.0.2'))
+
+    def test_lookup_with_bitmasking(self):
+        """Test if return codes are decoded as bit vectors."""
+        self.tested_instance = RbldnsdZone(
+            'test_zone',
+            self.classification_map,
+            bitmasking=True
+        )
+        self.tested_instance.load('dnset', ['example.com :10:'])
+        expected = {'spam', 'phishing'}
+        self.assertEqual(expected, self._get_classification('example.com'))
+
+    def test_lookup_for_unknown_code(self):
+        """Test if UnknownCodeError is raised for an unknown code."""
+        self.tested_instance.load('dnset', ['example.com :5:'])
+        with self.assertRaises(UnknownCodeError):
+            self.tested_instance.lookup('example.com')
+
+    @parameterized.expand([
+        ('ip4set', 'ip4set', '10.0.0.300'),
+        ('ip4set_range', 'ip4set', '10.0.0.5-4'),
+        ('ip6trie', 'ip6trie', '2001:db8::/200'),
+        ('return_code', 'dnset', 'example.com :127.0.0.256:'),
+    ])
+    def test_load_invalid_entry_for(self, _, dataset_type, line):
+        """Test if InvalidZoneEntryError is raised for an invalid line.
+
+        :param dataset_type: a type of loaded dataset
+        :param line: an invalid line of the dataset
+        """
+        with self.assertRaises(InvalidZoneEntryError):
+            self.tested_instance.load(dataset_type, [line])
+
+    def test_load_unsupported_dataset_type(self):
+        """Test if ValueError is raised for an unsupported dataset type."""
+        with self.assertRaises(ValueError):
+            self.tested_instance.load('combined', [])
+
+    def test_load_file(self):
+        """Test if a dataset is loaded from a zone file."""
+        handle, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w') as zone_file:
+            zone_file.write('# test zone\n:3:snowshoe\n10.0.0.0/24\n')
+        self.tested_instance.load_file('ip4set', path)
+        self.assertEqual({'snowshoe'}, self._get_classification('10.0.0.1'))
+        self.assertEqual(1, len(self.tested_instance))
+
+
+class RangeIndexTest(unittest.TestCase):
+    """Tests for RangeIndex class."""
+
+    # pylint: disable=too-many-public-methods
+
+    def test_build_disjoint_segments(self):
+        """Test if nested and overlapping ranges are divided."""
+        index = RangeIndex()
+        index.build([
+            ((0, 100), 2),
+            ((10, 20), 3),
+            ((15, 40), 4),
+            ((30, 35), 0),
+            ((101, 110), 2)
+        ], 8)
+        expected = [2] * 10 + [3] * 5 + [4] * 15 + [None] * 6 + [4] * 5
+        expected += [2] * 70 + [None] * 145
+        self.assertEqual(expected, [index.find(i) for i in range(256)])
+        self.assertEqual(5, len(index))
+
+
+class ParseFunctionsTest(unittest.TestCase):
+    """Tests for functions parsing rbldnsd zone entries."""
+
+    # pylint: disable=too-many-public-methods
+
+    @parameterized.expand([
+        ('address', ':127.0.0.3:text', 3),
+        ('short_address', ':3:text', 3),
+        ('empty_address', '::text', 7),
+        ('text', 'text', 7),
+        ('no_value', '', 7),
+    ])
+    def test_parse_return_code_for(self, _, value, expected):
+        """Test if an expected code is returned.
+
+        :param value: a return value of an entry
+        :param expected: the expected code
+        """
+        self.assertEqual(expected, parse_return_code(value, 7))
+
+    @parameterized.expand([
+        ('address', '10.0.0.1', (167772161, 167772161)),
+        ('unaligned_cidr', '10.0.0.1/24', (167772160, 167772415)),
+        ('abbreviated_network', '10', (167772160, 184549375)),
+    ])
+    def test_parse_ipv4_entry_for(self, _, entry, expected):
+        """Test if an expected range is returned.
+
+        :param entry: an ip4set entry
+        :param expected: the expected range
+        """
+        self.assertEqual(expected, parse_ipv4_entry(entry))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for functions defined in spam_lists.snapshot."""
+from __future__ import unicode_literals
+
+import io
+import os
+import struct
+import tempfile
+import zlib
+
+from future.utils import native_str
+from nose_parameterized import parameterized
+
+from spam_lists.exceptions import InvalidSnapshotError
+from spam_lists.snapshot import read_snapshot, write_snapshot
+from test.compat import unittest
+
+
+class SnapshotTest(unittest.TestCase):
+    """Tests for reading and writing snapshots.
+
+    :ivar path: a path of a temporary snapshot file
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def _write_data(self, data):
+        with io.open(self.path, 'wb') as snapshot_file:
+            snapshot_file.write(data)
+
+    def _read_data(self):
+        with io.open(self.path, 'rb') as snapshot_file:
+            return snapshot_file.read()
+
+    def test_read_written_snapshot(self):
+        """Test if written data is read back."""
+        items = [
+            (b'\x01com\x00a', 'a.com'),
+            (b'\x04\x7f\x00\x00\x01', '127.0.0.1')
+        ]
+        bounds = {4: ([1, 100], [10, 200]), 6: ([2**100], [2**128 - 1])}
+        write_snapshot(self.path, 'test', {'spam', 'TEST'}, items, bounds)
+        identifier, classification, actual_items, actual_bounds, _ = (
+            read_snapshot(self.path)
+        )
+        self.assertEqual('test', identifier)
+        self.assertCountEqual(['spam', 'TEST'], classification)
+        self.assertEqual(items, actual_items)
+        for version in 4, 6:
+            self.assertEqual(
+                [list(b) for b in bounds[version]],
+                [list(b) for b in actual_bounds[version]]
+            )
+
+    def test_read_empty_snapshot(self):
+        """Test if an empty collection is read back."""
+        write_snapshot(self.path, 'test', [], [], {4: ([], []), 6: ([], [])})
+        _, classification, items, _, entry_classification = (
+            read_snapshot(self.path)
+        )
+        self.assertEqual([], classification)
+        self.assertEqual([], items)
+        self.assertEqual([], entry_classification[0])
+        self.assertEqual([], list(entry_classification[1]))
+
+    def test_read_entry_classification(self):
+        """Test if written classification of entries is read back."""
+        items = [(b'\x01com\x00a', 'a.com'), (b'\x01com\x00b', 'b.com')]
+        class_sets = [{'phishing'}, {'malware', 'spam'}]
+        write_snapshot(
+            self.path,
+            'test',
+            ['TEST'],
+            items,
+            {4: ([], []), 6: ([], [])},
+            (class_sets, [2, 0])
+        )
+        actual_sets, actual_ids = read_snapshot(self.path)[4]
+        self.assertEqual(class_sets, actual_sets)
+        self.assertEqual([2, 0], list(actual_ids))
+
+    def test_read_version_1_snapshot(self):
+        """Test if a snapshot without entry classification is read."""
+        sections = [b'test', b'TEST', b'a.com', b'\0' * 4 + b'\6\0\0\0',
+                    b'\x01com\x00a', b'', b'', b'']
+        payload = b''.join(
+            struct.pack(native_str('<Q'), len(s)) + s for s in sections
+        )
+        header = struct.pack(
+            native_str('<8sIIQ'),
+            b'SPAMLSNP',
+            1,
+            zlib.crc32(payload) & 0xffffffff,
+            len(payload)
+        )
+        self._write_data(header + payload)
+        _, _, items, _, entry_classification = read_snapshot(self.path)
+        self.assertEqual([(b'\x01com\x00a', 'a.com')], items)
+        self.assertEqual([], entry_classification[0])
+        self.assertEqual([], list(entry_classification[1]))
+
+    @parameterized.expand([
+        ('no_header', lambda d: d[:10]),
+        ('bad_magic', lambda d: b'X' + d[1:]),
+        ('unsupported_version', lambda d: d[:8] + b'\x03' + d[9:]),
+        ('modified_payload', lambda d: d[:-1] + b'\xff'),
+        ('truncated_payload', lambda d: d[:-1]),
+    ])
+    def test_read_invalid_snapshot_with(self, _, modify):
+        """Test if InvalidSnapshotError is raised for an invalid file.
+
+        :param modify: a function modifying content of a valid file
+        """
+        write_snapshot(
+            self.path,
+            'test',
+            ['TEST'],
+            [(b'\x01com\x00a', 'a.com')],
+            {4: ([], []), 6: ([], [])}
+        )
+        self._write_data(modify(self._read_data()))
+        with self.assertRaises(InvalidSnapshotError):
+            read_snapshot(self.path)
+
+    def test_read_snapshot_with_missing_sections(self):
+        """Test if InvalidSnapshotError is raised for missing sections."""
+        payload = struct.pack(native_str('<Q'), 0)
+        header = struct.pack(
+            native_str('<8sIIQ'),
+            b'SPAMLSNP',
+            1,
+            zlib.crc32(payload) & 0xffffffff,
+            len(payload)
+        )
+        self._write_data(header + payload)
+        with self.assertRaises(InvalidSnapshotError):
+            read_snapshot(self.path)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -2,13 +2,19 @@
 """Tests for functions and classes defined in spam_lists.structures."""
 from __future__ import unicode_literals
 
+import ipaddress
+
 # pylint: disable=redefined-builtin
 from builtins import str, range, object
+from dns.reversename import from_address
 from nose_parameterized import parameterized
 
 from spam_lists.exceptions import InvalidHostError, InvalidHostnameError
 from spam_lists.structures import (
-    Hostname, create_host, IPv4Address, IPv6Address
+    Hostname, create_host, IPv4Address, IPv6Address, IPv4Network,
+    IPv6Network, SORT_KEY_SEPARATOR, get_index_labels, get_host_type,
+    dispatch_host, hostname_or_ip, registered_domain_or_ip, HOST_TYPE_IPV4,
+    HOST_TYPE_IPV6, HOST_TYPE_HOSTNAME
 )
 from test.compat import unittest, Mock, patch, MagicMock
 
@@ -22,7 +28,10 @@ class BaseHostTest(object):
     """
 
     def setUp(self):
-        self.tested_instance.value = MagicMock()
+        self._set_value(MagicMock())
+
+    def _set_value(self, value):
+        self.tested_instance.value = value
 
     def test_lt_for_smaller_value(self):
         """Test if False is returned for a smaller value."""
@@ -56,7 +65,7 @@ class BaseHostTest(object):
         other = Mock(spec=['value'])
         value = MagicMock()
         value.__lt__.side_effect = side_effect
-        self.tested_instance.value = value
+        self._set_value(value)
         self.assertRaises(
             TypeError,
             self.tested_instance.__lt__,
@@ -94,6 +103,10 @@ class HostnameTest(BaseHostTest, unittest.TestCase):
     unrelated_domain = class_to_test('other.com')
     tested_instance = class_to_test('compared.com')
 
+    def _set_value(self, value):
+        # pylint: disable=protected-access
+        self.tested_instance._name = value
+
     @parameterized.expand([
         ('hostname', '-e'),
         ('hostname', '/e'),
@@ -107,6 +120,12 @@ class HostnameTest(BaseHostTest, unittest.TestCase):
         """
         self.assertRaises(InvalidHostnameError, Hostname, value)
 
+    def test_value_is_read_only(self):
+        """Test if the name can't be replaced after construction."""
+        hostname = Hostname('a.com')
+        with self.assertRaises(AttributeError):
+            hostname.value = Hostname('b.com').value
+
     @parameterized.expand([
         ('unrelated_domain', unrelated_domain, False),
         ('a_subdomain', subdomain, False),
@@ -128,25 +147,105 @@ class HostnameTest(BaseHostTest, unittest.TestCase):
         else:
             self.assertFalse(actual)
 
+    def test_index_labels_start_with_those_of_superdomain(self):
+        """Test if index labels of a subdomain extend those of its parent."""
+        expected = self.superdomain.index_labels
+        actual = self.subdomain.index_labels[:len(expected)]
+        self.assertEqual(expected, actual)
+
+    def test_sort_key_of_subdomain_follows_that_of_superdomain(self):
+        """Test if a subdomain key starts with that of its parent."""
+        parent_key = self.superdomain.sort_key + SORT_KEY_SEPARATOR
+        self.assertTrue(self.subdomain.sort_key.startswith(parent_key))
+
+    def test_sort_keys_of_subdomains_are_contiguous(self):
+        """Test if no other domain is sorted between subdomains."""
+        domain = Hostname('domain-a.' + self.superdomain_str)
+        self.assertLess(self.subdomain.sort_key, domain.sort_key)
+        self.assertLess(self.domain.sort_key, self.subdomain.sort_key)
+
+    def test_index_labels_are_lowercase(self):
+        """Test if index labels do not depend on case of the hostname."""
+        self.assertEqual(
+            self.domain.index_labels,
+            Hostname(self.domain_str.upper()).index_labels
+        )
+
     @parameterized.expand([
         ('returns_false', False),
         ('returns_true', True)
     ])
     def test_lt_for_not_comparable_values(self, _, result):
-        self.tested_instance.value.__lt__.side_effect = TypeError
+        """Test if hostname strings are compared.
 
-        str_value = self.tested_instance.to_unicode()
-        str_value.__lt__.return_value = result
+        :param result: a result expected for the comparison
+        """
+        self.tested_instance.value.__lt__.side_effect = TypeError
         other = Mock()
+        other.to_unicode.return_value = 'zzz.com' if result else 'aaa.com'
 
         assertion = self.assertTrue if result else self.assertFalse
         assertion(self.tested_instance < other)
 
+    def test_domain_name_is_created_when_first_used(self):
+        """Test if a domain name is not created by the constructor."""
+        with patch('spam_lists.structures.name.Name') as name_class:
+            hostname = Hostname('lazy.com')
+            name_class.assert_not_called()
+            self.assertEqual(
+                name_class.return_value,
+                hostname.relative_domain
+            )
+            name_class.assert_called_once_with(['lazy', 'com'])
+            self.assertIs(hostname.value, hostname.relative_domain)
+            self.assertEqual(1, name_class.call_count)
+
+    def test_instances_have_no_attribute_dictionary(self):
+        """Test if instances of the class use slots."""
+        self.assertFalse(hasattr(self.domain, '__dict__'))
+
+    @parameterized.expand([
+        ('uppercase', 'SubDomain.Domain.COM',
+         (b'com', b'domain', b'subdomain')),
+        ('internationalized', 'bücher.de', (b'de', 'bücher'.encode('utf-8'))),
+        ('punycode', 'xn--bcher-kva.de', (b'de', b'xn--bcher-kva')),
+    ])
+    def test_index_labels_for(self, _, value, expected):
+        """Test if index labels are lowercase labels of the hostname.
+
+        :param value: a hostname
+        :param expected: a tuple of expected index labels
+        """
+        self.assertEqual(expected, Hostname(value).index_labels)
+
+    @parameterized.expand([
+        ('ascii', 'Domain.com', 'Domain.com'),
+        ('internationalized', 'bücher.de', 'bücher.de'),
+        ('punycode', 'xn--bcher-kva.de', 'bücher.de'),
+        ('punycode_subdomain', 'sub.XN--bcher-kva.de', 'sub.bücher.de'),
+        ('label_containing_prefix', 'axn--b.de', 'axn--b.de'),
+    ])
+    def test_to_unicode_for(self, _, value, expected):
+        """Test if punycode labels are decoded.
+
+        :param value: a hostname
+        :param expected: the expected unicode string
+        """
+        self.assertEqual(expected, Hostname(value).to_unicode())
+
+    def test_to_unicode_does_not_create_domain_name(self):
+        """Test if a domain name is not created for an ascii hostname."""
+        with patch('spam_lists.structures.name.Name') as name_class:
+            Hostname('ascii.com').to_unicode()
+            name_class.assert_not_called()
+
 
 class IPAddressTestMixin(BaseHostTest):
     """Tests for subclasses of IPAddress.
 
     :cvar class_to_test: a subclass of IPAddress to be tested
+    :cvar reverse_name_values: addresses used for testing reverse
+    names created for them
     """
 
     def setUp(self):
@@ -157,15 +256,11 @@ class IPAddressTestMixin(BaseHostTest):
         )
         self.value_constructor_mock = self.value_constructor_patcher.start()
 
-        self.name_from_ip_patcher = patch('spam_lists.structures.name_from_ip')
-        self.name_from_ip_mock = self.name_from_ip_patcher.start()
-
         self.tested_instance = self.class_to_test(Mock())
         super(IPAddressTestMixin, self).setUp()
 
     def tearDown(self):
         self.value_constructor_patcher.stop()
-        self.name_from_ip_patcher.stop()
 
     def test_constructor_for_invalid_argument(self):
         """Test if an error is raised for an invalid argument."""
@@ -176,25 +271,34 @@ class IPAddressTestMixin(BaseHostTest):
             Mock()
         )
 
-    def test_create_relative_domain_for_ip(self):
-        """Test if accessing relative_domain creates a relative domain."""
-        # pylint: disable=W0104
-        self.tested_instance.relative_domain
-
-        self.name_from_ip_mock.assert_called_once_with(
-            str(self.tested_instance.value)
-        )
-        name = self.name_from_ip_mock.return_value
-        name.relativize.assert_called_once_with(
-            self.class_to_test.reverse_domain
-        )
-
     def test_relative_domain_value(self):
         """Test if relative_domain has an expected value."""
-        name = self.name_from_ip_mock.return_value
-        expected = name.relativize.return_value
-        actual = self.tested_instance.relative_domain
-        self.assertEqual(expected, actual)
+        self.value_constructor_mock.side_effect = ipaddress.ip_address
+        for value in self.reverse_name_values:
+            reverse_domain = self.class_to_test.reverse_domain
+            expected = from_address(value).relativize(reverse_domain)
+            actual = self.class_to_test(value).relative_domain
+            self.assertEqual(expected.labels, actual.labels)
+
+    def test_sort_key_value(self):
+        """Test if sort keys preserve order of the addresses."""
+        self.value_constructor_mock.side_effect = ipaddress.ip_address
+        values = sorted(
+            self.reverse_name_values,
+            key=ipaddress.ip_address
+        )
+        keys = [self.class_to_test(v).sort_key for v in values]
+        self.assertEqual(sorted(keys), keys)
+        self.assertTrue(all(len(k) == len(keys[0]) for k in keys))
+
+    def test_relative_domain_is_reused(self):
+        """Test if relative_domain is built only once."""
+        self.value_constructor_mock.side_effect = ipaddress.ip_address
+        tested_instance = self.class_to_test(self.reverse_name_values[0])
+        self.assertIs(
+            tested_instance.relative_domain,
+            tested_instance.relative_domain
+        )
 
     def test_lt_for_not_comparable_values(self):
         """Test a result of comparing non-comparable values.
@@ -220,6 +324,7 @@ class IPv4AddressTest(IPAddressTestMixin, unittest.TestCase):
 
     # pylint: disable=too-many-public-methods
     class_to_test = IPv4Address
+    reverse_name_values = ['127.0.0.2', '192.0.2.255', '0.10.100.1']
 
 
 class IPv6AddressTest(IPAddressTestMixin, unittest.TestCase):
@@ -227,6 +332,78 @@ class IPv6AddressTest(IPAddressTestMixin, unittest.TestCase):
 
     # pylint: disable=too-many-public-methods
     class_to_test = IPv6Address
+    reverse_name_values = ['2001:db8::1f', '::1', 'fe80::abcd:12']
+
+
+class IPNetworkTest(unittest.TestCase):
+    """Tests for subclasses of IPNetwork."""
+
+    # pylint: disable=too-many-public-methods
+
+    @parameterized.expand([
+        ('address_in_network', IPv4Network, '10.0.0.0/8', '10.1.2.3', True),
+        ('address_outside_network', IPv4Network, '10.0.0.0/8', '11.0.0.1',
+         False),
+        ('other_ip_version', IPv6Network, '::/0', '10.0.0.1', False),
+        ('ipv6_address', IPv6Network, '2001:db8::/32', '2001:db8::1', True),
+    ])
+    def test_is_match_for(self, _, class_to_test, network, other, expected):
+        """Test if an expected value is returned.
+
+        :param class_to_test: a subclass of IPNetwork to be tested
+        :param network: a network represented by tested instance
+        :param other: an ip address passed to the tested method
+        :param expected: a boolean value expected to be returned
+        """
+        tested_instance = class_to_test(network)
+        other_object = Mock()
+        other_object.value = ipaddress.ip_address(other)
+        self.assertEqual(expected, tested_instance.is_match(other_object))
+
+    def test_is_match_for_hostname(self):
+        """Test if False is returned for a hostname."""
+        tested_instance = IPv4Network('10.0.0.0/8')
+        self.assertFalse(tested_instance.is_match(Hostname('network.com')))
+
+    @parameterized.expand([
+        ('ipv4', IPv4Network, '10.0.0.0/33'),
+        ('ipv6', IPv6Network, '2001:db8::/129'),
+        ('ipv4_for_ipv6_class', IPv6Network, '10.0.0.0/8'),
+    ])
+    def test_constructor_for_invalid(self, _, class_to_test, value):
+        """Test if an error is raised for an invalid network.
+
+        :param class_to_test: a subclass of IPNetwork to be tested
+        :param value: a value used to construct the instance
+        """
+        self.assertRaises(
+            class_to_test.invalid_ip_error_type,
+            class_to_test,
+            value
+        )
+
+
+class GetIndexLabelsTest(unittest.TestCase):
+    """Tests for get_index_labels function."""
+
+    # pylint: disable=too-many-public-methods
+
+    @parameterized.expand([
+        ('hostname', Hostname, 'Sub.Domain.com'),
+        ('ipv4_address', IPv4Address, '192.0.2.1'),
+        ('ipv6_address', IPv6Address, '2001:db8::1'),
+    ])
+    def test_get_index_labels_for(self, _, class_to_test, value):
+        """Test if index labels are restored from a sort key.
+
+        :param class_to_test: a class of host objects
+        :param value: a host value
+        """
+        host_object = class_to_test(value)
+        self.assertEqual(
+            host_object.index_labels,
+            get_index_labels(host_object.sort_key)
+        )
 
 
 class CreateHostTest(unittest.TestCase):
@@ -290,6 +467,136 @@ class CreateHostTest(unittest.TestCase):
         self.assertRaises(InvalidHostError, create_host, self.factories, value)
 
 
+class GetHostTypeTest(unittest.TestCase):
+    """Tests for get_host_type function."""
+
+    # pylint: disable=too-many-public-methods
+
+    @parameterized.expand([
+        ('ipv4', '127.0.0.1', HOST_TYPE_IPV4),
+        ('invalid_ipv4', '299.0.0.1', HOST_TYPE_IPV4),
+        ('ipv6', '2001:db8:abc:125::45', HOST_TYPE_IPV6),
+        ('ipv4_mapped_ipv6', '::ffff:127.0.0.1', HOST_TYPE_IPV6),
+        ('hostname', 'abc.com', HOST_TYPE_HOSTNAME),
+        ('hostname_with_digits', '1.2.3.com', HOST_TYPE_HOSTNAME),
+        ('invalid_hostname', '-e', HOST_TYPE_HOSTNAME),
+        ('non_string', 123, None),
+    ])
+    def test_get_host_type_for(self, _, value, expected):
+        """Test if an expected type is returned.
+
+        :param value: a value to be passed to the function
+        :param expected: an expected host type
+        """
+        self.assertEqual(expected, get_host_type(value))
+
+
+class DispatchHostTest(unittest.TestCase):
+    """Tests for dispatch_host function.
+
+    :ivar factories: a tuple of mocks representing factories used by
+    the function during tests
+    """
+
+    # pylint: disable=too-many-public-methods
+
+    def setUp(self):
+        self.factories = tuple(Mock() for _ in range(3))
+
+    @parameterized.expand([
+        ('ipv4', '127.0.0.1', HOST_TYPE_IPV4),
+        ('ipv6', '2001:db8:abc:125::45', HOST_TYPE_IPV6),
+        ('hostname', 'abc.com', HOST_TYPE_HOSTNAME),
+    ])
+    def test_dispatch_host_for(self, _, value, host_type):
+        """Test if only the factory for the type of host is called.
+
+        :param value: a value to be passed to the function
+        :param host_type: a type of host represented by the value
+        """
+        expected = self.factories[host_type].return_value
+        self.assertEqual(expected, dispatch_host(self.factories, value))
+        for i, factory in enumerate(self.factories):
+            if i == host_type:
+                factory.assert_called_once_with(value)
+            else:
+                factory.assert_not_called()
+
+    @parameterized.expand([
+        ('ipv4', '299.0.0.1', HOST_TYPE_IPV4),
+        ('ipv6', '2001:db8:abcef:125::43', HOST_TYPE_IPV6),
+        ('hostname', '-e', HOST_TYPE_HOSTNAME),
+    ])
+    def test_dispatch_host_for_invalid(self, _, value, host_type):
+        """Test for InvalidHostError when the argument is invalid.
+
+        Only the factory for the type of host is expected to be
+        called, and its error is expected to be reported.
+
+        :param value: a value to be passed to the function
+        :param host_type: a type of host represented by the value
+        """
+        for factory in self.factories:
+            factory.side_effect = InvalidHostError('factory error')
+        with self.assertRaises(InvalidHostError) as context:
+            dispatch_host(self.factories, value)
+        self.assertIn('factory error', str(context.exception))
+        for i, factory in enumerate(self.factories):
+            if i == host_type:
+                factory.assert_called_once_with(value)
+            else:
+                factory.assert_not_called()
+
+    def test_dispatch_host_for_non_string(self):
+        """Test if a non-string value is passed to all the factories."""
+        for factory in self.factories:
+            factory.side_effect = InvalidHostError('error')
+        self.assertRaises(
+            InvalidHostError,
+            dispatch_host,
+            self.factories,
+            123
+        )
+        for factory in self.factories:
+            factory.assert_called_once_with(123)
+
+    def test_dispatch_host_for_type_not_accepted(self):
+        """Test for InvalidHostError when the type is not accepted."""
+        factories = self.factories[0], None, self.factories[2]
+        self.assertRaises(
+            InvalidHostError,
+            dispatch_host,
+            factories,
+            '2001:db8:abc:125::45'
+        )
+        for factory in factories[::2]:
+            factory.assert_not_called()
+
+    @parameterized.expand([
+        ('ipv4', '127.0.0.1', IPv4Address),
+        ('ipv6', '2001:db8:abc:125::45', IPv6Address),
+        ('hostname', 'abc.com', Hostname),
+    ])
+    def test_hostname_or_ip_for(self, _, value, expected_class):
+        """Test if a host object of the expected class is returned.
+
+        :param value: a value to be passed to hostname_or_ip
+        :param expected_class: a class of the expected host object
+        """
+        self.assertIsInstance(hostname_or_ip(value), expected_class)
+
+    @parameterized.expand([
+        ('after_top_level_domain', 'a..com'),
+        ('inside_public_suffix', 'x.co..uk'),
+    ])
+    def test_registered_domain_or_ip_for_empty_label(self, _, value):
+        """Test for InvalidHostError when a label is empty.
+
+        :param value: a value to be passed to registered_domain_or_ip
+        """
+        self.assertRaises(InvalidHostError, registered_domain_or_ip, value)
+
+
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -9,7 +9,7 @@ from nose_parameterized import parameterized
 
 from spam_lists.exceptions import InvalidURLError, InvalidHostError
 from spam_lists.validation import (
-    accepts_valid_urls, is_valid_url, accepts_valid_host
+    accepts_valid_urls, is_valid_url, accepts_valid_host, is_valid_hostname
 )
 from test.compat import Mock, patch
 
@@ -122,6 +122,41 @@ class AcceptsValidHostTest(ValidationDecoratorTestMixin, unittest.TestCase):
         self._test_wrapper_for_invalid(value)
 
 
+class IsValidHostnameTest(unittest.TestCase):
+    """Tests for is_valid_hostname function."""
+
+    # pylint: disable=too-many-public-methods
+
+    @parameterized.expand([
+        ('domain', 'domain.com'),
+        ('subdomain', 'a.b-c_d.domain.com'),
+        ('uppercase_hostname', 'Sub.Domain.COM'),
+        ('numeric_label', '999.com'),
+        ('long_top_level_domain', 'domain.abcdefghijklm'),
+        ('punycode_top_level_domain', 'domain.xn--p1ai'),
+        ('unicode_hostname', 'пример.рф'),
+        ('single_digit_label', '1.com', False),
+        ('label_starting_with_hyphen', '-abc.com', False),
+        ('label_ending_with_underscore', 'abc_.com', False),
+        ('no_top_level_domain', 'domain', False),
+        ('single_letter_top_level_domain', 'domain.c', False),
+        ('too_long_top_level_domain', 'domain.abcdefghijklmn', False),
+        ('digit_in_top_level_domain', 'a.b2c', False),
+        ('hyphen_in_top_level_domain', 'a.b-c', False),
+        ('underscore_in_top_level_domain', 'a.b_c', False),
+        ('empty_label', 'a..com', False),
+        ('non_string', 123, False),
+    ])
+    def test_for(self, _, value, expected=True):
+        """Test expected result for given value.
+
+        :param value: a value for which the function is tested
+        :param expected: a value expected to be returned by the function
+        for the value
+        """
+        self.assertEqual(expected, is_valid_hostname(value))
+
+
 class IsValidURLTest(unittest.TestCase):
     """Tests for is_valid_url function."""
 